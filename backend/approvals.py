@@ -0,0 +1,242 @@
+"""
+Approvals Engine - preprod vs prod drift for every customer, computed once
+
+A customer needs a production approval when any container image in its
+"{customer}-preprod" namespace differs from the same deployment/container in
+"{customer}-prod", or when a preprod deployment has no prod counterpart.
+
+Customers come from the customers table. Results are cached per customer and
+recomputed only after a deployment in one of that customer's preprod/prod
+namespaces changes (cluster cache events), so the navbar's constant polling
+costs a dict read. Without the cluster cache, drift is computed from a single
+cluster-wide deployment listing reused for a short TTL.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cluster_cache import cluster_cache
+import k8s_fastlist as fastlist
+
+APPROVAL_ENVIRONMENTS = ('preprod', 'prod')
+
+# Reuse window for the list-based fallback
+APPROVALS_FALLBACK_TTL = float(os.getenv('APPROVALS_FALLBACK_TTL', '10'))
+
+
+def container_images(deploy: Any) -> Dict[str, str]:
+    """{container name: image} for a deployment's pod template"""
+    return {c.name: c.image for c in (deploy.spec.template.spec.containers or [])}
+
+
+def _env_summary(deploy: Optional[Any], container: Optional[str]) -> Optional[Dict[str, Any]]:
+    if deploy is None:
+        return None
+    images = container_images(deploy)
+    containers = deploy.spec.template.spec.containers or []
+    return {
+        'image': images.get(container) if container else (containers[0].image if containers else None),
+        'ready': deploy.status.ready_replicas or 0,
+        'replicas': deploy.spec.replicas
+    }
+
+
+def compute_drift(customer_id: str, preprod: List[Any], prod: List[Any]) -> Dict[str, Any]:
+    """Compare every container of every preprod deployment with prod"""
+    prod_by_name = {d.metadata.name: d for d in prod}
+    drift = []
+
+    for deploy in sorted(preprod, key=lambda d: d.metadata.name):
+        name = deploy.metadata.name
+        preprod_images = container_images(deploy)
+        counterpart = prod_by_name.get(name)
+        if counterpart is None:
+            drift.extend(
+                {'deployment': name, 'container': container, 'preprod_image': image, 'prod_image': None}
+                for container, image in sorted(preprod_images.items())
+            )
+            continue
+        prod_images = container_images(counterpart)
+        for container in sorted(set(preprod_images) | set(prod_images)):
+            if preprod_images.get(container) != prod_images.get(container):
+                drift.append({
+                    'deployment': name,
+                    'container': container,
+                    'preprod_image': preprod_images.get(container),
+                    'prod_image': prod_images.get(container)
+                })
+
+    # Headline pair for the existing single-image fields: the first drifted
+    # container, or the first preprod deployment when nothing drifted
+    headline = drift[0]['deployment'] if drift else (min(d.metadata.name for d in preprod) if preprod else None)
+    container = drift[0]['container'] if drift else None
+    preprod_deploy = next((d for d in preprod if d.metadata.name == headline), None)
+
+    return {
+        'customer': customer_id,
+        'approval_needed': bool(drift),
+        'drift': drift,
+        'preprod': _env_summary(preprod_deploy, container),
+        'prod': _env_summary(prod_by_name.get(headline), container),
+        **({} if preprod and prod else {'reason': 'No deployments found'})
+    }
+
+
+class ApprovalsEngine:
+    """Per-customer drift results, invalidated by deployment events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._customers: Dict[str, str] = {}  # id -> display name
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._dirty: set = set()
+        self._apps_api = None
+        self._fallback: Optional[Tuple[float, Dict[str, List[Any]]]] = None
+        self.live = False
+        self.generation = 0  # bumped whenever any cached result may change
+        self.computes = 0
+
+    def start(self, apps_api):
+        self._apps_api = apps_api
+        self.refresh_customers()
+        self.live = cluster_cache.add_listener('deployments', self._on_deployment_event)
+
+    def _load_customers(self) -> Optional[Dict[str, str]]:
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, Customer
+
+            db = SessionLocal()
+            try:
+                return {row.id: row.name for row in db.query(Customer.id, Customer.name).all()}
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Approvals engine could not load customers: {e}")
+            return None
+
+    def refresh_customers(self):
+        """Re-read the customers table (after onboarding/offboarding)"""
+        customers = self._load_customers()
+        with self._lock:
+            if customers is not None:
+                self._customers = customers
+            self._results = {}
+            self._dirty = set()
+            self.generation += 1
+
+    def _on_deployment_event(self, event_type: str, deploy: Any):
+        with self._lock:
+            if event_type == 'SYNC':
+                self._results = {}
+                self.generation += 1
+                return
+            namespace = deploy.metadata.namespace or ''
+            for env in APPROVAL_ENVIRONMENTS:
+                customer_id = namespace[:-len(env) - 1] if namespace.endswith(f"-{env}") else None
+                if customer_id in self._customers:
+                    self._dirty.add(customer_id)
+                    self.generation += 1
+                    return
+
+    # ------------------------------------------------------------------
+    # Computation
+    # ------------------------------------------------------------------
+
+    def _deployments_by_namespace(self) -> Dict[str, List[Any]]:
+        """One cluster-wide listing grouped by namespace (fallback path)"""
+        now = time.time()
+        if self._fallback and now - self._fallback[0] < APPROVALS_FALLBACK_TTL:
+            return self._fallback[1]
+        grouped: Dict[str, List[Any]] = {}
+        for deploy in fastlist.list_deployments(self._apps_api.list_deployment_for_all_namespaces):
+            grouped.setdefault(deploy.metadata.namespace, []).append(deploy)
+        self._fallback = (now, grouped)
+        return grouped
+
+    def _customer_deployments(self, customer_id: str, grouped: Optional[Dict[str, List[Any]]]) -> Tuple[List[Any], List[Any]]:
+        if grouped is None:
+            return (
+                cluster_cache.deployments(f"{customer_id}-preprod"),
+                cluster_cache.deployments(f"{customer_id}-prod")
+            )
+        return grouped.get(f"{customer_id}-preprod", []), grouped.get(f"{customer_id}-prod", [])
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Drift result for every customer, recomputing only stale entries"""
+        use_cache = self.live and cluster_cache.is_synced('deployments')
+        with self._lock:
+            customers = dict(self._customers)
+            if use_cache:
+                stale = [c for c in customers if c not in self._results or c in self._dirty]
+                self._dirty.difference_update(stale)
+            else:
+                stale = list(customers)
+
+        if not stale:
+            with self._lock:
+                return dict(self._results)
+
+        grouped = None if use_cache else self._deployments_by_namespace()
+        computed = {}
+        for customer_id in stale:
+            preprod, prod = self._customer_deployments(customer_id, grouped)
+            computed[customer_id] = compute_drift(customer_id, preprod, prod)
+        self.computes += len(computed)
+
+        with self._lock:
+            self._results.update(computed)
+            return {c: self._results[c] for c in customers if c in self._results}
+
+    def status(self, customer_id: str) -> Dict[str, Any]:
+        """Drift result for one customer (also for IDs not in the customers table)"""
+        result = self.results().get(customer_id)
+        if result is not None:
+            return result
+        use_cache = self.live and cluster_cache.is_synced('deployments')
+        grouped = None if use_cache else self._deployments_by_namespace()
+        preprod, prod = self._customer_deployments(customer_id, grouped)
+        return compute_drift(customer_id, preprod, prod)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Customers whose preprod differs from prod, in the /approvals/pending shape"""
+        with self._lock:
+            names = dict(self._customers)
+        pending = []
+        for customer_id, result in sorted(self.results().items()):
+            if not result['approval_needed']:
+                continue
+            preprod = result['preprod'] or {}
+            prod = result['prod'] or {}
+            pending.append({
+                'customer_id': customer_id,
+                'customer_name': names.get(customer_id) or customer_id.replace('-', ' ').title(),
+                'preprod_image': preprod.get('image'),
+                'prod_image': prod.get('image'),
+                'preprod_ready': preprod.get('ready', 0),
+                'prod_ready': prod.get('ready', 0),
+                'drift': result['drift']
+            })
+        return pending
+
+    def version(self) -> Optional[int]:
+        """ETag input; None when results aren't event-driven"""
+        if not (self.live and cluster_cache.is_synced('deployments')):
+            return None
+        return self.generation
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'live': self.live,
+                'customers': len(self._customers),
+                'cached': len(self._results),
+                'dirty': len(self._dirty),
+                'generation': self.generation,
+                'computes': self.computes
+            }
+
+
+# Global instance
+approvals_engine = ApprovalsEngine()
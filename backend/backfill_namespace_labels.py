@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Add tenant labels to legacy pattern-named namespaces (one-time backfill)
+
+Namespaces named "{customer}-{env}" that predate namespace labels get the
+`customer`, `environment` and `managed-by=openluffy` labels that label-based
+discovery selects on. Existing label values are never overwritten. Once it
+has run, set LEGACY_NAMESPACE_SCAN=false on the backend.
+
+Usage: python backfill_namespace_labels.py [--apply] [--known-customers-only]
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kubernetes import client, config
+from kubernetes.client.rest import ApiException
+
+from namespace_discovery import legacy_tenant, TENANT_NAMESPACE_SELECTOR
+from cluster_cache import parse_label_selector
+
+
+def load_customer_ids():
+    """Customer IDs from the customers table"""
+    from database import SessionLocal, Customer
+
+    db = SessionLocal()
+    try:
+        return {row.id for row in db.query(Customer.id).all()}
+    finally:
+        db.close()
+
+
+def missing_labels(ns, customer_id: str, env: str):
+    """Labels to add to a legacy namespace, or {} if it is already labeled"""
+    labels = ns.metadata.labels or {}
+    wanted = {'customer': customer_id, 'environment': env, **parse_label_selector(TENANT_NAMESPACE_SELECTOR)}
+    return {key: value for key, value in wanted.items() if key not in labels}
+
+
+def backfill(core_api, apply: bool = False, customer_ids=None):
+    """
+    Label every legacy tenant namespace
+
+    Args:
+        core_api: CoreV1Api
+        apply: Patch namespaces (default: only report what would change)
+        customer_ids: Only label namespaces of these customers (default: any pattern match)
+
+    Returns:
+        Number of namespaces patched (or that would be patched)
+    """
+    changed = 0
+    for ns in core_api.list_namespace().items:
+        ns_name = ns.metadata.name
+        tenant = legacy_tenant(ns_name)
+        if not tenant:
+            continue
+        customer_id, env = tenant
+        if customer_ids is not None and customer_id not in customer_ids:
+            print(f"⏭️  {ns_name}: '{customer_id}' is not in the customers table, skipping")
+            continue
+
+        labels = missing_labels(ns, customer_id, env)
+        if not labels:
+            continue
+
+        changed += 1
+        if not apply:
+            print(f"🔎 {ns_name}: would add {labels}")
+            continue
+        try:
+            core_api.patch_namespace(ns_name, {'metadata': {'labels': labels}})
+            print(f"✅ {ns_name}: added {labels}")
+        except ApiException as e:
+            print(f"❌ {ns_name}: {e.reason}")
+    return changed
+
+
+def main():
+    """Main function for CLI usage"""
+    parser = argparse.ArgumentParser(description="Label legacy OpenLuffy tenant namespaces")
+    parser.add_argument('--apply', action='store_true', help="patch namespaces (default is a dry run)")
+    parser.add_argument('--known-customers-only', action='store_true',
+                        help="only label namespaces whose customer is in the customers table")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("OpenLuffy - Backfill Namespace Labels" + ("" if args.apply else " (dry run)"))
+    print("=" * 60)
+
+    try:
+        config.load_incluster_config()
+    except config.ConfigException:
+        config.load_kube_config()
+
+    customer_ids = load_customer_ids() if args.known_customers_only else None
+    changed = backfill(client.CoreV1Api(), apply=args.apply, customer_ids=customer_ids)
+
+    print()
+    if args.apply:
+        print(f"✅ Labeled {changed} namespace(s). Set LEGACY_NAMESPACE_SCAN=false once every tenant is labeled.")
+    else:
+        print(f"🔎 {changed} namespace(s) need labels. Re-run with --apply to patch them.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Micro-benchmark: model-object list deserialization vs the k8s_fastlist path
+
+Builds synthetic PodList / DeploymentList bodies shaped like real API
+responses and times both paths on the same bytes (no network):
+- model:    ApiClient.deserialize(...) into V1PodList / V1DeploymentList
+- fastlist: orjson (or json) parse + projection into compact records
+
+Run from backend/:
+    python benchmarks/fastlist_benchmark.py [--items 2000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kubernetes.client import ApiClient  # noqa: E402
+
+import k8s_fastlist as fastlist  # noqa: E402
+
+
+def pod(i):
+    ns = f"customer{i % 50}-dev"
+    return {
+        'metadata': {
+            'name': f"app-{i}-7d9f8c6b5-x{i:05d}",
+            'namespace': ns,
+            'uid': f"00000000-0000-0000-0000-{i:012d}",
+            'resourceVersion': str(100000 + i),
+            'creationTimestamp': '2024-05-01T12:00:00Z',
+            'labels': {'app': f"app-{i}", 'managed-by': 'openluffy', 'pod-template-hash': '7d9f8c6b5'},
+            'ownerReferences': [{'apiVersion': 'apps/v1', 'kind': 'ReplicaSet', 'name': f"app-{i}-7d9f8c6b5",
+                                 'uid': 'rs-uid', 'controller': True, 'blockOwnerDeletion': True}]
+        },
+        'spec': {
+            'containers': [{
+                'name': 'app',
+                'image': f"ghcr.io/example/app:{i % 7}",
+                'ports': [{'containerPort': 8080, 'protocol': 'TCP'}],
+                'env': [{'name': f"VAR_{k}", 'value': str(k)} for k in range(8)],
+                'resources': {'limits': {'cpu': '500m', 'memory': '256Mi'}, 'requests': {'cpu': '100m', 'memory': '128Mi'}},
+                'volumeMounts': [{'name': 'kube-api-access', 'mountPath': '/var/run/secrets/kubernetes.io/serviceaccount', 'readOnly': True}],
+                'livenessProbe': {'httpGet': {'path': '/healthz', 'port': 8080, 'scheme': 'HTTP'}, 'periodSeconds': 10},
+                'imagePullPolicy': 'IfNotPresent'
+            }],
+            'volumes': [{'name': 'kube-api-access', 'projected': {'sources': [{'serviceAccountToken': {'expirationSeconds': 3607, 'path': 'token'}}]}}],
+            'nodeName': f"node-{i % 5}",
+            'restartPolicy': 'Always',
+            'serviceAccountName': 'default'
+        },
+        'status': {
+            'phase': 'Running' if i % 10 else 'Pending',
+            'podIP': f"10.42.{i // 250}.{i % 250}",
+            'startTime': '2024-05-01T12:00:05Z',
+            'conditions': [{'type': t, 'status': 'True', 'lastTransitionTime': '2024-05-01T12:00:10Z'}
+                           for t in ('Initialized', 'Ready', 'ContainersReady', 'PodScheduled')],
+            'containerStatuses': [{
+                'name': 'app', 'ready': True, 'restartCount': i % 3, 'image': f"ghcr.io/example/app:{i % 7}",
+                'imageID': 'ghcr.io/example/app@sha256:' + '0' * 64, 'containerID': 'containerd://' + 'f' * 64,
+                'started': True, 'state': {'running': {'startedAt': '2024-05-01T12:00:08Z'}}
+            }]
+        }
+    }
+
+
+def deployment(i):
+    body = pod(i)
+    return {
+        'metadata': {k: v for k, v in body['metadata'].items() if k != 'ownerReferences'} | {'name': f"app-{i}"},
+        'spec': {
+            'replicas': 2,
+            'selector': {'matchLabels': {'app': f"app-{i}"}},
+            'template': {'metadata': {'labels': {'app': f"app-{i}"}}, 'spec': body['spec']},
+            'strategy': {'type': 'RollingUpdate', 'rollingUpdate': {'maxSurge': '25%', 'maxUnavailable': '25%'}}
+        },
+        'status': {
+            'replicas': 2, 'readyReplicas': 2 if i % 10 else 1, 'availableReplicas': 2, 'updatedReplicas': 2,
+            'observedGeneration': 3,
+            'conditions': [{'type': 'Available', 'status': 'True', 'reason': 'MinimumReplicasAvailable'}]
+        }
+    }
+
+
+class FakeResponse:
+    """Stands in for the urllib3 response returned with _preload_content=False"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def release_conn(self):
+        pass
+
+
+def measure(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    api_client = ApiClient()
+    cases = [
+        ('pods', 'V1PodList', pod, fastlist.project_pod),
+        ('deployments', 'V1DeploymentList', deployment, fastlist.project_deployment),
+    ]
+
+    print(f"JSON parser: {fastlist.JSON_PARSER}, items: {args.items}, best of {args.repeat}\n")
+    print(f"{'list':<12} {'path':<9} {'ms':>9} {'peak MiB':>9} {'speedup':>8}")
+    for name, model_type, make, project in cases:
+        data = json.dumps({
+            'apiVersion': 'v1', 'kind': model_type[2:],
+            'metadata': {'resourceVersion': '123456'},
+            'items': [make(i) for i in range(args.items)]
+        }).encode()
+
+        model_time, model_peak = measure(lambda: api_client.deserialize(FakeResponse(data), model_type), args.repeat)
+        fast_time, fast_peak = measure(lambda: fastlist.fast_list(lambda **kw: FakeResponse(data), project), args.repeat)
+
+        print(f"{name:<12} {'model':<9} {model_time * 1000:>9.1f} {model_peak / 2**20:>9.1f}")
+        print(f"{name:<12} {'fastlist':<9} {fast_time * 1000:>9.1f} {fast_peak / 2**20:>9.1f} {model_time / fast_time:>7.1f}x")
+        print(f"  body size: {len(data) / 2**20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: /pipelines/status via batched GraphQL vs one REST call per repo
+
+Runs PipelineTracker.status() against a local stub of the GitHub API
+(httpx.MockTransport, no network) for 3, 30 and 300 repos and reports the
+number of GitHub calls and wall-clock latency of each path. The stub adds
+a fixed round trip per call plus a small per-repo cost to GraphQL queries
+(server-side resolution of each aliased field).
+
+Run from backend/:
+    python benchmarks/pipelines_status_benchmark.py [--repos 3 30 300] [--rtt-ms 60] [--repeat 3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+import pipelines  # noqa: E402
+from github_client import GitHubClient  # noqa: E402
+
+CREATED_AT = '2024-05-01T12:00:00Z'
+
+
+def rest_run(repo_index):
+    return {
+        'id': 1000 + repo_index, 'name': 'CI', 'status': 'completed', 'conclusion': 'success',
+        'head_branch': pipelines.PIPELINES_BRANCH, 'head_sha': f"{repo_index:040x}",
+        'head_commit': {'message': 'Benchmark', 'author': {'name': 'bench'}}, 'run_attempt': 1,
+        'created_at': CREATED_AT, 'updated_at': CREATED_AT, 'run_started_at': CREATED_AT,
+        'html_url': f"https://github.com/org/repo{repo_index}/actions/runs/{1000 + repo_index}", 'jobs_url': ''
+    }
+
+
+def graphql_repo(repo_index):
+    run = rest_run(repo_index)
+    return {'ref': {'target': {'history': {'nodes': [{
+        'oid': run['head_sha'],
+        'checkSuites': {'nodes': [{
+            'status': 'COMPLETED', 'conclusion': 'SUCCESS', 'createdAt': CREATED_AT,
+            'workflowRun': {'databaseId': run['id'], 'url': run['html_url'], 'createdAt': CREATED_AT}
+        }]}
+    }]}}}}
+
+
+class GitHubStub:
+    """Answers runs listings and status queries after a simulated round trip"""
+
+    def __init__(self, rtt: float, per_repo: float):
+        self.rtt = rtt
+        self.per_repo = per_repo
+        self.calls = {'rest': 0, 'graphql': 0}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/graphql':
+            self.calls['graphql'] += 1
+            variables = json.loads(request.content)['variables']
+            aliases = [key[1:] for key in variables if key.startswith('n')]
+            await asyncio.sleep(self.rtt + self.per_repo * len(aliases))
+            data = {f"r{i}": graphql_repo(int(variables[f"n{i}"][4:])) for i in aliases}
+            data['rateLimit'] = {'cost': 1, 'remaining': 4999}
+            return httpx.Response(200, json={'data': data})
+
+        self.calls['rest'] += 1
+        await asyncio.sleep(self.rtt)
+        repo_index = int(request.url.path.split('/')[3][4:])
+        return httpx.Response(200, json={'total_count': 1, 'workflow_runs': [rest_run(repo_index)]})
+
+
+async def measure(repos: int, graphql: bool, rtt: float, per_repo: float, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        stub = GitHubStub(rtt, per_repo)
+        pipelines.github_api = GitHubClient(transport=httpx.MockTransport(stub))
+        tracker = pipelines.PipelineTracker()
+        tracker.graphql = graphql
+        sources = {f"customer{i}": {'repo': f"org/repo{i}", 'token': 'benchmark'} for i in range(repos)}
+        tracker.repos = lambda: dict(sources)
+
+        started = time.perf_counter()
+        result = await tracker.status()
+        best = min(best, time.perf_counter() - started)
+        await pipelines.github_api.close()
+        assert result['total'] == repos and not result['partial'], result
+    return best, stub.calls
+
+
+async def run(args):
+    print(f"stub round trip {args.rtt_ms:g} ms (+{args.per_repo_ms:g} ms per repo in a GraphQL query), "
+          f"REST concurrency {pipelines.PIPELINES_CONCURRENCY}, GraphQL batch {pipelines.graphql_batch_size()}, "
+          f"best of {args.repeat}\n")
+    print(f"{'repos':>6} {'path':<8} {'calls':>6} {'ms':>9} {'speedup':>8}")
+    for repos in args.repos:
+        rest_time, rest_calls = await measure(repos, False, args.rtt_ms / 1000, 0, args.repeat)
+        graphql_time, graphql_calls = await measure(repos, True, args.rtt_ms / 1000, args.per_repo_ms / 1000, args.repeat)
+        print(f"{repos:>6} {'rest':<8} {sum(rest_calls.values()):>6} {rest_time * 1000:>9.1f}")
+        print(f"{repos:>6} {'graphql':<8} {sum(graphql_calls.values()):>6} {graphql_time * 1000:>9.1f} {rest_time / graphql_time:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, nargs='+', default=[3, 30, 300])
+    parser.add_argument('--rtt-ms', type=float, default=60)
+    parser.add_argument('--per-repo-ms', type=float, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
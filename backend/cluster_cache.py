@@ -0,0 +1,358 @@
+"""
+Cluster Cache - Watch-backed in-memory view of namespaces, pods, deployments
+and ArgoCD Applications
+
+Informer pattern: each resource type is listed once, then watched from the
+returned resourceVersion and kept up to date from ADDED/MODIFIED/DELETED
+events. When the watch expires (410 Gone) the informer relists.
+
+main.py and tools.py read from the shared `cluster_cache` instance. A read
+against an informer that has not synced yet counts as a miss and falls
+through to the caller-supplied direct API call.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+# Server-side watch timeout; the watch is re-opened from the last seen resourceVersion
+WATCH_TIMEOUT_SECONDS = int(os.getenv('CLUSTER_CACHE_WATCH_TIMEOUT', '300'))
+# Delay before retrying after an unexpected list/watch failure
+RETRY_BACKOFF_SECONDS = int(os.getenv('CLUSTER_CACHE_RETRY_BACKOFF', '5'))
+# Namespace holding ArgoCD Application objects
+ARGOCD_NAMESPACE = os.getenv('ARGOCD_NAMESPACE', 'argocd')
+
+
+def object_meta(obj: Any) -> Tuple[Optional[str], str, Optional[str]]:
+    """Return (namespace, name, resource_version) for a model object or a raw dict"""
+    if isinstance(obj, dict):
+        metadata = obj.get('metadata', {})
+        return metadata.get('namespace'), metadata.get('name'), metadata.get('resourceVersion')
+    return obj.metadata.namespace, obj.metadata.name, obj.metadata.resource_version
+
+
+def object_labels(obj: Any) -> Dict[str, str]:
+    """Return the labels of a model object or a raw dict"""
+    if isinstance(obj, dict):
+        return obj.get('metadata', {}).get('labels') or {}
+    return obj.metadata.labels or {}
+
+
+def parse_label_selector(selector: str) -> Dict[str, str]:
+    """Parse an equality-based label selector ('a=b,c=d') into a dict"""
+    labels = {}
+    for term in filter(None, (t.strip() for t in selector.split(','))):
+        key, _, value = term.partition('=')
+        labels[key.strip()] = value.strip()
+    return labels
+
+
+def matches_selector(obj: Any, selector: Optional[Dict[str, str]]) -> bool:
+    """Equality-based label selector match (the only kind the backend uses)"""
+    if not selector:
+        return True
+    labels = object_labels(obj)
+    return all(labels.get(key) == value for key, value in selector.items())
+
+
+class ResourceInformer:
+    """
+    List-then-watch cache for a single resource type
+
+    Objects are indexed by namespace so per-namespace reads don't scan the
+    whole cluster. Listeners registered with add_listener() are called from
+    the watch thread as listener(event_type, obj), with event_type one of
+    ADDED, MODIFIED, DELETED or SYNC (full relist, obj is None).
+    """
+
+    def __init__(self, kind: str, list_func: Callable, **list_kwargs):
+        self.kind = kind
+        self.list_func = list_func
+        self.list_kwargs = list_kwargs
+
+        self._lock = threading.RLock()
+        self._store: Dict[Optional[str], Dict[str, Any]] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._watch: Optional[watch.Watch] = None
+
+        self.synced = False
+        self.resource_version: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        self.last_event: Optional[float] = None
+        self.relists = 0
+        self.events = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the list/watch loop in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"informer-{self.kind}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching (the current stream ends at its next event or timeout)"""
+        self._stop.set()
+        if self._watch:
+            self._watch.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._relist()
+                self._watch_loop()
+            except ApiException as e:
+                if e.status == 410:
+                    # resourceVersion too old - relist immediately
+                    print(f"🔄 {self.kind} watch expired, relisting")
+                    continue
+                self.errors += 1
+                print(f"⚠️ {self.kind} informer error: {e.reason}")
+                self._stop.wait(RETRY_BACKOFF_SECONDS)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ {self.kind} informer error: {e}")
+                self._stop.wait(RETRY_BACKOFF_SECONDS)
+
+    def _relist(self):
+        response = self.list_func(**self.list_kwargs)
+        items = response['items'] if isinstance(response, dict) else response.items
+        resource_version = (
+            response['metadata'].get('resourceVersion') if isinstance(response, dict)
+            else response.metadata.resource_version
+        )
+
+        store: Dict[Optional[str], Dict[str, Any]] = {}
+        for obj in items:
+            namespace, name, _ = object_meta(obj)
+            store.setdefault(namespace, {})[name] = obj
+
+        with self._lock:
+            self._store = store
+            self.resource_version = resource_version
+            self.synced = True
+            self.last_sync = time.time()
+            self.relists += 1
+
+        self._notify('SYNC', None)
+
+    def _watch_loop(self):
+        while not self._stop.is_set():
+            self._watch = watch.Watch()
+            for event in self._watch.stream(
+                self.list_func,
+                resource_version=self.resource_version,
+                timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                allow_watch_bookmarks=True,
+                **self.list_kwargs
+            ):
+                event_type = event['type']
+                if event_type == 'BOOKMARK':
+                    continue
+                if event_type == 'ERROR':
+                    raise ApiException(status=event['raw_object'].get('code'), reason=event['raw_object'].get('message'))
+
+                self._apply(event_type, event['object'])
+
+            # Stream timed out normally - resume from the last seen version
+            if self._watch.resource_version:
+                self.resource_version = self._watch.resource_version
+
+    def _apply(self, event_type: str, obj: Any):
+        namespace, name, resource_version = object_meta(obj)
+        with self._lock:
+            if event_type == 'DELETED':
+                bucket = self._store.get(namespace)
+                if bucket is not None:
+                    bucket.pop(name, None)
+                    if not bucket:
+                        del self._store[namespace]
+            else:
+                self._store.setdefault(namespace, {})[name] = obj
+            if resource_version:
+                self.resource_version = resource_version
+            self.events += 1
+            self.last_event = time.time()
+
+        self._notify(event_type, obj)
+
+    # ------------------------------------------------------------------
+    # Listeners
+    # ------------------------------------------------------------------
+
+    def add_listener(self, listener: Callable[[str, Any], None]):
+        """Register a callback for cache changes"""
+        self._listeners.append(listener)
+
+    def _notify(self, event_type: str, obj: Any):
+        for listener in list(self._listeners):
+            try:
+                listener(event_type, obj)
+            except Exception as e:
+                print(f"⚠️ {self.kind} listener failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def items(self, namespace: Optional[str] = None, selector: Optional[Dict[str, str]] = None) -> List[Any]:
+        """Cached objects sorted by (namespace, name), optionally filtered"""
+        with self._lock:
+            if namespace is not None:
+                buckets = [(namespace, self._store.get(namespace, {}))]
+            else:
+                buckets = list(self._store.items())
+            result = [
+                obj
+                for _, bucket in sorted(buckets, key=lambda b: b[0] or '')
+                for _, obj in sorted(bucket.items())
+                if matches_selector(obj, selector)
+            ]
+        return result
+
+    def get(self, namespace: Optional[str], name: str) -> Optional[Any]:
+        with self._lock:
+            return self._store.get(namespace, {}).get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            count = sum(len(bucket) for bucket in self._store.values())
+        return {
+            'synced': self.synced,
+            'items': count,
+            'resource_version': self.resource_version,
+            'age_seconds': round(now - self.last_sync, 1) if self.last_sync else None,
+            'last_event_seconds_ago': round(now - self.last_event, 1) if self.last_event else None,
+            'relists': self.relists,
+            'events': self.events,
+            'errors': self.errors
+        }
+
+
+class ClusterCache:
+    """Shared informers for namespaces, pods, deployments and ArgoCD apps with hit/miss accounting"""
+
+    KINDS = ('namespaces', 'pods', 'deployments', 'applications')
+
+    def __init__(self):
+        self.informers: Dict[str, ResourceInformer] = {}
+        self.hits: Dict[str, int] = {kind: 0 for kind in self.KINDS}
+        self.misses: Dict[str, int] = {kind: 0 for kind in self.KINDS}
+        self._counter_lock = threading.Lock()
+
+    def start(self, core_api, apps_api, custom_api=None):
+        """Create and start the informers (idempotent)
+
+        ArgoCD Applications are only watched when `custom_api` is given; they
+        are cached as raw dicts, like every custom object.
+        """
+        if self.informers:
+            return
+        self.informers = {
+            'namespaces': ResourceInformer('namespaces', core_api.list_namespace),
+            'pods': ResourceInformer('pods', core_api.list_pod_for_all_namespaces),
+            'deployments': ResourceInformer('deployments', apps_api.list_deployment_for_all_namespaces),
+        }
+        if custom_api is not None:
+            self.informers['applications'] = ResourceInformer(
+                'applications',
+                custom_api.list_namespaced_custom_object,
+                group='argoproj.io',
+                version='v1alpha1',
+                namespace=ARGOCD_NAMESPACE,
+                plural='applications'
+            )
+        for informer in self.informers.values():
+            informer.start()
+        print("✅ Cluster cache informers started")
+
+    def stop(self):
+        for informer in self.informers.values():
+            informer.stop()
+
+    def is_synced(self, kind: str) -> bool:
+        informer = self.informers.get(kind)
+        return bool(informer and informer.synced)
+
+    def version(self, *kinds: str) -> Optional[str]:
+        """Combined resourceVersion of the given informers; None unless all are synced"""
+        parts = []
+        for kind in kinds:
+            informer = self.informers.get(kind)
+            if not informer or not informer.synced:
+                return None
+            parts.append(f"{kind}:{informer.relists}:{informer.resource_version}")
+        return ','.join(parts)
+
+    def add_listener(self, kind: str, listener: Callable[[str, Any], None]) -> bool:
+        """Subscribe to changes of one resource type; False if the cache isn't running"""
+        informer = self.informers.get(kind)
+        if not informer:
+            return False
+        informer.add_listener(listener)
+        return True
+
+    def _read(self, kind: str, namespace: Optional[str], selector: Optional[Dict[str, str]],
+              fallback: Optional[Callable[[], List[Any]]]) -> List[Any]:
+        if self.is_synced(kind):
+            with self._counter_lock:
+                self.hits[kind] += 1
+            return self.informers[kind].items(namespace, selector)
+
+        with self._counter_lock:
+            self.misses[kind] += 1
+        return fallback() if fallback else []
+
+    def namespaces(self, selector: Optional[Dict[str, str]] = None,
+                   fallback: Optional[Callable[[], List[Any]]] = None) -> List[Any]:
+        """All namespaces; `fallback` returns the items of a direct list call on a miss"""
+        return self._read('namespaces', None, selector, fallback)
+
+    def pods(self, namespace: Optional[str] = None, selector: Optional[Dict[str, str]] = None,
+             fallback: Optional[Callable[[], List[Any]]] = None) -> List[Any]:
+        """Pods in one namespace (or cluster-wide when namespace is None)"""
+        return self._read('pods', namespace, selector, fallback)
+
+    def deployments(self, namespace: Optional[str] = None, selector: Optional[Dict[str, str]] = None,
+                    fallback: Optional[Callable[[], List[Any]]] = None) -> List[Any]:
+        """Deployments in one namespace (or cluster-wide when namespace is None)"""
+        return self._read('deployments', namespace, selector, fallback)
+
+    def applications(self, selector: Optional[Dict[str, str]] = None,
+                     fallback: Optional[Callable[[], List[Any]]] = None) -> List[Any]:
+        """ArgoCD Application dicts in ARGOCD_NAMESPACE"""
+        return self._read('applications', ARGOCD_NAMESPACE, selector, fallback)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            hits = dict(self.hits)
+            misses = dict(self.misses)
+        total_hits = sum(hits.values())
+        total = total_hits + sum(misses.values())
+        return {
+            'enabled': bool(self.informers),
+            'hit_ratio': round(total_hits / total, 3) if total else None,
+            'resources': {
+                kind: {
+                    'hits': hits[kind],
+                    'misses': misses[kind],
+                    **(self.informers[kind].stats() if kind in self.informers else {'synced': False})
+                }
+                for kind in self.KINDS
+            }
+        }
+
+
+# Global instance shared by main.py and tools.py
+cluster_cache = ClusterCache()
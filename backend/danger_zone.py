@@ -11,16 +11,11 @@ import httpx
 
 from database import get_db, Customer, User, AuditLog, APIToken, Integration, ProvisioningStep
 from auth import require_admin
-from kubernetes import client, config
+import k8s_client
 
-# Load Kubernetes config
-try:
-    config.load_incluster_config()
-except:
-    config.load_kube_config()
-
-k8s_apps = client.AppsV1Api()
-k8s_core = client.CoreV1Api()
+# Shared K8s clients (config, pool and timeouts live in k8s_client)
+k8s_apps = k8s_client.apps_v1()
+k8s_core = k8s_client.core_v1()
 
 
 # ============================================================================
@@ -417,7 +412,7 @@ async def delete_customer_permanently(
     db.add(audit)
     db.commit()
     
-    # Delete customer from database (cascades to integrations, provisioning_steps)
+    # Delete customer from database (cascades to integrations, provisioning jobs and steps)
     db.delete(customer)
     db.commit()
     deleted.append(f"Customer record: {customer.id}")
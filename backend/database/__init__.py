@@ -3,7 +3,7 @@ Database package for OpenLuffy
 """
 from .connection import engine, SessionLocal, init_db, get_db, get_db_session, check_db_connection
 from .models import (
-    Base, Customer, Integration, ProvisioningStep, 
+    Base, Customer, Integration, ProvisioningJob, ProvisioningStep, PipelineRun, PipelineJob,
     User, UserSession, AuditLog,
     Group, UserGroup, GroupCustomerAccess, UserCustomerAccess,
     APIToken
@@ -19,7 +19,10 @@ __all__ = [
     'Base',
     'Customer',
     'Integration',
+    'ProvisioningJob',
     'ProvisioningStep',
+    'PipelineRun',
+    'PipelineJob',
     'User',
     'UserSession',
     'AuditLog',
@@ -2,7 +2,7 @@
 Database connection and session management
 """
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 
@@ -23,12 +23,40 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def init_db():
-    """Initialize database (create tables)"""
+    """
+    Initialize database (create tables and apply migrations)
+
+    A new database gets every table from the models and is stamped at the
+    latest migration. One created before migrations is stamped at the
+    baseline and upgraded; versioned databases are upgraded.
+    """
+    from alembic import command
     from .models import Base
-    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        config = migrations_config(conn)
+        if not tables:
+            Base.metadata.create_all(bind=conn)
+            command.stamp(config, 'head')
+        else:
+            if 'alembic_version' not in tables:
+                command.stamp(config, '0001_baseline')
+            command.upgrade(config, 'head')
     print(f"✅ Database initialized: {DATABASE_URL}")
 
 
+def migrations_config(connection=None):
+    """Alembic config for database/migrations (runs on `connection` when given)"""
+    from alembic.config import Config
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend_dir, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(backend_dir, 'database', 'migrations'))
+    config.attributes['connection'] = connection
+    return config
+
+
 def get_db() -> Session:
     """
     FastAPI dependency to get database session
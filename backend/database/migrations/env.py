@@ -0,0 +1,53 @@
+"""
+Alembic environment: runs migrations against the backend's engine
+
+database.init_db() passes its open connection in config.attributes; the
+alembic CLI (run from backend/) connects with DATABASE_URL instead.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from database.connection import engine, DATABASE_URL
+from database.models import Base
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get('connection') is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout (alembic upgrade --sql)"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        _run(connection)
+        return
+    with engine.connect() as connection:
+        _run(connection)
+
+
+def _run(connection):
+    # Batch mode: SQLite can't ALTER constraints, so those tables are rebuilt
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
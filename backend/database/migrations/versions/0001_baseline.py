@@ -0,0 +1,22 @@
+"""Baseline: the schema Base.metadata.create_all() built before migrations
+
+Databases created before migrations were introduced are stamped with this
+revision by init_db() and upgraded from here.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
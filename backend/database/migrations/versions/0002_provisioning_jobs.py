@@ -0,0 +1,49 @@
+"""Provisioning jobs: job table plus job_id and timing on provisioning_steps
+
+Revision ID: 0002_provisioning_jobs
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002_provisioning_jobs'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'provisioning_jobs',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('customer_id', sa.String(100), sa.ForeignKey('customers.id'), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('message', sa.Text()),
+        sa.Column('result', sa.JSON()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime())
+    )
+    op.create_index('ix_provisioning_jobs_customer_id', 'provisioning_jobs', ['customer_id'])
+
+    with op.batch_alter_table('provisioning_steps') as batch:
+        batch.add_column(sa.Column('job_id', sa.String(36)))
+        batch.add_column(sa.Column('started_at', sa.DateTime()))
+        batch.add_column(sa.Column('completed_at', sa.DateTime()))
+        batch.add_column(sa.Column('duration_ms', sa.Integer()))
+        batch.create_foreign_key('fk_provisioning_steps_job_id', 'provisioning_jobs', ['job_id'], ['id'])
+        batch.create_index('ix_provisioning_steps_job_id', ['job_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('provisioning_steps') as batch:
+        batch.drop_index('ix_provisioning_steps_job_id')
+        batch.drop_constraint('fk_provisioning_steps_job_id', type_='foreignkey')
+        batch.drop_column('duration_ms')
+        batch.drop_column('completed_at')
+        batch.drop_column('started_at')
+        batch.drop_column('job_id')
+
+    op.drop_index('ix_provisioning_jobs_customer_id', table_name='provisioning_jobs')
+    op.drop_table('provisioning_jobs')
@@ -0,0 +1,84 @@
+"""Pipeline history: workflow runs and jobs for build statistics
+
+Revision ID: 0003_pipeline_history
+Revises: 0002_provisioning_jobs
+Create Date: 2026-10-17
+
+Databases that ran pipeline history before this revision already have the
+tables (init_db used to create them outside the migrations), so existing
+tables and indexes are left as they are.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003_pipeline_history'
+down_revision = '0002_provisioning_jobs'
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'pipeline_runs' not in tables:
+        op.create_table(
+            'pipeline_runs',
+            sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=False),
+            sa.Column('customer_id', sa.String(100), sa.ForeignKey('customers.id'), nullable=False),
+            sa.Column('repo', sa.String(200), nullable=False),
+            sa.Column('name', sa.String(200)),
+            sa.Column('head_branch', sa.String(255)),
+            sa.Column('head_sha', sa.String(40)),
+            sa.Column('status', sa.String(20)),
+            sa.Column('conclusion', sa.String(20)),
+            sa.Column('run_attempt', sa.Integer()),
+            sa.Column('html_url', sa.String(500)),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('run_started_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+            sa.Column('queue_seconds', sa.Float()),
+            sa.Column('duration_seconds', sa.Float()),
+            sa.Column('synced_at', sa.DateTime())
+        )
+    indexes = _existing_indexes(sa.inspect(op.get_bind()), 'pipeline_runs')
+    if 'ix_pipeline_runs_customer_branch_created' not in indexes:
+        op.create_index('ix_pipeline_runs_customer_branch_created', 'pipeline_runs',
+                        ['customer_id', 'head_branch', 'created_at'])
+    if 'ix_pipeline_runs_customer_status' not in indexes:
+        op.create_index('ix_pipeline_runs_customer_status', 'pipeline_runs', ['customer_id', 'status'])
+
+    if 'pipeline_jobs' not in tables:
+        op.create_table(
+            'pipeline_jobs',
+            sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=False),
+            sa.Column('run_id', sa.BigInteger(), nullable=False),
+            sa.Column('customer_id', sa.String(100), sa.ForeignKey('customers.id'), nullable=False),
+            sa.Column('name', sa.String(200)),
+            sa.Column('status', sa.String(20)),
+            sa.Column('conclusion', sa.String(20)),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('started_at', sa.DateTime()),
+            sa.Column('completed_at', sa.DateTime()),
+            sa.Column('queue_seconds', sa.Float()),
+            sa.Column('duration_seconds', sa.Float())
+        )
+    indexes = _existing_indexes(sa.inspect(op.get_bind()), 'pipeline_jobs')
+    if 'ix_pipeline_jobs_run_id' not in indexes:
+        op.create_index('ix_pipeline_jobs_run_id', 'pipeline_jobs', ['run_id'])
+    if 'ix_pipeline_jobs_customer_created' not in indexes:
+        op.create_index('ix_pipeline_jobs_customer_created', 'pipeline_jobs', ['customer_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_pipeline_jobs_customer_created', table_name='pipeline_jobs')
+    op.drop_index('ix_pipeline_jobs_run_id', table_name='pipeline_jobs')
+    op.drop_table('pipeline_jobs')
+
+    op.drop_index('ix_pipeline_runs_customer_status', table_name='pipeline_runs')
+    op.drop_index('ix_pipeline_runs_customer_branch_created', table_name='pipeline_runs')
+    op.drop_table('pipeline_runs')
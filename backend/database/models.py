@@ -1,7 +1,7 @@
 """
 Database models for OpenLuffy
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Text, JSON, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -23,6 +23,9 @@ class Customer(Base):
     # Relationships
     integrations = relationship("Integration", back_populates="customer", cascade="all, delete-orphan")
     provisioning_steps = relationship("ProvisioningStep", back_populates="customer", cascade="all, delete-orphan")
+    provisioning_jobs = relationship("ProvisioningJob", back_populates="customer", cascade="all, delete-orphan")
+    pipeline_runs = relationship("PipelineRun", back_populates="customer", cascade="all, delete-orphan")
+    pipeline_jobs = relationship("PipelineJob", back_populates="customer", cascade="all, delete-orphan")
     
     def to_dict(self):
         return {
@@ -65,28 +68,169 @@ class Integration(Base):
         }
 
 
+class ProvisioningJob(Base):
+    """Background onboarding run for one customer (POST /customers/create)"""
+    __tablename__ = 'provisioning_jobs'
+    
+    id = Column(String(36), primary_key=True)  # UUID returned to the client
+    customer_id = Column(String(100), ForeignKey('customers.id'), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # pending, running, success, partial, error
+    message = Column(Text)
+    result = Column(JSON)  # Summary of what was created (github, k8s, argocd)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    
+    # Relationships
+    customer = relationship("Customer", back_populates="provisioning_jobs")
+    steps = relationship("ProvisioningStep", back_populates="job", order_by="ProvisioningStep.id")
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'customer_id': self.customer_id,
+            'status': self.status,
+            'message': self.message,
+            'result': self.result,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'steps': [step.to_dict() for step in self.steps]
+        }
+
+
 class ProvisioningStep(Base):
     """Track customer provisioning progress (for AWS EKS-style status view)"""
     __tablename__ = 'provisioning_steps'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(String(100), ForeignKey('customers.id'), nullable=False)
+    job_id = Column(String(36), ForeignKey('provisioning_jobs.id', name='fk_provisioning_steps_job_id'), index=True)
     step = Column(String(100), nullable=False)  # repo_created, namespaces_created, argocd_synced, etc.
-    status = Column(String(20), nullable=False)  # pending, running, success, error
+    status = Column(String(20), nullable=False)  # pending, running, success, error, skipped
     message = Column(Text)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    duration_ms = Column(Integer)
     
     # Relationships
     customer = relationship("Customer", back_populates="provisioning_steps")
+    job = relationship("ProvisioningJob", back_populates="steps")
     
     def to_dict(self):
         return {
             'id': self.id,
             'customer_id': self.customer_id,
+            'job_id': self.job_id,
             'step': self.step,
             'status': self.status,
             'message': self.message,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'duration_ms': self.duration_ms
+        }
+
+
+# ============================================================================
+# PIPELINE HISTORY
+# ============================================================================
+
+class PipelineRun(Base):
+    """GitHub Actions workflow run (history for build statistics)"""
+    __tablename__ = 'pipeline_runs'
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=False)  # GitHub run ID
+    customer_id = Column(String(100), ForeignKey('customers.id'), nullable=False)
+    repo = Column(String(200), nullable=False)  # org/repo
+    name = Column(String(200))  # Workflow name
+    head_branch = Column(String(255))
+    head_sha = Column(String(40))
+    status = Column(String(20))  # queued, in_progress, completed
+    conclusion = Column(String(20))  # success, failure, cancelled, ...
+    run_attempt = Column(Integer, default=1)
+    html_url = Column(String(500))
+    
+    # GitHub timestamps (UTC)
+    created_at = Column(DateTime)
+    run_started_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    
+    # Derived at write time so statistics never re-parse timestamps
+    queue_seconds = Column(Float)  # run_started_at - created_at
+    duration_seconds = Column(Float)  # updated_at - run_started_at (completed runs only)
+    
+    synced_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    customer = relationship("Customer", back_populates="pipeline_runs")
+    
+    __table_args__ = (
+        # Statistics per customer/branch over a time window
+        Index('ix_pipeline_runs_customer_branch_created', 'customer_id', 'head_branch', 'created_at'),
+        # Incremental sync watermark and open-run lookups
+        Index('ix_pipeline_runs_customer_status', 'customer_id', 'status'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'customer_id': self.customer_id,
+            'repo': self.repo,
+            'name': self.name,
+            'branch': self.head_branch,
+            'commit_sha': (self.head_sha or '')[:7],
+            'status': self.status,
+            'conclusion': self.conclusion,
+            'run_attempt': self.run_attempt,
+            'url': self.html_url,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'run_started_at': self.run_started_at.isoformat() if self.run_started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'queue_seconds': self.queue_seconds,
+            'duration_seconds': self.duration_seconds
+        }
+
+
+class PipelineJob(Base):
+    """Job of a GitHub Actions workflow run"""
+    __tablename__ = 'pipeline_jobs'
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=False)  # GitHub job ID
+    run_id = Column(BigInteger, nullable=False, index=True)  # No FK: job deliveries can precede their run
+    customer_id = Column(String(100), ForeignKey('customers.id'), nullable=False)
+    name = Column(String(200))
+    status = Column(String(20))
+    conclusion = Column(String(20))
+    
+    created_at = Column(DateTime)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    
+    queue_seconds = Column(Float)  # started_at - created_at
+    duration_seconds = Column(Float)  # completed_at - started_at
+    
+    # Relationships
+    customer = relationship("Customer", back_populates="pipeline_jobs")
+    
+    __table_args__ = (
+        Index('ix_pipeline_jobs_customer_created', 'customer_id', 'created_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'run_id': self.run_id,
+            'customer_id': self.customer_id,
+            'name': self.name,
+            'status': self.status,
+            'conclusion': self.conclusion,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'queue_seconds': self.queue_seconds,
+            'duration_seconds': self.duration_seconds
         }
 
 
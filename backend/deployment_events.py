@@ -0,0 +1,90 @@
+"""
+Deployment Events - server-side filtered event queries with top-K ordering
+
+Instead of listing every event in a namespace and substring-matching
+involvedObject.name, events are queried with field selectors for exactly the
+objects that belong to a deployment: the Deployment itself, its most recent
+ReplicaSets and its pods. The newest events are then picked with a heap
+ordered by real timestamps, so payload and latency scale with the
+deployment's events rather than the namespace's.
+"""
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Tuple
+
+# ReplicaSets kept by revisionHistoryLimit are mostly idle; only query the newest few
+EVENT_MAX_REPLICASETS = int(os.getenv('EVENT_MAX_REPLICASETS', '3'))
+# Parallel field-selector queries per request
+EVENT_QUERY_WORKERS = int(os.getenv('EVENT_QUERY_WORKERS', '8'))
+
+_executor = ThreadPoolExecutor(max_workers=EVENT_QUERY_WORKERS, thread_name_prefix='events')
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def event_timestamp(event: Any) -> datetime:
+    """Best available timestamp for an event (core/v1 events fill different fields)"""
+    for value in (
+        event.last_timestamp,
+        event.event_time,
+        event.first_timestamp,
+        event.metadata.creation_timestamp if event.metadata else None
+    ):
+        if value:
+            return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return _EPOCH
+
+
+def newest_events(events: Iterable[Any], limit: int) -> List[Any]:
+    """Top-K events by timestamp, newest first, without sorting the whole list"""
+    return heapq.nlargest(limit, events, key=event_timestamp)
+
+
+def deployment_objects(apps_api, namespace: str, deployment: Any, pods: Optional[List[Any]] = None) -> List[Tuple[str, str]]:
+    """(kind, name) of the Deployment, its newest ReplicaSets and its pods"""
+    objects = [('Deployment', deployment.metadata.name)]
+
+    match_labels = deployment.spec.selector.match_labels or {}
+    label_selector = ','.join(f"{k}={v}" for k, v in match_labels.items())
+
+    replica_sets = apps_api.list_namespaced_replica_set(namespace, label_selector=label_selector).items
+    owned = [
+        rs for rs in replica_sets
+        if any(ref.uid == deployment.metadata.uid for ref in (rs.metadata.owner_references or []))
+    ]
+    owned.sort(key=lambda rs: rs.metadata.creation_timestamp or _EPOCH, reverse=True)
+    objects.extend(('ReplicaSet', rs.metadata.name) for rs in owned[:EVENT_MAX_REPLICASETS])
+
+    objects.extend(('Pod', pod.metadata.name) for pod in (pods or []))
+    return objects
+
+
+def list_deployment_events(core_api, apps_api, namespace: str, deployment: Any,
+                           pods: Optional[List[Any]] = None, limit: int = 10) -> Tuple[List[Any], int]:
+    """
+    Newest events for a deployment and the objects it owns
+
+    Returns (events, total) where events holds at most `limit` V1Event objects,
+    newest first, and total is the number of matching events.
+    """
+    objects = deployment_objects(apps_api, namespace, deployment, pods)
+
+    def query(obj: Tuple[str, str]) -> List[Any]:
+        kind, name = obj
+        return core_api.list_namespaced_event(
+            namespace,
+            field_selector=f"involvedObject.kind={kind},involvedObject.name={name}"
+        ).items
+
+    seen = set()
+    matching = []
+    for items in _executor.map(query, objects):
+        for event in items:
+            if event.metadata.uid in seen:
+                continue
+            seen.add(event.metadata.uid)
+            matching.append(event)
+
+    return newest_events(matching, limit), len(matching)
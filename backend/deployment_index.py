@@ -0,0 +1,220 @@
+"""
+Deployment Index - O(1) deployment ID resolution
+
+Deployment IDs are "{namespace}-{deployment-name}" and both parts can contain
+hyphens, so an ID can't be split reliably. This index maps every deployment
+ID in a tenant namespace to its (namespace, name) pair.
+
+Tenant namespaces come from the customer/environment namespace labels, from
+the customers table ("{customer-id}-{env}"), and from legacy "-dev",
+"-preprod", "-prod" names while the legacy namespace scan is enabled (see
+namespace_discovery). When the cluster cache is running the index is
+updated incrementally from its namespace and deployment events; otherwise it
+is rebuilt (rate-limited) when a lookup misses.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from cluster_cache import cluster_cache, object_labels
+from namespace_discovery import ENVIRONMENTS, tenant_for, tenant_namespaces
+import k8s_fastlist as fastlist
+
+# Minimum time between on-miss rebuilds when the cache isn't driving the index
+REBUILD_INTERVAL_SECONDS = int(os.getenv('DEPLOYMENT_INDEX_REBUILD_INTERVAL', '10'))
+
+
+class DeploymentIndex:
+    """Maintained map of deployment ID -> (namespace, deployment name)"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Tuple[str, str]] = {}
+        self._ids_by_namespace: Dict[str, Set[str]] = {}
+        self._tenants: Dict[str, Tuple[str, str]] = {}  # namespace -> (customer, env)
+        self._customer_ids: Set[str] = set()
+        self._core_api = None
+        self._apps_api = None
+        self.live = False  # True when driven by cluster cache events
+        self.built_at: Optional[float] = None
+        self.rebuilds = 0
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, core_api, apps_api):
+        """Load customers, build the index and subscribe to cache events"""
+        self._core_api = core_api
+        self._apps_api = apps_api
+        self._customer_ids = self._load_customer_ids()
+
+        namespaces_live = cluster_cache.add_listener('namespaces', self._on_namespace_event)
+        deployments_live = cluster_cache.add_listener('deployments', self._on_deployment_event)
+        self.live = namespaces_live and deployments_live
+
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"⚠️ Failed to build deployment index: {e}")
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _load_customer_ids(self) -> Set[str]:
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, Customer
+
+            db = SessionLocal()
+            try:
+                return {row.id for row in db.query(Customer.id).all()}
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Deployment index could not load customers: {e}")
+            return set(self._customer_ids)
+
+    def refresh_customers(self):
+        """Re-read the customers table (after onboarding/offboarding) and rebuild"""
+        self._customer_ids = self._load_customer_ids()
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"⚠️ Failed to rebuild deployment index: {e}")
+
+    def rebuild(self):
+        """Full rebuild from the cluster cache (or one direct list call per resource)"""
+        namespaces = tenant_namespaces(self._core_api)
+        deployments = cluster_cache.deployments(
+            fallback=lambda: fastlist.list_deployments(self._apps_api.list_deployment_for_all_namespaces)
+        )
+
+        tenants: Dict[str, Tuple[str, str]] = {}
+        for customer_id in self._customer_ids:
+            for env in ENVIRONMENTS:
+                tenants[f"{customer_id}-{env}"] = (customer_id, env)
+        for ns, customer_id, env in namespaces:
+            tenants[ns.metadata.name] = (customer_id, env)
+
+        by_id: Dict[str, Tuple[str, str]] = {}
+        ids_by_namespace: Dict[str, Set[str]] = {}
+        for deploy in deployments:
+            namespace = deploy.metadata.namespace
+            if namespace not in tenants:
+                continue
+            deployment_id = f"{namespace}-{deploy.metadata.name}"
+            by_id[deployment_id] = (namespace, deploy.metadata.name)
+            ids_by_namespace.setdefault(namespace, set()).add(deployment_id)
+
+        with self._lock:
+            self._tenants = tenants
+            self._by_id = by_id
+            self._ids_by_namespace = ids_by_namespace
+            self.built_at = time.time()
+            self.rebuilds += 1
+
+    # ------------------------------------------------------------------
+    # Incremental updates (called from cluster cache watch threads)
+    # ------------------------------------------------------------------
+
+    def _add(self, namespace: str, name: str):
+        deployment_id = f"{namespace}-{name}"
+        self._by_id[deployment_id] = (namespace, name)
+        self._ids_by_namespace.setdefault(namespace, set()).add(deployment_id)
+
+    def _remove(self, namespace: str, name: str):
+        deployment_id = f"{namespace}-{name}"
+        self._by_id.pop(deployment_id, None)
+        ids = self._ids_by_namespace.get(namespace)
+        if ids is not None:
+            ids.discard(deployment_id)
+            if not ids:
+                del self._ids_by_namespace[namespace]
+
+    def _on_deployment_event(self, event_type: str, deploy: Any):
+        if event_type == 'SYNC':
+            self.rebuild()
+            return
+        namespace, name = deploy.metadata.namespace, deploy.metadata.name
+        with self._lock:
+            if namespace not in self._tenants:
+                return
+            if event_type == 'DELETED':
+                self._remove(namespace, name)
+            else:
+                self._add(namespace, name)
+
+    def _on_namespace_event(self, event_type: str, ns: Any):
+        if event_type == 'SYNC':
+            self.rebuild()
+            return
+        ns_name = ns.metadata.name
+        with self._lock:
+            if event_type == 'DELETED':
+                self._tenants.pop(ns_name, None)
+                for deployment_id in self._ids_by_namespace.pop(ns_name, set()):
+                    self._by_id.pop(deployment_id, None)
+                return
+
+            tenant = tenant_for(ns_name, object_labels(ns))
+            if not tenant:
+                return
+            known = ns_name in self._tenants
+            self._tenants[ns_name] = tenant
+            if known:
+                return
+
+        # New tenant namespace - index any deployments already cached for it
+        for deploy in cluster_cache.deployments(ns_name):
+            with self._lock:
+                self._add(ns_name, deploy.metadata.name)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def resolve(self, deployment_id: str) -> Optional[Tuple[str, str]]:
+        """Return (namespace, deployment name) for a deployment ID, or None"""
+        with self._lock:
+            location = self._by_id.get(deployment_id)
+
+        if location is None and not self.live and self._apps_api is not None:
+            # Not event-driven - the deployment may be newer than the index
+            if not self.built_at or time.time() - self.built_at >= REBUILD_INTERVAL_SECONDS:
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    print(f"⚠️ Failed to rebuild deployment index: {e}")
+                with self._lock:
+                    location = self._by_id.get(deployment_id)
+
+        if location is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return location
+
+    def tenant(self, namespace: str) -> Optional[Tuple[str, str]]:
+        """(customer, env) for a tenant namespace"""
+        with self._lock:
+            return self._tenants.get(namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._by_id)
+            tenants = len(self._tenants)
+        return {
+            'live': self.live,
+            'deployments': size,
+            'tenant_namespaces': tenants,
+            'customers': len(self._customer_ids),
+            'age_seconds': round(time.time() - self.built_at, 1) if self.built_at else None,
+            'rebuilds': self.rebuilds,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Global instance
+deployment_index = DeploymentIndex()
@@ -0,0 +1,113 @@
+"""
+Deployment Pages - keyset pagination for GET /deployments
+
+Deployments are listed in (namespace, name) order and a page cursor is the
+(namespace, name) of the last row served, so deployments created or deleted
+between requests don't shift later pages. Walking the tenant namespaces
+stops once a page is full: a page costs O(limit) rows rather than a full
+cluster snapshot.
+"""
+import base64
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from kubernetes.client.rest import ApiException
+
+from cluster_cache import cluster_cache
+from namespace_discovery import tenant_namespaces
+from singleflight import shared, SINGLEFLIGHT_TTL
+import k8s_fastlist as fastlist
+
+# Upper bound for one /deployments page
+DEPLOYMENTS_PAGE_MAX = int(os.getenv('DEPLOYMENTS_PAGE_MAX', '500'))
+
+
+def encode_cursor(namespace: str, name: str) -> str:
+    """Opaque keyset cursor: the (namespace, name) of the last item on a page"""
+    return base64.urlsafe_b64encode(json.dumps([namespace, name]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(namespace, name) from a cursor; ValueError if it isn't one"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        namespace, name = json.loads(base64.urlsafe_b64decode(padded))
+        return str(namespace), str(name)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def deployment_row(deploy, customer_id: str, env: str) -> Dict[str, Any]:
+    ns_name = deploy.metadata.namespace
+    name = deploy.metadata.name
+    replicas = deploy.status.replicas or 0
+    ready = deploy.status.ready_replicas or 0
+    return {
+        'id': f"{ns_name}-{name}",
+        'name': name,
+        'namespace': ns_name,
+        'customer': customer_id,
+        'environment': env,
+        'replicas': replicas,
+        'ready': ready,
+        'status': 'running' if ready == replicas and ready > 0 else 'degraded',
+        'image': deploy.spec.template.spec.containers[0].image
+    }
+
+
+def list_deployments(core_api, apps_api, customer: Optional[str] = None, environment: Optional[str] = None,
+                     status: Optional[str] = None, limit: Optional[int] = None,
+                     after: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+    """One page of deployment rows in customer namespaces (every match without limit/after)"""
+    deployments = []
+    has_more = False
+    
+    # Discover customer namespaces (label-selected, sorted by name)
+    try:
+        for ns_obj, customer_id, env in tenant_namespaces(core_api):
+            ns_name = ns_obj.metadata.name
+            if after and ns_name < after[0]:
+                continue
+            
+            if (customer and customer_id != customer) or (environment and env != environment):
+                continue
+            
+            # Get deployments from this namespace
+            try:
+                deploys = cluster_cache.deployments(ns_name, fallback=shared(
+                    ('fastlist.list_namespaced_deployment', ns_name),
+                    lambda: fastlist.list_deployments(apps_api.list_namespaced_deployment, ns_name),
+                    SINGLEFLIGHT_TTL
+                ))
+            except ApiException as e:
+                # Namespace exists but no deployments or access denied
+                continue
+            
+            for deploy in sorted(deploys, key=lambda d: d.metadata.name):
+                if after and (ns_name, deploy.metadata.name) <= after:
+                    continue
+                row = deployment_row(deploy, customer_id, env)
+                if status and row['status'] != status:
+                    continue
+                if limit is not None and len(deployments) == limit:
+                    has_more = True
+                    break
+                deployments.append(row)
+            
+            if has_more:
+                break
+    
+    except Exception as e:
+        print(f"Error discovering deployments: {e}")
+    
+    if limit is None and after is None:
+        return {'deployments': deployments, 'total': len(deployments)}
+    
+    last = deployments[-1] if deployments else None
+    return {
+        'deployments': deployments,
+        'count': len(deployments),
+        'limit': limit,
+        'next_cursor': encode_cursor(last['namespace'], last['name']) if has_more and last else None
+    }
@@ -0,0 +1,112 @@
+"""
+ETags - conditional GET support for the polled JSON endpoints
+
+Two kinds of strong ETag:
+- version ETags, built from upstream resourceVersions (the cluster cache) and
+  request parameters *before* the body is built, so an unchanged poll is
+  answered with 304 without rebuilding anything;
+- content ETags, a hash of the serialized body, for data without a version
+  (GitHub, or while the cluster cache hasn't synced). These still skip the
+  transfer but not the rebuild.
+
+Usage:
+    etag = version_etag('deployments', cluster_cache.version('deployments'))
+    if etag_matches(request, etag):
+        return not_modified('/deployments', etag)
+    return conditional_json(request, '/deployments', build_body(), etag)
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# Clients must revalidate, but may keep the body and send If-None-Match
+CACHE_CONTROL = 'no-cache'
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(endpoint: str, not_modified: bool, rebuilt: bool):
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, {'requests': 0, 'not_modified': 0, 'rebuilds_skipped': 0})
+        stats['requests'] += 1
+        if not_modified:
+            stats['not_modified'] += 1
+            if not rebuilt:
+                stats['rebuilds_skipped'] += 1
+
+
+def _digest(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def version_etag(*parts: Any) -> Optional[str]:
+    """ETag from upstream versions and parameters; None if any version is unknown"""
+    if any(part is None for part in parts):
+        return None
+    return _digest(json.dumps(parts, sort_keys=True, default=str).encode())
+
+
+def fingerprint(data: Any) -> str:
+    """Short stable hash of in-memory state that feeds a response"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for GET)"""
+    if not etag:
+        return False
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in header.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def not_modified(endpoint: str, etag: str) -> Response:
+    """304 for a version ETag match (body never built)"""
+    _count(endpoint, not_modified=True, rebuilt=False)
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+
+
+def conditional_json(request: Request, endpoint: str, body: Dict[str, Any], etag: Optional[str] = None,
+                     volatile: Iterable[str] = ()) -> Response:
+    """
+    JSON response with an ETag, or 304 if the client already has this body
+
+    Without a version `etag` the body is hashed; top-level `volatile` keys
+    (timings and other per-request metadata) are left out of the hash.
+    """
+    if etag is None:
+        stable = {key: value for key, value in body.items() if key not in volatile}
+        etag = _digest(json.dumps(stable, sort_keys=True, default=str).encode())
+
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(request, etag):
+        _count(endpoint, not_modified=True, rebuilt=True)
+        return Response(status_code=304, headers=headers)
+
+    _count(endpoint, not_modified=False, rebuilt=True)
+    return JSONResponse(content=jsonable_encoder(body), headers=headers)
+
+
+def etag_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        endpoints = {endpoint: dict(stats) for endpoint, stats in _stats.items()}
+    requests = sum(stats['requests'] for stats in endpoints.values())
+    not_modified_total = sum(stats['not_modified'] for stats in endpoints.values())
+    for stats in endpoints.values():
+        stats['not_modified_ratio'] = round(stats['not_modified'] / stats['requests'], 3) if stats['requests'] else None
+    return {
+        'requests': requests,
+        'not_modified': not_modified_total,
+        'not_modified_ratio': round(not_modified_total / requests, 3) if requests else None,
+        'endpoints': endpoints
+    }
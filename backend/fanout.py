@@ -0,0 +1,78 @@
+"""
+Fan-out - run independent probes concurrently under one shared deadline
+
+Per-environment lookups (ArgoCD apps, deployments, namespaces) used to run
+one after another, so a request cost the sum of every call. fan_out() starts
+them together and waits at most `deadline` seconds: latency is set by the
+slowest probe, and a probe that fails or times out is reported next to the
+others instead of failing the whole request.
+
+Usage:
+    results = await fan_out({
+        'argocd:dev': lambda: run_k8s(custom_api.get_namespaced_custom_object, ...),
+        'deployments:dev': lambda: run_k8s(cluster_cache.deployments, 'acme-dev'),
+    })
+    if results['argocd:dev']['ok']:
+        app = results['argocd:dev']['value']
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Shared deadline for one fan-out, in seconds
+FANOUT_DEADLINE = float(os.getenv('FANOUT_DEADLINE', '10'))
+
+
+async def _timed(factory: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        value = await factory()
+        result = {'ok': True, 'value': value}
+    except Exception as e:
+        result = {'ok': False, 'error': str(e), 'exception': e}
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def fan_out(probes: Dict[str, Callable[[], Awaitable[Any]]],
+                  deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every probe concurrently and collect per-probe outcomes
+
+    Returns {name: {'ok', 'value' | 'error' + 'exception', 'elapsed_ms'}}.
+    Probes still running at the deadline are cancelled and reported with
+    ok=False and a timeout error.
+    """
+    deadline = FANOUT_DEADLINE if deadline is None else deadline
+    tasks = {name: asyncio.create_task(_timed(factory)) for name, factory in probes.items()}
+    if not tasks:
+        return {}
+
+    await asyncio.wait(tasks.values(), timeout=deadline)
+
+    results = {}
+    for name, task in tasks.items():
+        if task.done():
+            results[name] = task.result()
+        else:
+            task.cancel()
+            results[name] = {
+                'ok': False,
+                'error': f"timed out after {deadline:g}s",
+                'exception': asyncio.TimeoutError(),
+                'elapsed_ms': round(deadline * 1000, 1)
+            }
+    return results
+
+
+def probe_summary(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-probe status and timing without values, for API responses"""
+    return {
+        name: {
+            'ok': result['ok'],
+            'elapsed_ms': result['elapsed_ms'],
+            **({} if result['ok'] else {'error': result['error']})
+        }
+        for name, result in results.items()
+    }
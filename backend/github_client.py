@@ -0,0 +1,460 @@
+"""
+GitHub Client - one pooled, application-lifetime client for api.github.com
+
+Pipeline endpoints used to open a new httpx.AsyncClient per request (a TLS
+handshake to api.github.com on every UI poll), and customer onboarding /
+offboarding used blocking `requests` calls inside async handlers. All GitHub
+traffic now goes through a single AsyncClient with keep-alive, HTTP/2 (when
+the `h2` package from httpx[http2] is installed), explicit timeouts and a
+bounded connection pool.
+
+GETs made with `cache=True` go through a conditional-request cache keyed by
+URL (and token): the stored ETag / Last-Modified is sent back as
+If-None-Match / If-Modified-Since, and a 304 - which GitHub doesn't count
+against the rate limit - is answered from the stored body. Responses an
+`immutable` predicate accepts (e.g. the job list of a completed run) are
+served without revalidating at all. The cache is an LRU bounded in bytes.
+Concurrent identical cached GETs share one request (see singleflight).
+
+Every request also passes a scheduler that tracks the rate-limit budget of
+each token from the X-RateLimit-* response headers:
+- in-flight requests are capped; waiting `interactive` requests (UI reads)
+  are admitted before `background` ones (refresh loops);
+- background requests are deferred once a token's remaining budget drops
+  below GITHUB_BACKGROUND_RESERVE of its limit, keeping the rest for users;
+- an exhausted token (primary limit) is paused until its reset time, and a
+  secondary-limit response pauses it for Retry-After or an exponential
+  backoff;
+- while a token is paused, requests raise RateLimited without calling
+  GitHub, and cached GETs are answered with the stale cached body instead.
+Consumption is counted per customer for /metrics. GraphQL queries (see
+graphql()) have their own hourly budget on GitHub and are tracked
+separately from REST calls.
+
+Usage:
+    response = await github_api.get(f"/repos/{repo}/actions/runs", params={'per_page': 10}, cache=True)
+    response = await github_api.request('PATCH', f"/repos/{org}/{repo}", token=token, json={...})
+    body = await github_api.graphql(query, variables={'owner': org})
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import httpx
+
+from singleflight import singleflight
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
+# GraphQL endpoint: path relative to GITHUB_API_URL, or a full URL (GitHub Enterprise Server: https://<host>/api/graphql)
+GITHUB_GRAPHQL_PATH = os.getenv('GITHUB_GRAPHQL_PATH', '/graphql')
+# Server-wide token for read-only calls (per-customer tokens are passed explicitly)
+GITHUB_TOKEN = os.getenv('GITHUB_TOKEN', '')
+# Negotiate HTTP/2 (one multiplexed connection) when h2 is installed
+GITHUB_HTTP2 = os.getenv('GITHUB_HTTP2', 'true').lower() == 'true' and HTTP2_AVAILABLE
+# Connection limits for api.github.com
+GITHUB_MAX_CONNECTIONS = int(os.getenv('GITHUB_MAX_CONNECTIONS', '20'))
+GITHUB_MAX_KEEPALIVE = int(os.getenv('GITHUB_MAX_KEEPALIVE', '10'))
+# Timeouts in seconds
+GITHUB_CONNECT_TIMEOUT = float(os.getenv('GITHUB_CONNECT_TIMEOUT', '5'))
+GITHUB_READ_TIMEOUT = float(os.getenv('GITHUB_READ_TIMEOUT', '15'))
+# Memory bound for cached response bodies (LRU eviction beyond it)
+GITHUB_CACHE_MAX_BYTES = int(os.getenv('GITHUB_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Concurrent GitHub requests admitted by the scheduler
+GITHUB_MAX_IN_FLIGHT = int(os.getenv('GITHUB_MAX_IN_FLIGHT', str(GITHUB_MAX_CONNECTIONS)))
+# Share of each token's hourly limit kept for interactive requests
+GITHUB_BACKGROUND_RESERVE = float(os.getenv('GITHUB_BACKGROUND_RESERVE', '0.2'))
+# First pause after a secondary-limit response without Retry-After (doubles per repeat)
+GITHUB_SECONDARY_BACKOFF = float(os.getenv('GITHUB_SECONDARY_BACKOFF', '60'))
+GITHUB_SECONDARY_BACKOFF_MAX = float(os.getenv('GITHUB_SECONDARY_BACKOFF_MAX', '900'))
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+DEFAULT_HEADERS = {'Accept': 'application/vnd.github.v3+json'}
+# Headers replayed on responses served from the cache
+CACHED_HEADERS = ('content-type', 'etag', 'last-modified')
+
+
+class RateLimited(Exception):
+    """A token is paused (or reserved for interactive use) - no request was sent"""
+
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+def token_key(token: str) -> str:
+    """Stable, non-reversible identifier for a token (cache keys, metrics)"""
+    return hashlib.sha256(token.encode()).hexdigest()[:12] if token else 'anonymous'
+
+
+class TokenBudget:
+    """Rate-limit state of one token, from X-RateLimit-* headers and limit responses"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.paused_until = 0.0
+        self.pause_reason: Optional[str] = None
+        self.secondary_hits = 0  # consecutive secondary-limit responses
+        self.requests = 0
+
+    def update(self, response: httpx.Response):
+        headers = response.headers
+        if 'x-ratelimit-remaining' in headers:
+            self.limit = int(headers.get('x-ratelimit-limit', self.limit or 0))
+            self.remaining = int(headers['x-ratelimit-remaining'])
+            self.reset_at = float(headers.get('x-ratelimit-reset', self.reset_at or 0))
+
+        if response.status_code not in (403, 429):
+            if response.status_code < 400:
+                self.secondary_hits = 0
+            return
+        now = time.time()
+        retry_after = headers.get('retry-after')
+        if self.remaining == 0 and not retry_after:
+            self.paused_until = max(self.reset_at or now + 60, now)
+            self.pause_reason = 'primary'
+        elif retry_after or 'secondary rate limit' in response.text.lower():
+            self.secondary_hits += 1
+            backoff = float(retry_after) if retry_after else min(
+                GITHUB_SECONDARY_BACKOFF * 2 ** (self.secondary_hits - 1), GITHUB_SECONDARY_BACKOFF_MAX
+            )
+            self.paused_until = now + backoff
+            self.pause_reason = 'secondary'
+
+    def check(self, priority: int):
+        """Raise RateLimited if a request at this priority shouldn't be sent now"""
+        now = time.time()
+        if self.paused_until > now:
+            raise RateLimited(
+                f"GitHub {self.pause_reason} rate limit - paused for {self.paused_until - now:.0f}s",
+                self.paused_until - now
+            )
+        if self.reset_at and self.reset_at <= now:
+            self.remaining = self.limit  # new window
+        if (priority == BACKGROUND and self.limit and self.remaining is not None
+                and self.remaining < self.limit * GITHUB_BACKGROUND_RESERVE):
+            raise RateLimited(
+                f"GitHub budget reserved for interactive requests ({self.remaining}/{self.limit} left)",
+                max((self.reset_at or now) - now, 0)
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_in_seconds': round(self.reset_at - now) if self.reset_at and self.reset_at > now else None,
+            'paused_for_seconds': round(self.paused_until - now) if self.paused_until > now else 0,
+            'pause_reason': self.pause_reason if self.paused_until > now else None,
+            'requests': self.requests
+        }
+
+
+class PrioritySlots:
+    """Bounded in-flight slots; a freed slot goes to the highest-priority waiter"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.in_use = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def acquire(self, priority: int):
+        if self.in_use < self.size and not self._waiters:
+            self.in_use += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    self._release()  # the slot was handed over just before cancellation
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)  # hand the slot over
+                return
+        self.in_use -= 1
+
+    def waiting(self) -> Dict[str, int]:
+        counts = Counter(PRIORITY_NAMES[priority] for priority, _, future in self._waiters if not future.done())
+        return {name: counts.get(name, 0) for name in PRIORITY_NAMES.values()}
+
+
+class CacheEntry(NamedTuple):
+    content: bytes
+    headers: Dict[str, str]
+    immutable: bool
+
+
+class ResponseCache:
+    """LRU of response bodies and validators, bounded by total body size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        if len(entry.content) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.content)
+            self._entries[key] = entry
+            self.size += len(entry.content)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.content)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'immutable': sum(1 for entry in self._entries.values() if entry.immutable),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
+class GitHubClient:
+    """Shared AsyncClient for the GitHub REST API"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport  # injectable for tests and benchmarks
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self.cache = ResponseCache(GITHUB_CACHE_MAX_BYTES)
+        self._budgets: Dict[str, TokenBudget] = {}
+        self._customers: Dict[str, Counter] = {}
+        self._slots = PrioritySlots(GITHUB_MAX_IN_FLIGHT)
+
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client (created on first use)"""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    base_url=GITHUB_API_URL,
+                    headers=DEFAULT_HEADERS,
+                    http2=GITHUB_HTTP2,
+                    timeout=httpx.Timeout(GITHUB_READ_TIMEOUT, connect=GITHUB_CONNECT_TIMEOUT),
+                    limits=httpx.Limits(
+                        max_connections=GITHUB_MAX_CONNECTIONS,
+                        max_keepalive_connections=GITHUB_MAX_KEEPALIVE
+                    ),
+                    transport=self._transport
+                )
+            return self._client
+
+    def _budget(self, token: str, resource: str = 'core') -> TokenBudget:
+        key = token_key(token) if resource == 'core' else f"{token_key(token)}:{resource}"
+        with self._lock:
+            return self._budgets.setdefault(key, TokenBudget())
+
+    def _account(self, customer: Optional[str], outcome: str, cost: int = 0):
+        with self._lock:
+            usage = self._customers.setdefault(customer or 'platform', Counter())
+            usage[outcome] += 1
+            usage['cost'] += cost
+
+    async def request(self, method: str, path: str, token: Optional[str] = None,
+                      priority: int = INTERACTIVE, customer: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request to the GitHub API through the scheduler
+
+        `path` is relative to GITHUB_API_URL. `token` defaults to GITHUB_TOKEN;
+        pass '' to send the request unauthenticated. Raises RateLimited when
+        the token is paused (or, for BACKGROUND priority, down to its reserve).
+        """
+        token = GITHUB_TOKEN if token is None else token
+        headers = dict(kwargs.pop('headers', None) or {})
+        if token:
+            headers['Authorization'] = f'token {token}'
+
+        budget = self._budget(token, 'graphql' if path == GITHUB_GRAPHQL_PATH else 'core')
+        try:
+            budget.check(priority)
+            async with self._slots.acquire(priority):
+                budget.check(priority)  # may have changed while waiting for a slot
+                self._stats['requests'] += 1
+                budget.requests += 1
+                try:
+                    response = await self.client().request(method, path, headers=headers, **kwargs)
+                except httpx.HTTPError:
+                    self._stats['errors'] += 1
+                    raise
+        except RateLimited:
+            self._stats['deferred'] += 1
+            self._account(customer, 'deferred')
+            raise
+
+        budget.update(response)
+        self._stats[response.http_version] += 1
+        # Conditional requests answered with 304 don't count against the limit
+        self._account(customer, 'requests', cost=0 if response.status_code == 304 else 1)
+        if response.status_code in (403, 429) and budget.paused_until > time.time():
+            self._stats['rate_limited'] += 1
+        return response
+
+    async def get(self, path: str, token: Optional[str] = None, cache: bool = False,
+                  immutable: Optional[Callable[[Any], bool]] = None, **kwargs) -> httpx.Response:
+        """
+        GET, optionally through the conditional-request cache
+
+        `immutable(body)` marks a 200 response as final: it is then served from
+        the cache without revalidation until evicted. When rate limiting stops
+        a cached GET, the stale body is returned (X-Cache: stale). Identical
+        cached GETs in flight at the same time share one request (and the
+        first caller's priority).
+        """
+        if not cache:
+            return await self.request('GET', path, token=token, **kwargs)
+
+        token = GITHUB_TOKEN if token is None else token
+        url = self.client().build_request('GET', path, params=kwargs.get('params')).url
+        key = f"{token_key(token)}:{url}"
+        return await singleflight.run(('github.get', key), lambda: self._cached_get(path, token, url, key, immutable, **kwargs))
+
+    async def _cached_get(self, path: str, token: str, url: httpx.URL, key: str,
+                          immutable: Optional[Callable[[Any], bool]], **kwargs) -> httpx.Response:
+        entry = self.cache.get(key)
+        if entry is not None and entry.immutable:
+            self._stats['cache_immutable_hits'] += 1
+            return self._replay(entry, httpx.Request('GET', url))
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if 'etag' in entry.headers:
+                headers['If-None-Match'] = entry.headers['etag']
+            if 'last-modified' in entry.headers:
+                headers['If-Modified-Since'] = entry.headers['last-modified']
+
+        try:
+            response = await self.request('GET', path, token=token, headers=headers, **kwargs)
+        except RateLimited:
+            if entry is None:
+                raise
+            return self._serve_stale(entry, httpx.Request('GET', url), kwargs.get('customer'))
+
+        if response.status_code in (403, 429) and entry is not None and self._budget(token).paused_until > time.time():
+            return self._serve_stale(entry, response.request, kwargs.get('customer'))
+
+        if response.status_code == 304 and entry is not None:
+            self._stats['cache_not_modified'] += 1
+            return self._replay(entry, response.request)
+
+        self._stats['cache_misses'] += 1
+        if response.status_code == 200:
+            final = bool(immutable and immutable(response.json()))
+            stored = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+            if final or 'etag' in stored or 'last-modified' in stored:
+                self.cache.put(key, CacheEntry(response.content, stored, final))
+        return response
+
+    async def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None, token: Optional[str] = None,
+                      **kwargs) -> Dict[str, Any]:
+        """
+        POST a GraphQL query; returns the response body (`data`, plus `errors`
+        for fields that failed - GitHub answers partial results with 200)
+        """
+        response = await self.request('POST', GITHUB_GRAPHQL_PATH, token=token,
+                                      json={'query': query, 'variables': variables or {}}, **kwargs)
+        self._stats['graphql_queries'] += 1
+        if response.status_code != 200:
+            raise Exception(f'GitHub GraphQL returned {response.status_code}')
+        body = response.json()
+        if body.get('data') is None:
+            errors = body.get('errors') or [{}]
+            raise Exception(f"GitHub GraphQL error: {errors[0].get('message', 'no data')}")
+        return body
+
+    def _replay(self, entry: CacheEntry, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers=entry.headers, content=entry.content, request=request)
+
+    def _serve_stale(self, entry: CacheEntry, request: httpx.Request, customer: Optional[str]) -> httpx.Response:
+        self._stats['stale_served'] += 1
+        self._account(customer, 'stale_served')
+        return httpx.Response(200, headers={**entry.headers, 'x-cache': 'stale'}, content=entry.content, request=request)
+
+    async def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        cache = {
+            'immutable_hits': stats.pop('cache_immutable_hits', 0),
+            'not_modified': stats.pop('cache_not_modified', 0),
+            'misses': stats.pop('cache_misses', 0),
+            **self.cache.stats()
+        }
+        with self._lock:
+            tokens = {key: budget.snapshot() for key, budget in self._budgets.items()}
+            customers = {customer: dict(usage) for customer, usage in self._customers.items()}
+        scheduler = {
+            'max_in_flight': self._slots.size,
+            'in_flight': self._slots.in_use,
+            'waiting': self._slots.waiting(),
+            'deferred': stats.pop('deferred', 0),
+            'rate_limited': stats.pop('rate_limited', 0),
+            'stale_served': stats.pop('stale_served', 0),
+            'background_reserve': GITHUB_BACKGROUND_RESERVE
+        }
+        return {
+            'requests': stats.pop('requests', 0),
+            'errors': stats.pop('errors', 0),
+            'graphql_queries': stats.pop('graphql_queries', 0),
+            'by_http_version': stats,
+            'cache': cache,
+            'scheduler': scheduler,
+            'tokens': tokens,
+            'customers': customers,
+            'http2': GITHUB_HTTP2,
+            'max_connections': GITHUB_MAX_CONNECTIONS,
+            'max_keepalive': GITHUB_MAX_KEEPALIVE
+        }
+
+
+# Global instance shared by main.py and tools.py
+github_api = GitHubClient()
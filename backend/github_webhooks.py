@@ -0,0 +1,129 @@
+"""
+GitHub Webhooks - signature validation and delivery handling
+
+GitHub signs each delivery with HMAC-SHA256 of the raw body using the
+webhook secret (X-Hub-Signature-256: sha256=<hex>). Deliveries are accepted
+only when GITHUB_WEBHOOK_SECRET is set and the signature matches; redelivered
+IDs (X-GitHub-Delivery) are acknowledged without being applied twice.
+
+`workflow_run` and `workflow_job` events update the pipeline state (see
+pipelines); everything else is acknowledged and ignored.
+"""
+import hashlib
+import hmac
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from live_updates import live_updates
+from pipelines import pipeline_tracker
+
+# Secret configured on the GitHub webhook (unset disables the receiver)
+GITHUB_WEBHOOK_SECRET = os.getenv('GITHUB_WEBHOOK_SECRET', '')
+
+HANDLED_EVENTS = ('workflow_run', 'workflow_job')
+# Delivery IDs remembered for duplicate detection
+DELIVERY_HISTORY = 1000
+
+_lock = threading.Lock()
+_deliveries: "OrderedDict[str, None]" = OrderedDict()
+_stats = Counter()
+
+router = APIRouter(tags=["webhooks"])
+
+
+def webhooks_enabled() -> bool:
+    return bool(GITHUB_WEBHOOK_SECRET)
+
+
+def sign(body: bytes, secret: str) -> str:
+    """X-Hub-Signature-256 value for a body"""
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret: Optional[str] = None) -> bool:
+    secret = GITHUB_WEBHOOK_SECRET if secret is None else secret
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+def _seen(delivery_id: Optional[str]) -> bool:
+    """Record a delivery ID; True if it was already processed"""
+    if not delivery_id:
+        return False
+    with _lock:
+        if delivery_id in _deliveries:
+            return True
+        _deliveries[delivery_id] = None
+        if len(_deliveries) > DELIVERY_HISTORY:
+            _deliveries.popitem(last=False)
+        return False
+
+
+def _forget(delivery_id: Optional[str]):
+    """Drop a delivery ID whose processing failed, so GitHub's redelivery is applied"""
+    if delivery_id:
+        with _lock:
+            _deliveries.pop(delivery_id, None)
+
+
+async def handle_delivery(event: str, delivery_id: Optional[str], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one verified delivery; returns the response body"""
+    _stats['deliveries'] += 1
+    if event == 'ping':
+        return {'ok': True, 'event': 'ping'}
+    if event not in HANDLED_EVENTS:
+        _stats['ignored'] += 1
+        return {'ok': True, 'ignored': f"event '{event}' is not handled"}
+    if _seen(delivery_id):
+        _stats['duplicates'] += 1
+        return {'ok': True, 'duplicate': True}
+
+    try:
+        customer_id = await pipeline_tracker.apply_event(event, payload)
+    except BaseException:
+        _forget(delivery_id)
+        raise
+    if customer_id is None:
+        _stats['ignored'] += 1
+        return {'ok': True, 'ignored': 'repository is not linked to a customer'}
+    _stats[event] += 1
+    return {'ok': True, 'event': event, 'customer_id': customer_id}
+
+
+def record_rejected():
+    _stats['rejected'] += 1
+
+
+def webhook_stats() -> Dict[str, Any]:
+    return {'enabled': webhooks_enabled(), **_stats}
+
+
+@router.post("/webhooks/github")
+async def receive_github_webhook(request: Request):
+    """GitHub webhook receiver (workflow_run / workflow_job keep pipeline state current)"""
+    if not webhooks_enabled():
+        return JSONResponse(status_code=503, content={'error': 'GITHUB_WEBHOOK_SECRET is not configured'})
+    
+    body = await request.body()
+    if not verify_signature(body, request.headers.get('x-hub-signature-256')):
+        record_rejected()
+        return JSONResponse(status_code=401, content={'error': 'Invalid signature'})
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JSONResponse(status_code=400, content={'error': 'Invalid JSON payload'})
+    
+    result = await handle_delivery(
+        request.headers.get('x-github-event', ''), request.headers.get('x-github-delivery'), payload
+    )
+    if result.get('customer_id'):
+        live_updates.notify('pipelines')
+    return result
@@ -3,7 +3,6 @@ Initialize GitHub integrations for all customers on startup
 Run this once to configure GitHub integrations if they don't exist
 """
 import os
-import httpx
 from database import get_db, Customer, Integration
 from sqlalchemy.orm import Session
 
@@ -0,0 +1,79 @@
+"""
+Async access to the synchronous Kubernetes client
+
+The official `kubernetes` client is blocking. Calling it directly from an
+`async def` stalls uvicorn's event loop (and every other request with it),
+so async code runs K8s calls through a dedicated, bounded thread pool with a
+per-call timeout instead.
+
+Usage:
+    pods = await run_k8s(v1.list_namespaced_pod, namespace)
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from kubernetes.client.rest import ApiException
+
+# Pool size caps concurrent cluster calls from async code
+K8S_EXECUTOR_WORKERS = int(os.getenv('K8S_EXECUTOR_WORKERS', '16'))
+# Per-call deadline in seconds (includes time spent waiting for a free worker)
+K8S_CALL_TIMEOUT = float(os.getenv('K8S_CALL_TIMEOUT', '15'))
+
+_executor = ThreadPoolExecutor(max_workers=K8S_EXECUTOR_WORKERS, thread_name_prefix='k8s')
+
+_stats_lock = threading.Lock()
+_stats = {
+    'calls': 0,
+    'in_flight': 0,
+    'timeouts': 0,
+    'errors': 0
+}
+
+
+def _count(key: str, delta: int = 1):
+    with _stats_lock:
+        _stats[key] += delta
+
+
+async def run_k8s(func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Run a blocking Kubernetes call in the K8s executor
+
+    Raises ApiException(status=504) when the call doesn't finish within
+    `timeout` seconds (default K8S_CALL_TIMEOUT), so callers that already
+    handle ApiException report timeouts like any other API error. The worker
+    thread itself can't be interrupted; it finishes in the background.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = timeout if timeout is not None else K8S_CALL_TIMEOUT
+
+    _count('calls')
+    _count('in_flight')
+    try:
+        future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+        return await asyncio.wait_for(future, deadline)
+    except asyncio.TimeoutError:
+        _count('timeouts')
+        raise ApiException(status=504, reason=f"Kubernetes API call timed out after {deadline:g}s")
+    except Exception:
+        _count('errors')
+        raise
+    finally:
+        _count('in_flight', -1)
+
+
+def executor_stats() -> Dict[str, Any]:
+    """Executor pool size and call counters"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['workers'] = K8S_EXECUTOR_WORKERS
+    stats['call_timeout_seconds'] = K8S_CALL_TIMEOUT
+    return stats
+
+
+def shutdown_executor():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,150 @@
+"""
+K8s Client - one configured ApiClient shared by every module
+
+The kubernetes client defaults to a urllib3 pool of 4 connections per host
+with no request timeout. With the K8s executor running up to
+K8S_EXECUTOR_WORKERS calls at once, plus informer watches and log follows,
+fan-out calls queued for a connection (or opened throwaway ones) and a hung
+API server could pin an executor thread forever.
+
+This module loads the kube config once (in-cluster, else kubeconfig) and
+hands out API objects built on a single ApiClient with:
+- a connection pool sized for the executor plus long-lived streams;
+- a default (connect, read) timeout on every call except watches and
+  `follow=true` log streams, which are expected to stay open;
+- urllib3 retries with backoff for idempotent reads (GET/HEAD) on connection
+  errors and 429/5xx responses (Retry-After is honoured);
+- pool usage counters for /metrics.
+
+Usage:
+    v1 = core_v1()
+    pods = v1.list_namespaced_pod(namespace)
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from kubernetes import client, config
+from urllib3.util.retry import Retry
+
+from k8s_async import K8S_EXECUTOR_WORKERS
+
+# Connections kept per API server (executor workers + watches and log streams)
+K8S_POOL_MAXSIZE = int(os.getenv('K8S_POOL_MAXSIZE', str(K8S_EXECUTOR_WORKERS + 16)))
+# Default per-request timeouts in seconds (not applied to watches / follow streams)
+K8S_CONNECT_TIMEOUT = float(os.getenv('K8S_CONNECT_TIMEOUT', '5'))
+K8S_READ_TIMEOUT = float(os.getenv('K8S_READ_TIMEOUT', '30'))
+# Retries for idempotent reads on connection errors and 429/5xx
+K8S_READ_RETRIES = int(os.getenv('K8S_READ_RETRIES', '3'))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+STREAM_PARAMS = ('watch', 'follow')
+
+_lock = threading.Lock()
+_client: Optional[client.ApiClient] = None
+_apis: Dict[type, Any] = {}
+_stats = {'requests': 0, 'streams': 0}
+
+
+def _is_stream(query_params) -> bool:
+    """True for watch and follow requests (long-lived by design)"""
+    return any(key in STREAM_PARAMS and value in (True, 'true') for key, value in query_params or [])
+
+
+class TunedApiClient(client.ApiClient):
+    """ApiClient that applies the default timeout to non-streaming requests"""
+
+    def request(self, method, url, query_params=None, headers=None, post_params=None,
+                body=None, _preload_content=True, _request_timeout=None):
+        stream = _is_stream(query_params)
+        if _request_timeout is None and not stream:
+            _request_timeout = (K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT)
+        with _lock:
+            _stats['requests'] += 1
+            if stream:
+                _stats['streams'] += 1
+        return super().request(method, url, query_params=query_params, headers=headers,
+                               post_params=post_params, body=body, _preload_content=_preload_content,
+                               _request_timeout=_request_timeout)
+
+
+def build_configuration() -> client.Configuration:
+    """Kube config (in-cluster, else kubeconfig) with pool size and read retries"""
+    configuration = client.Configuration()
+    try:
+        config.load_incluster_config(client_configuration=configuration)
+    except config.ConfigException:
+        config.load_kube_config(client_configuration=configuration)
+
+    configuration.connection_pool_maxsize = K8S_POOL_MAXSIZE
+    configuration.retries = Retry(
+        total=K8S_READ_RETRIES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=0.5,
+        respect_retry_after_header=True,
+        raise_on_status=False  # hand the last response back so ApiException carries it
+    )
+    return configuration
+
+
+def api_client() -> client.ApiClient:
+    """The shared ApiClient (config is loaded on first use; raises if none is available)"""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = TunedApiClient(build_configuration())
+            print(f"✅ K8s client configured (pool {K8S_POOL_MAXSIZE}, timeout {K8S_CONNECT_TIMEOUT:g}s/{K8S_READ_TIMEOUT:g}s, {K8S_READ_RETRIES} read retries)")
+        return _client
+
+
+def _api(api_class: type) -> Any:
+    shared = api_client()
+    with _lock:
+        if api_class not in _apis:
+            _apis[api_class] = api_class(shared)
+        return _apis[api_class]
+
+
+def core_v1() -> client.CoreV1Api:
+    return _api(client.CoreV1Api)
+
+
+def apps_v1() -> client.AppsV1Api:
+    return _api(client.AppsV1Api)
+
+
+def networking_v1() -> client.NetworkingV1Api:
+    return _api(client.NetworkingV1Api)
+
+
+def custom_objects() -> client.CustomObjectsApi:
+    return _api(client.CustomObjectsApi)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool configuration and per-host connection usage"""
+    with _lock:
+        stats = dict(_stats)
+        shared = _client
+    stats.update({
+        'pool_maxsize': K8S_POOL_MAXSIZE,
+        'timeout_seconds': [K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT],
+        'read_retries': K8S_READ_RETRIES,
+        'hosts': {}
+    })
+    if shared is None:
+        return stats
+
+    pools = shared.rest_client.pool_manager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None or pool.pool is None:
+            continue
+        # The pool queue holds idle connections and empty slots; the rest are checked out
+        stats['hosts'][f"{pool.host}:{pool.port}"] = {
+            'in_use': pool.pool.maxsize - pool.pool.qsize(),
+            'connections_opened': pool.num_connections,
+            'requests': pool.num_requests
+        }
+    return stats
@@ -0,0 +1,168 @@
+"""
+K8s Fast List - raw-JSON list calls projected into compact records
+
+Deserializing a V1PodList / V1DeploymentList into the OpenAPI model classes
+costs far more CPU than the HTTP call, and callers read only a few fields.
+The functions here request lists with `_preload_content=False`, parse the
+body with orjson (stdlib json when it isn't installed) and keep only the
+fields the backend reads.
+
+Records are nested NamedTuples that mirror the model attribute paths for the
+projected fields (`pod.metadata.namespace`, `pod.status.phase`,
+`deploy.spec.template.spec.containers[0].image`, ...), so code written
+against model objects - including cluster cache reads - works unchanged.
+
+Usage:
+    pods = list_pods(v1.list_pod_for_all_namespaces, label_selector='managed-by=openluffy')
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from orjson import loads
+    JSON_PARSER = 'orjson'
+except ImportError:  # orjson is in requirements.txt; stdlib json also accepts bytes
+    from json import loads
+    JSON_PARSER = 'json'
+
+
+class Metadata(NamedTuple):
+    name: Optional[str]
+    namespace: Optional[str]
+    labels: Optional[Dict[str, str]]
+    uid: Optional[str]
+    resource_version: Optional[str]
+    creation_timestamp: Optional[datetime]
+
+
+class PodStatus(NamedTuple):
+    phase: Optional[str]
+
+
+class PodRecord(NamedTuple):
+    metadata: Metadata
+    status: PodStatus
+
+
+class Container(NamedTuple):
+    name: str
+    image: Optional[str]
+
+
+class PodSpec(NamedTuple):
+    containers: List[Container]
+
+
+class PodTemplate(NamedTuple):
+    spec: PodSpec
+
+
+class LabelSelector(NamedTuple):
+    match_labels: Optional[Dict[str, str]]
+
+
+class DeploymentSpec(NamedTuple):
+    replicas: Optional[int]
+    selector: LabelSelector
+    template: PodTemplate
+
+
+class DeploymentStatus(NamedTuple):
+    replicas: Optional[int]
+    ready_replicas: Optional[int]
+    available_replicas: Optional[int]
+
+
+class DeploymentRecord(NamedTuple):
+    metadata: Metadata
+    spec: DeploymentSpec
+    status: DeploymentStatus
+
+
+class NamespaceStatus(NamedTuple):
+    phase: Optional[str]
+
+
+class NamespaceRecord(NamedTuple):
+    metadata: Metadata
+    status: NamespaceStatus
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+
+def project_metadata(raw: Dict[str, Any]) -> Metadata:
+    return Metadata(
+        name=raw.get('name'),
+        namespace=raw.get('namespace'),
+        labels=raw.get('labels'),
+        uid=raw.get('uid'),
+        resource_version=raw.get('resourceVersion'),
+        creation_timestamp=_timestamp(raw.get('creationTimestamp'))
+    )
+
+
+def project_pod(raw: Dict[str, Any]) -> PodRecord:
+    return PodRecord(
+        metadata=project_metadata(raw.get('metadata') or {}),
+        status=PodStatus(phase=(raw.get('status') or {}).get('phase'))
+    )
+
+
+def project_deployment(raw: Dict[str, Any]) -> DeploymentRecord:
+    spec = raw.get('spec') or {}
+    status = raw.get('status') or {}
+    pod_spec = (spec.get('template') or {}).get('spec') or {}
+    return DeploymentRecord(
+        metadata=project_metadata(raw.get('metadata') or {}),
+        spec=DeploymentSpec(
+            replicas=spec.get('replicas'),
+            selector=LabelSelector(match_labels=(spec.get('selector') or {}).get('matchLabels')),
+            template=PodTemplate(spec=PodSpec(containers=[
+                Container(name=c.get('name'), image=c.get('image')) for c in pod_spec.get('containers') or []
+            ]))
+        ),
+        status=DeploymentStatus(
+            replicas=status.get('replicas'),
+            ready_replicas=status.get('readyReplicas'),
+            available_replicas=status.get('availableReplicas')
+        )
+    )
+
+
+def project_namespace(raw: Dict[str, Any]) -> NamespaceRecord:
+    return NamespaceRecord(
+        metadata=project_metadata(raw.get('metadata') or {}),
+        status=NamespaceStatus(phase=(raw.get('status') or {}).get('phase'))
+    )
+
+
+def raw_list(list_func: Callable, *args, **kwargs) -> Dict[str, Any]:
+    """Call a list endpoint and parse the raw body (no model deserialization)"""
+    response = list_func(*args, _preload_content=False, **kwargs)
+    try:
+        return loads(response.data)
+    finally:
+        response.release_conn()
+
+
+def fast_list(list_func: Callable, project: Callable[[Dict[str, Any]], Any],
+              *args, **kwargs) -> Tuple[List[Any], Optional[str]]:
+    """(projected items, list resourceVersion)"""
+    body = raw_list(list_func, *args, **kwargs)
+    items = [project(item) for item in body.get('items') or []]
+    return items, (body.get('metadata') or {}).get('resourceVersion')
+
+
+def list_pods(list_func: Callable, *args, **kwargs) -> List[PodRecord]:
+    """e.g. list_pods(v1.list_namespaced_pod, namespace) -> [PodRecord]"""
+    return fast_list(list_func, project_pod, *args, **kwargs)[0]
+
+
+def list_deployments(list_func: Callable, *args, **kwargs) -> List[DeploymentRecord]:
+    return fast_list(list_func, project_deployment, *args, **kwargs)[0]
+
+
+def list_namespaces(list_func: Callable, *args, **kwargs) -> List[NamespaceRecord]:
+    return fast_list(list_func, project_namespace, *args, **kwargs)[0]
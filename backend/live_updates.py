@@ -0,0 +1,291 @@
+"""
+Live Updates - one shared computation per topic, pushed to every subscriber
+
+Dashboards used to poll /customers and /deployments every 10s and
+/pipelines/status every 30s, per component and per tab, so the backend kept
+recomputing identical snapshots. Here each topic is computed once and the
+result is diffed by key against the previous snapshot; only changed and
+removed items are pushed over Server-Sent Events.
+
+Topics backed by the cluster cache are recomputed when one of their watched
+resource types changes (debounced), plus a slow safety resync. Topics
+without a watch (pipelines) are polled once for all subscribers. Nothing is
+recomputed while a topic has no subscribers.
+
+Wire format (GET /events/stream?topics=customers,deployments):
+    event: snapshot
+    data: {"topic": "customers", "version": 3, "items": [...]}
+
+    event: diff
+    data: {"topic": "customers", "version": 4, "upserts": [...], "removed": ["id"]}
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from cluster_cache import cluster_cache
+
+# Coalesce bursts of watch events into one recompute
+LIVE_UPDATES_DEBOUNCE = float(os.getenv('LIVE_UPDATES_DEBOUNCE', '1'))
+# Recompute interval for topics whose sources aren't watched
+LIVE_UPDATES_POLL_INTERVAL = float(os.getenv('LIVE_UPDATES_POLL_INTERVAL', '10'))
+# Safety resync for watch-driven topics
+LIVE_UPDATES_RESYNC_INTERVAL = float(os.getenv('LIVE_UPDATES_RESYNC_INTERVAL', '60'))
+# SSE comment sent when idle so proxies keep the connection open
+LIVE_UPDATES_HEARTBEAT = float(os.getenv('LIVE_UPDATES_HEARTBEAT', '15'))
+# Messages buffered per subscriber before it is resynced with fresh snapshots
+LIVE_UPDATES_QUEUE_SIZE = int(os.getenv('LIVE_UPDATES_QUEUE_SIZE', '100'))
+LIVE_UPDATES_MAX_SUBSCRIBERS = int(os.getenv('LIVE_UPDATES_MAX_SUBSCRIBERS', '256'))
+
+_RESYNC = 'resync'
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscriber:
+    """A connected client: its topics and a bounded outbound queue"""
+
+    def __init__(self, topics: List[str]):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_UPDATES_QUEUE_SIZE)
+        self.versions: Dict[str, int] = {}  # last version sent per topic
+        self.connected_at = time.time()
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        """Queue a message; on overflow drop the backlog and ask for a resync"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+            return False
+
+
+class Topic:
+    """Keyed snapshot of one resource view plus its subscribers"""
+
+    def __init__(self, name: str, producer: Callable[[], Any], key: str,
+                 sources: tuple = (), interval: float = LIVE_UPDATES_POLL_INTERVAL):
+        self.name = name
+        self.producer = producer
+        self.key = key
+        self.sources = sources
+        self.interval = interval
+        self.live = False  # True when every source is watched by the cluster cache
+
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self.fresh = False
+        self.subscribers: Set[Subscriber] = set()
+        self.dirty = asyncio.Event()
+        self.lock = asyncio.Lock()
+
+        self.refreshes = 0
+        self.diffs = 0
+        self.errors = 0
+        self.last_refresh: Optional[float] = None
+
+    def snapshot_message(self) -> Dict[str, Any]:
+        return {'topic': self.name, 'version': self.version, 'items': list(self.items.values())}
+
+
+class LiveUpdates:
+    """Topic registry, recompute loops and subscriber fan-out"""
+
+    def __init__(self):
+        self.topics: Dict[str, Topic] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._run_blocking: Optional[Callable[..., Awaitable[Any]]] = None
+        self.subscriber_count = 0
+        self.resyncs = 0
+
+    def add_topic(self, name: str, producer: Callable[[], Any], key: str = 'id',
+                  sources: tuple = (), interval: float = LIVE_UPDATES_POLL_INTERVAL):
+        """
+        Register a topic
+
+        `producer` returns the topic's items (a list of dicts with a unique
+        `key` field); it may be a coroutine function. `sources` are cluster
+        cache resource types whose changes trigger a recompute.
+        """
+        self.topics[name] = Topic(name, producer, key, sources, interval)
+
+    def start(self, run_blocking: Callable[..., Awaitable[Any]]):
+        """Subscribe to the cluster cache and start one loop per topic (call from the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        self._run_blocking = run_blocking
+        for topic in self.topics.values():
+            topic.live = bool(topic.sources) and all(
+                cluster_cache.add_listener(kind, self._watcher(topic)) for kind in topic.sources
+            )
+            self._tasks.append(asyncio.create_task(self._run(topic)))
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def notify(self, name: str):
+        """Mark a topic dirty after an out-of-band change (call from the event loop)"""
+        topic = self.topics.get(name)
+        if topic is not None and topic.subscribers:
+            topic.dirty.set()
+
+    def _watcher(self, topic: Topic) -> Callable[[str, Any], None]:
+        # Called from informer threads
+        def on_event(event_type: str, obj: Any):
+            if topic.subscribers and self._loop and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(topic.dirty.set)
+        return on_event
+
+    # ------------------------------------------------------------------
+    # Recompute
+    # ------------------------------------------------------------------
+
+    async def _run(self, topic: Topic):
+        while True:
+            timeout = LIVE_UPDATES_RESYNC_INTERVAL if topic.live else topic.interval
+            try:
+                await asyncio.wait_for(topic.dirty.wait(), timeout)
+                await asyncio.sleep(LIVE_UPDATES_DEBOUNCE)
+            except asyncio.TimeoutError:
+                pass
+
+            if not topic.subscribers:
+                # Recomputed on the next subscribe instead
+                topic.fresh = False
+                topic.dirty.clear()
+                continue
+
+            async with topic.lock:
+                await self._refresh(topic)
+
+    async def _produce(self, topic: Topic) -> List[Dict[str, Any]]:
+        if asyncio.iscoroutinefunction(topic.producer):
+            return await topic.producer()
+        return await self._run_blocking(topic.producer)
+
+    async def _refresh(self, topic: Topic):
+        """Recompute a topic and broadcast the diff (caller holds topic.lock)"""
+        topic.dirty.clear()
+        try:
+            items = await self._produce(topic)
+        except Exception as e:
+            topic.errors += 1
+            print(f"⚠️ Live update refresh failed for {topic.name}: {e}")
+            return
+
+        current = {str(item[topic.key]): item for item in items}
+        upserts = [item for key, item in current.items() if topic.items.get(key) != item]
+        removed = [key for key in topic.items if key not in current]
+
+        topic.items = current
+        topic.fresh = True
+        topic.refreshes += 1
+        topic.last_refresh = time.time()
+
+        if not upserts and not removed:
+            return
+        topic.version += 1
+        topic.diffs += 1
+        message = {'topic': topic.name, 'version': topic.version, 'upserts': upserts, 'removed': removed}
+        for subscriber in list(topic.subscribers):
+            if not subscriber.offer(message):
+                self.resyncs += 1
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    async def subscribe(self, names: List[str]) -> Subscriber:
+        """Register a subscriber; its queue starts with one snapshot per topic"""
+        if self.subscriber_count >= LIVE_UPDATES_MAX_SUBSCRIBERS:
+            raise TooManySubscribers()
+
+        subscriber = Subscriber(names)
+        self.subscriber_count += 1
+        try:
+            for name in names:
+                topic = self.topics[name]
+                async with topic.lock:
+                    if not topic.fresh:
+                        await self._refresh(topic)
+                    subscriber.offer(topic.snapshot_message())
+                    topic.subscribers.add(subscriber)
+        except BaseException:
+            # Client went away (or a refresh failed) before sse() could take over the cleanup
+            self.unsubscribe(subscriber)
+            raise
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        for name in subscriber.topics:
+            self.topics[name].subscribers.discard(subscriber)
+        self.subscriber_count -= 1
+
+    def has_capacity(self) -> bool:
+        return self.subscriber_count < LIVE_UPDATES_MAX_SUBSCRIBERS
+
+    async def sse(self, names: List[str]) -> AsyncIterator[bytes]:
+        """Subscribe and yield SSE frames until the client disconnects"""
+        subscriber = await self.subscribe(names)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), LIVE_UPDATES_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b': keepalive\n\n'
+                    continue
+
+                if message == _RESYNC:
+                    for name in subscriber.topics:
+                        topic = self.topics[name]
+                        async with topic.lock:
+                            snapshot = topic.snapshot_message()
+                        subscriber.versions[name] = snapshot['version']
+                        yield _frame('snapshot', snapshot)
+                    continue
+
+                name = message['topic']
+                if message['version'] <= subscriber.versions.get(name, -1):
+                    continue  # already covered by a newer snapshot
+                subscriber.versions[name] = message['version']
+                yield _frame('snapshot' if 'items' in message else 'diff', message)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'subscribers': self.subscriber_count,
+            'max_subscribers': LIVE_UPDATES_MAX_SUBSCRIBERS,
+            'resyncs': self.resyncs,
+            'topics': {
+                name: {
+                    'live': topic.live,
+                    'subscribers': len(topic.subscribers),
+                    'items': len(topic.items),
+                    'version': topic.version,
+                    'refreshes': topic.refreshes,
+                    'diffs': topic.diffs,
+                    'errors': topic.errors,
+                    'age_seconds': round(now - topic.last_refresh, 1) if topic.last_refresh else None
+                }
+                for name, topic in self.topics.items()
+            }
+        }
+
+
+def _frame(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+# Global instance
+live_updates = LiveUpdates()
@@ -0,0 +1,460 @@
+"""
+Pod Log Streaming - forward `follow=True` log bytes with bounded buffering
+
+Each open stream holds one upstream `read_namespaced_pod_log(..., follow=True,
+_preload_content=False)` connection, read by a dedicated thread (streams are
+long-lived and would starve the shared K8s executor). Chunks pass through a
+bounded asyncio.Queue: when the client reads slowly the queue fills, the
+reader thread blocks and TCP back-pressure reaches the API server instead of
+memory growing in the backend.
+
+The fan-out helpers at the bottom merge the logs of every pod in a
+deployment into one stream under a global line/byte budget.
+"""
+import asyncio
+import concurrent.futures
+import heapq
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from kubernetes.client.rest import ApiException
+from starlette.responses import StreamingResponse
+
+# Bytes read from the upstream response per chunk
+LOG_STREAM_CHUNK_BYTES = int(os.getenv('LOG_STREAM_CHUNK_BYTES', '16384'))
+# Chunks buffered per stream before the upstream reader blocks
+LOG_STREAM_QUEUE_CHUNKS = int(os.getenv('LOG_STREAM_QUEUE_CHUNKS', '64'))
+# Concurrent upstream log streams (each holds a connection and a thread)
+LOG_STREAM_MAX_CONCURRENT = int(os.getenv('LOG_STREAM_MAX_CONCURRENT', '32'))
+# Seconds to wait for the upstream stream to open
+LOG_STREAM_OPEN_TIMEOUT = float(os.getenv('LOG_STREAM_OPEN_TIMEOUT', '15'))
+# Idle seconds before a keepalive is sent (proxies drop quiet connections, nginx after 60s)
+LOG_STREAM_KEEPALIVE = float(os.getenv('LOG_STREAM_KEEPALIVE', '15'))
+
+_slots = threading.BoundedSemaphore(LOG_STREAM_MAX_CONCURRENT)
+
+_stats_lock = threading.Lock()
+_stats = {
+    'opened': 0,
+    'active': 0,
+    'rejected': 0,
+    'bytes': 0
+}
+
+
+def _count(key: str, delta: int = 1):
+    with _stats_lock:
+        _stats[key] += delta
+
+
+def stream_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['max_concurrent'] = LOG_STREAM_MAX_CONCURRENT
+    return stats
+
+
+_EOF = object()
+
+
+class PodLogStream:
+    """
+    One upstream pod log stream exposed as an async iterator
+
+    Usage:
+        stream = PodLogStream(v1, namespace, pod, follow=True, tail_lines=100)
+        await stream.open()          # raises ApiException (404, 429, 504, ...)
+        async for chunk in stream.chunks():
+            ...
+        stream.close()
+    """
+
+    def __init__(self, core_api, namespace: str, pod: str, container: Optional[str] = None,
+                 follow: bool = True, tail_lines: Optional[int] = None, since_seconds: Optional[int] = None,
+                 timestamps: bool = False, limit_bytes: Optional[int] = None,
+                 queue_chunks: int = LOG_STREAM_QUEUE_CHUNKS):
+        self.core_api = core_api
+        self.namespace = namespace
+        self.pod = pod
+        self.container = container
+        self.log_kwargs = {
+            'follow': follow,
+            'tail_lines': tail_lines,
+            'since_seconds': since_seconds,
+            'timestamps': timestamps,
+            'limit_bytes': limit_bytes
+        }
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_chunks = queue_chunks
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._opened: Optional[asyncio.Future] = None
+        self._response = None
+        self._closed = threading.Event()
+        self._has_slot = False
+
+    async def open(self):
+        """Start the reader thread and wait until the upstream stream is open"""
+        if not _slots.acquire(blocking=False):
+            _count('rejected')
+            raise ApiException(status=429, reason='Too many concurrent log streams')
+        self._has_slot = True
+        _count('opened')
+        _count('active')
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._queue_chunks)
+        self._opened = self._loop.create_future()
+        threading.Thread(target=self._pump, name=f"logs-{self.pod}", daemon=True).start()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self._opened), LOG_STREAM_OPEN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.close()
+            raise ApiException(status=504, reason='Timed out opening log stream')
+        except Exception:
+            self.close()
+            raise
+
+    def _signal_open(self, error: Optional[Exception] = None):
+        def resolve():
+            if self._opened.done():
+                return
+            if error:
+                self._opened.set_exception(error)
+            else:
+                self._opened.set_result(True)
+        self._loop.call_soon_threadsafe(resolve)
+
+    def _put(self, item: Any) -> bool:
+        """Blocking put from the reader thread; False once the stream is closed"""
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        while True:
+            try:
+                future.result(timeout=1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if self._closed.is_set():
+                    future.cancel()
+                    return False
+            except Exception:
+                return False
+
+    def _pump(self):
+        try:
+            self._response = self.core_api.read_namespaced_pod_log(
+                name=self.pod,
+                namespace=self.namespace,
+                container=self.container,
+                _preload_content=False,
+                **{k: v for k, v in self.log_kwargs.items() if v is not None}
+            )
+        except Exception as e:
+            self._signal_open(e)
+            return
+        if self._closed.is_set():
+            # close() ran (open() timed out) before the response existed: nobody else will close it
+            try:
+                self._response.close()
+            except Exception:
+                pass
+            self._release()
+            return
+        self._signal_open()
+
+        try:
+            for chunk in self._response.stream(LOG_STREAM_CHUNK_BYTES, decode_content=True):
+                if self._closed.is_set() or not self._put(chunk):
+                    break
+                _count('bytes', len(chunk))
+        except Exception as e:
+            if not self._closed.is_set():
+                self._put(f"\n[log stream error: {e}]\n".encode())
+        finally:
+            self._release()
+            if not self._closed.is_set():
+                self._put(_EOF)
+
+    def _release(self):
+        response = self._response
+        if response is not None:
+            try:
+                response.release_conn()
+            except Exception:
+                pass
+
+    async def chunks(self, keepalive: Optional[float] = None) -> AsyncIterator[Optional[bytes]]:
+        """Raw log bytes as they arrive; with `keepalive`, None after that many idle seconds"""
+        try:
+            while True:
+                if keepalive is None:
+                    item = await self._queue.get()
+                else:
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), keepalive)
+                    except asyncio.TimeoutError:
+                        yield None
+                        continue
+                if item is _EOF:
+                    return
+                yield item
+        finally:
+            self.close()
+
+    async def lines(self, keepalive: Optional[float] = None) -> AsyncIterator[Optional[bytes]]:
+        """Complete log lines (without the trailing newline); idle ticks pass through as None"""
+        buffer = b''
+        async for chunk in self.chunks(keepalive):
+            if chunk is None:
+                yield None
+                continue
+            buffer += chunk
+            *complete, buffer = buffer.split(b'\n')
+            for line in complete:
+                yield line
+        if buffer:
+            yield buffer
+
+    def close(self):
+        """Stop reading and drop the upstream connection (idempotent)"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        response = self._response
+        if response is not None:
+            try:
+                # Unblocks a reader waiting on a quiet follow stream
+                response.close()
+            except Exception:
+                pass
+        if self._has_slot:
+            self._has_slot = False
+            _slots.release()
+            _count('active', -1)
+
+
+async def sse_lines(stream: PodLogStream) -> AsyncIterator[bytes]:
+    """Server-Sent Events framing: one `data:` event per log line, comments while idle"""
+    async for line in stream.lines(LOG_STREAM_KEEPALIVE):
+        if line is None:
+            yield b': keepalive\n\n'
+            continue
+        yield b'data: ' + line.rstrip(b'\r') + b'\n\n'
+    yield b'event: end\ndata: \n\n'
+
+
+async def text_chunks(stream: PodLogStream) -> AsyncIterator[bytes]:
+    """Plain-text framing: raw bytes, and a newline while idle
+
+    The keepalive newline is only sent at a line boundary, so it shows up as
+    a blank line rather than splitting a partial line in two.
+    """
+    at_line_start = True
+    async for chunk in stream.chunks(LOG_STREAM_KEEPALIVE):
+        if chunk is None:
+            if at_line_start:
+                yield b'\n'
+            continue
+        if chunk:
+            at_line_start = chunk.endswith(b'\n')
+            yield chunk
+
+
+class LogStreamResponse(StreamingResponse):
+    """StreamingResponse that closes its PodLogStream however the response ends
+
+    The body generator only closes the stream from its finally block, which
+    never runs if the client goes away before the first chunk is pulled; the
+    slot, reader thread and upstream connection would stay behind.
+    """
+
+    def __init__(self, stream: PodLogStream, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.log_stream = stream
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.log_stream.close()
+
+
+# ============================================================================
+# DEPLOYMENT LOG FAN-OUT
+# ============================================================================
+
+# Concurrent per-pod log reads for one aggregated request
+LOG_FANOUT_WORKERS = int(os.getenv('LOG_FANOUT_WORKERS', '8'))
+# Global budget for one aggregated response
+LOG_FANOUT_MAX_LINES = int(os.getenv('LOG_FANOUT_MAX_LINES', '5000'))
+LOG_FANOUT_MAX_BYTES = int(os.getenv('LOG_FANOUT_MAX_BYTES', str(2 * 1024 * 1024)))
+# Chunks buffered per pod in follow mode (per-pod back-pressure)
+LOG_FANOUT_QUEUE_CHUNKS = int(os.getenv('LOG_FANOUT_QUEUE_CHUNKS', '8'))
+
+
+def split_timestamp(line: bytes):
+    """Split a `timestamps=True` log line into (sort key, message)"""
+    stamp, _, message = line.partition(b' ')
+    if not stamp[:4].isdigit():
+        return b'', line
+    # RFC3339Nano trims trailing zeros, so pad the fraction for ordering
+    base, _, fraction = stamp.rstrip(b'Z').partition(b'.')
+    return base + b'.' + fraction.ljust(9, b'0'), message
+
+
+def log_targets(pods: List[Any], container: Optional[str] = None) -> List[Tuple[str, str]]:
+    """(pod, container) pairs to read for a deployment"""
+    targets = []
+    for pod in pods:
+        names = [c.name for c in (pod.spec.containers or [])] if pod.spec else []
+        for name in names:
+            if container is None or name == container:
+                targets.append((pod.metadata.name, name))
+    return targets
+
+
+class LogBudget:
+    """Global line/byte budget shared by all pods of one request"""
+
+    def __init__(self, max_lines: int, max_bytes: int):
+        self.lines_left = max_lines
+        self.bytes_left = max_bytes
+
+    def take(self, line: bytes) -> bool:
+        if self.lines_left <= 0 or self.bytes_left < len(line):
+            return False
+        self.lines_left -= 1
+        self.bytes_left -= len(line)
+        return True
+
+    @property
+    def exhausted(self) -> bool:
+        return self.lines_left <= 0 or self.bytes_left <= 0
+
+
+def _format_line(pod: str, container: str, key: bytes, message: bytes, timestamps: bool) -> bytes:
+    prefix = f"[{pod}/{container}] ".encode()
+    if timestamps and key:
+        prefix = key + b'Z ' + prefix
+    return prefix + message.rstrip(b'\r') + b'\n'
+
+
+async def aggregate_logs(core_api, namespace: str, targets: List[Tuple[str, str]], run_blocking,
+                         tail_lines: Optional[int] = None, since_seconds: Optional[int] = None,
+                         timestamps: bool = False, max_lines: int = LOG_FANOUT_MAX_LINES,
+                         max_bytes: int = LOG_FANOUT_MAX_BYTES) -> AsyncIterator[bytes]:
+    """
+    Snapshot of every target's logs merged into one timestamp-ordered stream
+
+    Each (pod, container) is read concurrently (at most LOG_FANOUT_WORKERS at
+    a time) through `run_blocking` (k8s_async.run_k8s). The global budget is
+    split evenly up front and enforced upstream with tail_lines/limit_bytes,
+    so one chatty pod can't crowd out the others. Lines are prefixed with
+    "[pod/container]".
+    """
+    if not targets:
+        return
+
+    share_lines = max(1, max_lines // len(targets))
+    share_bytes = max(1024, max_bytes // len(targets))
+    semaphore = asyncio.Semaphore(LOG_FANOUT_WORKERS)
+
+    async def read(pod: str, container: str):
+        async with semaphore:
+            try:
+                text = await run_blocking(
+                    core_api.read_namespaced_pod_log,
+                    name=pod,
+                    namespace=namespace,
+                    container=container,
+                    timestamps=True,
+                    tail_lines=min(tail_lines, share_lines) if tail_lines else share_lines,
+                    limit_bytes=share_bytes,
+                    **({'since_seconds': since_seconds} if since_seconds else {})
+                )
+            except ApiException as e:
+                return [(b'', _format_line(pod, container, b'', f"[logs unavailable: {e.reason}]".encode(), False))]
+        lines = []
+        for raw in (text or '').encode().split(b'\n'):
+            if raw:
+                key, message = split_timestamp(raw)
+                lines.append((key, _format_line(pod, container, key, message, timestamps)))
+        return lines
+
+    per_target = await asyncio.gather(*(read(pod, container) for pod, container in targets))
+
+    budget = LogBudget(max_lines, max_bytes)
+    for _, line in heapq.merge(*per_target, key=lambda item: item[0]):
+        if not budget.take(line):
+            yield b'[log budget exhausted]\n'
+            return
+        yield line
+
+
+async def follow_logs(core_api, namespace: str, targets: List[Tuple[str, str]],
+                      tail_lines: Optional[int] = None, since_seconds: Optional[int] = None,
+                      timestamps: bool = False, max_lines: int = LOG_FANOUT_MAX_LINES,
+                      max_bytes: int = LOG_FANOUT_MAX_BYTES) -> AsyncIterator[bytes]:
+    """
+    Follow every target's logs, interleaved in arrival order
+
+    Each target has its own small bounded queue (LOG_FANOUT_QUEUE_CHUNKS), and
+    the merged output is fed by one reader task per target through a
+    single-slot handoff, so targets take turns instead of one pod flooding the
+    response. The stream ends once the global budget is used up.
+    """
+    if not targets:
+        return
+
+    share_lines = max(1, max_lines // len(targets))
+    streams = [
+        PodLogStream(
+            core_api, namespace, pod,
+            container=container,
+            follow=True,
+            tail_lines=min(tail_lines, share_lines) if tail_lines else share_lines,
+            since_seconds=since_seconds,
+            timestamps=True,
+            queue_chunks=LOG_FANOUT_QUEUE_CHUNKS
+        )
+        for pod, container in targets
+    ]
+
+    merged: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    async def pump(stream: PodLogStream):
+        try:
+            await stream.open()
+            async for raw in stream.lines():
+                key, message = split_timestamp(raw)
+                await merged.put(_format_line(stream.pod, stream.container, key, message, timestamps))
+        except ApiException as e:
+            await merged.put(_format_line(stream.pod, stream.container, b'', f"[logs unavailable: {e.reason}]".encode(), False))
+        finally:
+            stream.close()
+
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    budget = LogBudget(max_lines, max_bytes)
+    last_sent = time.monotonic()
+    try:
+        while True:
+            if all(task.done() for task in tasks) and merged.empty():
+                return
+            try:
+                line = await asyncio.wait_for(merged.get(), timeout=1)
+            except asyncio.TimeoutError:
+                if time.monotonic() - last_sent >= LOG_STREAM_KEEPALIVE:
+                    last_sent = time.monotonic()
+                    yield b'\n'  # keepalive: lines are whole here, so this is a blank line
+                continue
+            if not budget.take(line):
+                yield b'[log budget exhausted]\n'
+                return
+            last_sent = time.monotonic()
+            yield line
+    finally:
+        for task in tasks:
+            task.cancel()
+        for stream in streams:
+            stream.close()
@@ -1,17 +1,41 @@
 from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 import os
-import httpx
+import time
+import asyncio
+import functools
 import json
 from pathlib import Path
 from datetime import datetime
 from triage import triage_engine
+from cluster_cache import cluster_cache, parse_label_selector
+from namespace_discovery import tenant_namespaces, discovery_stats
+from deployment_index import deployment_index
+from deployment_pages import list_deployments, decode_cursor, DEPLOYMENTS_PAGE_MAX
+from platform_health import platform_health
+import k8s_fastlist as fastlist
+from approvals import approvals_engine
+from k8s_async import run_k8s, executor_stats, shutdown_executor
+import k8s_client
+from github_client import github_api, INTERACTIVE, BACKGROUND
+from pipelines import pipeline_tracker
+from pipeline_history import pipeline_history, run_duration, PIPELINES_STATS_DAYS
+from github_webhooks import webhooks_enabled, webhook_stats, router as webhooks_router
+from deployment_events import list_deployment_events, event_timestamp
+from log_streaming import (
+    PodLogStream, LogStreamResponse, sse_lines, text_chunks, stream_stats,
+    log_targets, aggregate_logs, follow_logs, LOG_FANOUT_MAX_LINES, LOG_FANOUT_MAX_BYTES
+)
+from live_updates import live_updates
+from fanout import fan_out
+from singleflight import singleflight, shared, SINGLEFLIGHT_TTL
+from provisioning import provisioner
+from etags import version_etag, fingerprint, etag_matches, not_modified, conditional_json, etag_stats
 from luffy_agent import get_agent
 from database import init_db, get_db, check_db_connection, Customer, Integration, ProvisioningStep
 from init_github_integrations import init_github_integrations
@@ -37,6 +61,9 @@ app = FastAPI(title="openluffy")
 # Include authentication routes
 app.include_router(auth_router)
 
+# GitHub webhook receiver (POST /webhooks/github)
+app.include_router(webhooks_router)
+
 # Groups and Permissions routes
 app.add_api_route("/api/v1/groups", list_groups, methods=["GET"], tags=["groups"])
 app.add_api_route("/api/v1/groups", create_group, methods=["POST"], tags=["groups"])
@@ -109,6 +136,12 @@ async def startup_event():
     global db_available
     import time
     
+    # Start the shared watch-backed cluster cache (list once, then watch)
+    if k8s_available and os.getenv('CLUSTER_CACHE_ENABLED', 'true').lower() == 'true':
+        cluster_cache.start(v1, apps_v1, k8s_client.custom_objects())
+    if k8s_available:
+        platform_health.start(v1, apps_v1, k8s_client.custom_objects())
+    
     # Check if DATABASE_URL is set
     database_url = os.getenv('DATABASE_URL')
     if database_url:
@@ -138,6 +171,9 @@ async def startup_event():
                     finally:
                         db.close()
                     
+                    # Onboarding jobs the previous process didn't finish
+                    provisioner.recover()
+                    
                     break
                 else:
                     raise Exception("Connection check failed")
@@ -154,6 +190,34 @@ async def startup_event():
                     break
     else:
         print("ℹ️ DATABASE_URL not set - using file storage")
+    
+    # Build the deployment ID index (needs the customers table, so after DB init)
+    if k8s_available:
+        deployment_index.start(v1, apps_v1)
+        approvals_engine.start(apps_v1)
+    
+    # Shared push channel for dashboards (one computation per topic for all subscribers)
+    live_updates.add_topic('customers', live_customers, sources=('namespaces', 'pods'))
+    live_updates.add_topic('deployments', live_deployments, sources=('namespaces', 'deployments'))
+    live_updates.add_topic('pipelines', live_pipelines, key='customer_id',
+                           interval=float(os.getenv('LIVE_UPDATES_PIPELINE_INTERVAL', '30')))
+    live_updates.start(run_k8s)
+    
+    # Pipeline state: webhook-fed with slow reconciliation, or fetched on read
+    pipeline_tracker.start(push=webhooks_enabled())
+    if db_available:
+        pipeline_history.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background watches, the K8s executor and the GitHub client"""
+    live_updates.stop()
+    pipeline_tracker.stop()
+    pipeline_history.stop()
+    cluster_cache.stop()
+    shutdown_executor()
+    await github_api.close()
 
 
 async def migrate_integrations_to_db():
@@ -215,11 +279,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load K8s config (in-cluster)
+# Load K8s config (shared, tuned ApiClient - see k8s_client)
 try:
-    config.load_incluster_config()
-    v1 = client.CoreV1Api()
-    apps_v1 = client.AppsV1Api()
+    v1 = k8s_client.core_v1()
+    apps_v1 = k8s_client.apps_v1()
     k8s_available = True
 except:
     k8s_available = False
@@ -243,6 +306,28 @@ def api_status():
         "k8s": k8s_available
     }
 
+@app.get("/metrics")
+def get_metrics():
+    """Backend performance counters (cache age, hit/miss ratios)"""
+    return {
+        'cluster_cache': cluster_cache.stats(),
+        'deployment_index': deployment_index.stats(),
+        'namespace_discovery': discovery_stats(),
+        'platform_health': platform_health.stats(),
+        'approvals': approvals_engine.stats(),
+        'k8s_executor': executor_stats(),
+        'k8s_client': k8s_client.pool_stats(),
+        'github_client': github_api.stats(),
+        'pipelines': pipeline_tracker.stats(),
+        'pipeline_history': pipeline_history.stats(),
+        'singleflight': singleflight.stats(),
+        'provisioning': provisioner.stats(),
+        'github_webhooks': webhook_stats(),
+        'log_streams': stream_stats(),
+        'live_updates': live_updates.stats(),
+        'etags': etag_stats()
+    }
+
 # ============================================================================
 # AI TRIAGE ENDPOINT - Core Feature
 # ============================================================================
@@ -419,89 +504,101 @@ def luffy_action(request: LuffyActionRequest):
 
 # ============================================================================
 
+# Optional label selector for the batched pod listing (e.g. managed-by=openluffy). Empty by
+# default: only charts onboarded after the label was added put it on pod templates
+CUSTOMER_POD_SELECTOR = os.getenv('CUSTOMER_POD_SELECTOR', '')
+
+
 @app.get("/customers")
-def get_customers():
-    """Get all customer deployments with multi-environment support - dynamically discovered"""
+def get_customers(request: Request, mode: str = 'batched'):
+    """Get all customer deployments with multi-environment support - dynamically discovered
+    
+    Query params:
+    - mode=batched (default): one cluster-wide pod listing, grouped by tenant namespace in memory
+    - mode=per-namespace: legacy path, one pod listing per customer environment
+    
+    Supports If-None-Match: the ETag tracks the cluster cache's namespace and
+    pod resourceVersions, so unchanged polls get a 304 without a rebuild.
+    """
+    etag = version_etag(
+        'customers', mode,
+        cluster_cache.version('namespaces', 'pods'),
+        fingerprint(integrations_store)
+    )
+    if etag_matches(request, etag):
+        return not_modified('/customers', etag)
+    return conditional_json(request, '/customers', build_customers(mode), etag, volatile=('meta',))
+
+
+def build_customers(mode: str = 'batched'):
+    """Customer status table (shared by GET /customers and live updates)"""
     if not k8s_available:
         return {'error': 'K8s not available', 'customers': [], 'total': 0}
     
+    started = time.perf_counter()
+    api_calls = 0
     customers = []
     customer_map = {}  # {customer_id: {metadata}}
+    tenant_ns = set()  # namespace names returned by discovery
+    
+    def env_entry(customer_id, env, running, total):
+        return {
+            'environment': env,
+            'status': 'running' if running > 0 else 'error',
+            'pods': {'running': running, 'total': total},
+            'url': f'http://{customer_id}-{env}.local' if env == 'prod' else f'http://{env}.{customer_id}.local'
+        }
     
     # Helper function to get environment status
     def get_env_status(customer_id, env):
         namespace = f"{customer_id}-{env}"
         try:
-            pods = v1.list_namespaced_pod(namespace)
-            running = len([p for p in pods.items if p.status.phase == 'Running'])
-            total = len(pods.items)
-            return {
-                'environment': env,
-                'status': 'running' if running > 0 else 'error',
-                'pods': {'running': running, 'total': total},
-                'url': f'http://{customer_id}-{env}.local' if env == 'prod' else f'http://{env}.{customer_id}.local'
-            }
+            def list_pods():
+                nonlocal api_calls
+                api_calls += 1
+                return fastlist.list_pods(v1.list_namespaced_pod, namespace)
+            pods = cluster_cache.pods(
+                namespace, fallback=shared(('fastlist.list_namespaced_pod', namespace), list_pods, SINGLEFLIGHT_TTL)
+            )
+            running = len([p for p in pods if p.status.phase == 'Running'])
+            return env_entry(customer_id, env, running, len(pods))
         except:
-            return {
-                'environment': env,
-                'status': 'error',
-                'pods': {'running': 0, 'total': 0},
-                'url': f'http://{customer_id}-{env}.local' if env == 'prod' else f'http://{env}.{customer_id}.local'
-            }
+            return env_entry(customer_id, env, 0, 0)
     
-    # Discover customer namespaces by scanning K8s
+    # Discover customer namespaces (label-selected; see namespace_discovery)
     try:
-        all_namespaces = v1.list_namespace()
+        def count_list():
+            nonlocal api_calls
+            api_calls += 1
         
-        for ns in all_namespaces.items:
-            ns_name = ns.metadata.name
+        for ns, customer_id, env in tenant_namespaces(v1, on_list=count_list):
             labels = ns.metadata.labels or {}
+            tenant_ns.add(ns.metadata.name)
             
-            # Check if this is a customer namespace (has 'customer' label or matches pattern)
-            customer_id = None
-            env = None
-            
-            if 'customer' in labels and 'environment' in labels:
-                # Namespace created by OpenLuffy (has our labels)
-                customer_id = labels['customer']
-                env = labels['environment']
-            elif '-dev' in ns_name or '-preprod' in ns_name or '-prod' in ns_name:
-                # Legacy namespace (pattern-based: customer-id-env)
-                if ns_name.endswith('-dev'):
-                    customer_id = ns_name.replace('-dev', '')
-                    env = 'dev'
-                elif ns_name.endswith('-preprod'):
-                    customer_id = ns_name.replace('-preprod', '')
-                    env = 'preprod'
-                elif ns_name.endswith('-prod'):
-                    customer_id = ns_name.replace('-prod', '')
-                    env = 'prod'
-            
-            if customer_id and env:
-                if customer_id not in customer_map:
-                    # Try to get customer metadata from integrations or namespace labels
-                    customer_name = labels.get('customer-name', customer_id.replace('-', ' ').title())
-                    
-                    # Check if we have integration data for this customer
-                    github_config = integrations_store.get(customer_id, {}).get('github', {})
-                    repo_name = github_config.get('repo', f'{customer_id}-app')
-                    
-                    # Detect stack from repo or namespace labels
-                    stack = labels.get('stack', 'Unknown')
-                    if 'node' in repo_name or 'api' in repo_name:
-                        stack = 'Node.js'
-                    elif 'webapp' in repo_name or 'fastapi' in repo_name:
-                        stack = 'Python'
-                    elif 'go' in repo_name:
-                        stack = 'Go'
-                    
-                    customer_map[customer_id] = {
-                        'id': customer_id,
-                        'name': customer_name,
-                        'app': repo_name,
-                        'stack': stack,
-                        'environments': []
-                    }
+            if customer_id not in customer_map:
+                # Try to get customer metadata from integrations or namespace labels
+                customer_name = labels.get('customer-name', customer_id.replace('-', ' ').title())
+                
+                # Check if we have integration data for this customer
+                github_config = integrations_store.get(customer_id, {}).get('github', {})
+                repo_name = github_config.get('repo', f'{customer_id}-app')
+                
+                # Detect stack from repo or namespace labels
+                stack = labels.get('stack', 'Unknown')
+                if 'node' in repo_name or 'api' in repo_name:
+                    stack = 'Node.js'
+                elif 'webapp' in repo_name or 'fastapi' in repo_name:
+                    stack = 'Python'
+                elif 'go' in repo_name:
+                    stack = 'Go'
+                
+                customer_map[customer_id] = {
+                    'id': customer_id,
+                    'name': customer_name,
+                    'app': repo_name,
+                    'stack': stack,
+                    'environments': []
+                }
     
     except Exception as e:
         print(f"Error discovering customer namespaces: {e}")
@@ -509,14 +606,58 @@ def get_customers():
         return {'customers': [], 'total': 0}
     
     # Build environment status for each discovered customer
+    if mode == 'per-namespace':
+        for customer_id in customer_map:
+            envs = [get_env_status(customer_id, env) for env in ['dev', 'preprod', 'prod']]
+            customer_map[customer_id]['environments'] = envs
+    else:
+        # One cluster-wide listing, grouped by the tenant namespaces found above. Pods are
+        # matched by namespace, not label: legacy tenant charts don't label their pods
+        pod_counts = {}  # {namespace: [running, total]}
+        try:
+            def list_all_pods():
+                nonlocal api_calls
+                api_calls += 1
+                if CUSTOMER_POD_SELECTOR:
+                    return fastlist.list_pods(v1.list_pod_for_all_namespaces, label_selector=CUSTOMER_POD_SELECTOR)
+                return fastlist.list_pods(v1.list_pod_for_all_namespaces)
+            pods = cluster_cache.pods(
+                selector=parse_label_selector(CUSTOMER_POD_SELECTOR),
+                fallback=shared(('fastlist.list_pod_for_all_namespaces', CUSTOMER_POD_SELECTOR), list_all_pods, SINGLEFLIGHT_TTL)
+            )
+            for pod in pods:
+                if pod.metadata.namespace not in tenant_ns:
+                    continue
+                counts = pod_counts.setdefault(pod.metadata.namespace, [0, 0])
+                counts[1] += 1
+                if pod.status.phase == 'Running':
+                    counts[0] += 1
+        except Exception as e:
+            print(f"Error listing customer pods: {e}")
+        
+        for customer_id in customer_map:
+            envs = []
+            for env in ['dev', 'preprod', 'prod']:
+                running, total = pod_counts.get(f"{customer_id}-{env}", (0, 0))
+                envs.append(env_entry(customer_id, env, running, total))
+            customer_map[customer_id]['environments'] = envs
+    
     for customer_id in customer_map:
-        envs = [get_env_status(customer_id, env) for env in ['dev', 'preprod', 'prod']]
-        customer_map[customer_id]['environments'] = envs
+        envs = customer_map[customer_id]['environments']
         customer_map[customer_id]['overallStatus'] = 'running' if any(e['status'] == 'running' for e in envs) else 'error'
     
     customers = list(customer_map.values())
     
-    return {'customers': customers, 'total': len(customers)}
+    return {
+        'customers': customers,
+        'total': len(customers),
+        'meta': {
+            'mode': 'per-namespace' if mode == 'per-namespace' else 'batched',
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'api_calls': api_calls,
+            'cache_hit': api_calls == 0
+        }
+    }
 
 # Customer Integrations Management
 integrations_store = {}  # In-memory store: {customer_id: {integration_type: config}}
@@ -869,6 +1010,10 @@ async def create_customer(request: Request):
     """
     Create a new customer with GitHub repo and ArgoCD applications
     
+    Validates, checks/creates the GitHub repo and saves the customer record,
+    then returns 202 with a provisioning job ID; the rest of the onboarding
+    runs in the background (progress: GET /provisioning/jobs/{job_id}).
+    
     Expects:
     {
         "name": "Acme Corp",
@@ -913,14 +1058,11 @@ async def create_customer(request: Request):
             'argocd': {}
         }
         
-        # Step 1: Check if GitHub repo exists
-        import requests
-        
-        repo_url = f"https://api.github.com/repos/{github['org']}/{github['repo']}"
-        repo_response = requests.get(repo_url, headers={
-            'Authorization': f"token {github['token']}",
-            'Accept': 'application/vnd.github.v3+json'
-        })
+        # Step 1: Check if GitHub repo exists (in the request: bad GitHub config is still a 400)
+        github_started = datetime.utcnow()
+        repo_response = await github_api.get(
+            f"/repos/{github['org']}/{github['repo']}", token=github['token'], customer=customer_id
+        )
         
         if repo_response.status_code == 200:
             # Repo exists, use it
@@ -929,7 +1071,6 @@ async def create_customer(request: Request):
             result['github']['message'] = 'Using existing repository'
         elif repo_response.status_code == 404:
             # Repo doesn't exist, create it
-            create_repo_url = f"https://api.github.com/user/repos"
             create_data = {
                 'name': github['repo'],
                 'description': f"Customer application - {customer_name}",
@@ -937,12 +1078,11 @@ async def create_customer(request: Request):
                 'auto_init': True
             }
             
-            create_response = requests.post(create_repo_url, json=create_data, headers={
-                'Authorization': f"token {github['token']}",
-                'Accept': 'application/vnd.github.v3+json'
-            })
+            create_response = await github_api.request(
+                'POST', '/user/repos', token=github['token'], customer=customer_id, json=create_data
+            )
             
-            if not create_response.ok:
+            if not create_response.is_success:
                 return JSONResponse(status_code=400, content={
                     'error': f'Failed to create GitHub repository: {create_response.json().get("message", "Unknown error")}'
                 })
@@ -955,7 +1095,10 @@ async def create_customer(request: Request):
                 'error': f'Failed to check GitHub repository: {repo_response.status_code}'
             })
         
-        # Step 2: Create Customer record in database
+        # Step 2: Create Customer record in database (the job's progress rows reference it)
+        customer_started = datetime.utcnow()
+        customer_saved = False
+        customer_message = 'Database not configured - using file storage'
         if db_available:
             try:
                 from database import SessionLocal
@@ -971,220 +1114,302 @@ async def create_customer(request: Request):
                         )
                         db.add(customer)
                         db.commit()
+                        customer_message = 'Customer record created'
                         print(f"✅ Created customer record: {customer_name} ({customer_id})")
                     else:
+                        customer_message = 'Customer record already exists'
                         print(f"ℹ️  Customer record already exists: {customer_name} ({customer_id})")
+                    customer_saved = True
                 except Exception as db_error:
                     db.rollback()
+                    customer_message = f'Failed to create customer record: {db_error}'
                     print(f"⚠️  Failed to create customer record: {db_error}")
                 finally:
                     db.close()
             except Exception as e:
+                customer_message = f'Database error: {e}'
                 print(f"Database error: {e}")
         
-        # Step 3: Store integrations (database + in-memory)
-        if db_available:
-            try:
-                from database import SessionLocal
-                db = SessionLocal()
-                try:
-                    # Create GitHub integration
-                    github_integration = Integration(
-                        customer_id=customer_id,
-                        type='github',
-                        config=github
-                    )
-                    db.add(github_integration)
-                    
-                    # Create ArgoCD integration
-                    argocd_integration = Integration(
-                        customer_id=customer_id,
-                        type='argocd',
-                        config=argocd
-                    )
-                    db.add(argocd_integration)
-                    
-                    db.commit()
-                    print(f"✅ Created integrations for {customer_id}")
-                except Exception as db_error:
-                    db.rollback()
-                    print(f"⚠️  Failed to create integrations: {db_error}")
-                finally:
-                    db.close()
-            except Exception as e:
-                print(f"Database error: {e}")
-        
-        # Also store in memory (backward compatibility)
-        if customer_id not in integrations_store:
-            integrations_store[customer_id] = {}
-        
-        integrations_store[customer_id]['github'] = github
-        integrations_store[customer_id]['argocd'] = argocd
-        save_integrations()  # Persist to disk
-        
-        # Step 4: Create K8s namespaces (if k8s available)
-        namespaces_created = []
-        if k8s_available:
-            try:
-                for env in ['dev', 'preprod', 'prod']:
-                    namespace_name = f"{customer_id}-{env}"
+        # Steps 3-6 run as a background job; the client polls its progress
+        async def onboard(job):
+            """Integrations, namespaces, ArgoCD applications and repo templates"""
+            # Step 3: Store integrations (database + in-memory)
+            async with job.step('integrations') as step:
+                if db_available:
+                    from database import SessionLocal
+                    db = SessionLocal()
                     try:
-                        from kubernetes.client import V1Namespace, V1ObjectMeta
-                        namespace = V1Namespace(
-                            metadata=V1ObjectMeta(
-                                name=namespace_name,
-                                labels={
-                                    'customer': customer_id,
-                                    'environment': env,
-                                    'stack': stack,
-                                    'managed-by': 'openluffy'
-                                }
-                            )
+                        # Create GitHub integration
+                        github_integration = Integration(
+                            customer_id=customer_id,
+                            type='github',
+                            config=github
                         )
-                        v1.create_namespace(namespace)
-                        namespaces_created.append(namespace_name)
-                    except Exception as ns_error:
-                        if '409' in str(ns_error):  # Already exists
-                            namespaces_created.append(namespace_name)
-                        else:
-                            print(f"Failed to create namespace {namespace_name}: {ns_error}")
+                        db.add(github_integration)
+                        
+                        # Create ArgoCD integration
+                        argocd_integration = Integration(
+                            customer_id=customer_id,
+                            type='argocd',
+                            config=argocd
+                        )
+                        db.add(argocd_integration)
+                        
+                        db.commit()
+                        print(f"✅ Created integrations for {customer_id}")
+                    except Exception as db_error:
+                        db.rollback()
+                        print(f"⚠️  Failed to create integrations: {db_error}")
+                        step.update(status='error', message=f'Failed to save integrations: {db_error}')
+                    finally:
+                        db.close()
                 
-                result['k8s']['namespaces'] = namespaces_created
-            except Exception as k8s_error:
-                print(f"K8s namespace creation error: {k8s_error}")
-                result['k8s']['error'] = str(k8s_error)
-        
-        # Step 5: Create ArgoCD applications
-        argocd_apps_created = []
-        argocd_errors = []
-        
-        if k8s_available:
-            try:
-                from kubernetes import client
-                custom_api = client.CustomObjectsApi()
+                # Also store in memory (backward compatibility)
+                if customer_id not in integrations_store:
+                    integrations_store[customer_id] = {}
                 
-                environments = [
-                    {'name': 'dev', 'auto_sync': True, 'values_file': 'values/dev.yaml'},
-                    {'name': 'preprod', 'auto_sync': True, 'values_file': 'values/preprod.yaml'},
-                    {'name': 'prod', 'auto_sync': False, 'values_file': 'values/prod.yaml'}
-                ]
+                integrations_store[customer_id]['github'] = github
+                integrations_store[customer_id]['argocd'] = argocd
+                save_integrations()  # Persist to disk
+                if step['status'] == 'running':
+                    step['message'] = 'Saved GitHub and ArgoCD integrations'
+            
+            # Step 4: Create K8s namespaces (if k8s available)
+            if k8s_available:
+                async with job.step('namespaces') as step:
+                    namespaces_created = []
+                    namespace_errors = []
+                    try:
+                        from kubernetes.client import V1Namespace, V1ObjectMeta
+                        
+                        def namespace_body(env):
+                            return V1Namespace(
+                                metadata=V1ObjectMeta(
+                                    name=f"{customer_id}-{env}",
+                                    labels={
+                                        'customer': customer_id,
+                                        'environment': env,
+                                        'stack': stack,
+                                        'managed-by': 'openluffy'
+                                    }
+                                )
+                            )
+                        
+                        envs = ['dev', 'preprod', 'prod']
+                        creations = await fan_out({
+                            env: functools.partial(run_k8s, v1.create_namespace, namespace_body(env))
+                            for env in envs
+                        })
+                        for env in envs:
+                            namespace_name = f"{customer_id}-{env}"
+                            outcome = creations[env]
+                            if outcome['ok'] or '409' in outcome['error']:  # 409: already exists
+                                namespaces_created.append(namespace_name)
+                            else:
+                                namespace_errors.append(namespace_name)
+                                print(f"Failed to create namespace {namespace_name}: {outcome['error']}")
+                        
+                        result['k8s']['namespaces'] = namespaces_created
+                        step['message'] = f"Created {len(namespaces_created)} namespaces"
+                        if namespace_errors:
+                            step.update(status='error', message=f"Failed to create {', '.join(namespace_errors)}")
+                    except Exception as k8s_error:
+                        print(f"K8s namespace creation error: {k8s_error}")
+                        result['k8s']['error'] = str(k8s_error)
+                        step.update(status='error', message=str(k8s_error))
+            else:
+                job.skip('namespaces', 'K8s not available')
+            
+            # Step 5: Create ArgoCD applications
+            argocd_apps_created = []
+            argocd_errors = []
+            
+            if k8s_available:
+                async with job.step('argocd_apps') as step:
+                    try:
+                        custom_api = k8s_client.custom_objects()
                 
-                for env in environments:
-                    app_name = f"{customer_id}-{env['name']}"
-                    namespace = f"{customer_id}-{env['name']}"
+                        environments = [
+                            {'name': 'dev', 'auto_sync': True, 'values_file': 'values/dev.yaml'},
+                            {'name': 'preprod', 'auto_sync': True, 'values_file': 'values/preprod.yaml'},
+                            {'name': 'prod', 'auto_sync': False, 'values_file': 'values/prod.yaml'}
+                        ]
+                
+                        def create_app(env):
+                            """Create one environment's Application and trigger its first sync (blocking)"""
+                            app_name = f"{customer_id}-{env['name']}"
+                            namespace = f"{customer_id}-{env['name']}"
                     
-                    # Dev/preprod use develop branch, prod uses main
-                    target_branch = 'develop' if env['name'] in ['dev', 'preprod'] else 'main'
+                            # Dev/preprod use develop branch, prod uses main
+                            target_branch = 'develop' if env['name'] in ['dev', 'preprod'] else 'main'
                     
-                    argocd_app = {
-                        'apiVersion': 'argoproj.io/v1alpha1',
-                        'kind': 'Application',
-                        'metadata': {
-                            'name': app_name,
-                            'namespace': 'argocd',
-                            'finalizers': ['resources-finalizer.argocd.argoproj.io'],
-                            'labels': {
-                                'customer': customer_id,
-                                'environment': env['name'],
-                                'managed-by': 'openluffy'
-                            }
-                        },
-                        'spec': {
-                            'project': 'default',
-                            'source': {
-                                'repoURL': f"https://github.com/{github['org']}/{github['repo']}.git",
-                                'targetRevision': target_branch,
-                                'path': 'helm/app',
-                                'helm': {
-                                    'valueFiles': [env['values_file']]
-                                }
-                            },
-                            'destination': {
-                                'server': 'https://kubernetes.default.svc',
-                                'namespace': namespace
-                            },
-                            'syncPolicy': {
-                                'automated': {
-                                    'prune': env['auto_sync'],
-                                    'selfHeal': env['auto_sync']
-                                } if env['auto_sync'] else None,
-                                'syncOptions': ['CreateNamespace=true'],
-                                'retry': {
-                                    'limit': 5,
-                                    'backoff': {
-                                        'duration': '5s',
-                                        'factor': 2,
-                                        'maxDuration': '3m'
+                            argocd_app = {
+                                'apiVersion': 'argoproj.io/v1alpha1',
+                                'kind': 'Application',
+                                'metadata': {
+                                    'name': app_name,
+                                    'namespace': 'argocd',
+                                    'finalizers': ['resources-finalizer.argocd.argoproj.io'],
+                                    'labels': {
+                                        'customer': customer_id,
+                                        'environment': env['name'],
+                                        'managed-by': 'openluffy'
+                                    }
+                                },
+                                'spec': {
+                                    'project': 'default',
+                                    'source': {
+                                        'repoURL': f"https://github.com/{github['org']}/{github['repo']}.git",
+                                        'targetRevision': target_branch,
+                                        'path': 'helm/app',
+                                        'helm': {
+                                            'valueFiles': [env['values_file']]
+                                        }
+                                    },
+                                    'destination': {
+                                        'server': 'https://kubernetes.default.svc',
+                                        'namespace': namespace
+                                    },
+                                    'syncPolicy': {
+                                        'automated': {
+                                            'prune': env['auto_sync'],
+                                            'selfHeal': env['auto_sync']
+                                        } if env['auto_sync'] else None,
+                                        'syncOptions': ['CreateNamespace=true'],
+                                        'retry': {
+                                            'limit': 5,
+                                            'backoff': {
+                                                'duration': '5s',
+                                                'factor': 2,
+                                                'maxDuration': '3m'
+                                            }
+                                        }
                                     }
                                 }
                             }
-                        }
-                    }
                     
-                    try:
-                        custom_api.create_namespaced_custom_object(
-                            group='argoproj.io',
-                            version='v1alpha1',
-                            namespace='argocd',
-                            plural='applications',
-                            body=argocd_app
-                        )
-                        argocd_apps_created.append(app_name)
-                        print(f"✅ Created ArgoCD app: {app_name}")
+                            try:
+                                custom_api.create_namespaced_custom_object(
+                                    group='argoproj.io',
+                                    version='v1alpha1',
+                                    namespace='argocd',
+                                    plural='applications',
+                                    body=argocd_app
+                                )
+                                print(f"✅ Created ArgoCD app: {app_name}")
                         
-                        # Trigger immediate sync (don't wait for 3min reconciliation loop)
-                        try:
-                            sync_patch = {
-                                'operation': {
-                                    'sync': {
-                                        'revision': target_branch
+                                # Trigger immediate sync (don't wait for 3min reconciliation loop)
+                                try:
+                                    sync_patch = {
+                                        'operation': {
+                                            'sync': {
+                                                'revision': target_branch
+                                            }
+                                        }
                                     }
-                                }
-                            }
-                            custom_api.patch_namespaced_custom_object(
-                                group='argoproj.io',
-                                version='v1alpha1',
-                                namespace='argocd',
-                                plural='applications',
-                                name=app_name,
-                                body=sync_patch
-                            )
-                            print(f"🔄 Triggered immediate sync for: {app_name}")
-                        except Exception as sync_error:
-                            # Non-critical - ArgoCD will sync eventually
-                            print(f"⚠️ Couldn't trigger sync for {app_name}: {sync_error}")
-                    except Exception as app_error:
-                        if '409' in str(app_error):  # Already exists
-                            argocd_apps_created.append(f"{app_name} (already exists)")
-                        else:
-                            error_msg = f"Failed to create {app_name}: {str(app_error)}"
-                            argocd_errors.append(error_msg)
-                            print(f"❌ {error_msg}")
+                                    custom_api.patch_namespaced_custom_object(
+                                        group='argoproj.io',
+                                        version='v1alpha1',
+                                        namespace='argocd',
+                                        plural='applications',
+                                        name=app_name,
+                                        body=sync_patch
+                                    )
+                                    print(f"🔄 Triggered immediate sync for: {app_name}")
+                                except Exception as sync_error:
+                                    # Non-critical - ArgoCD will sync eventually
+                                    print(f"⚠️ Couldn't trigger sync for {app_name}: {sync_error}")
+                                return app_name
+                            except Exception as app_error:
+                                if '409' in str(app_error):  # Already exists
+                                    return f"{app_name} (already exists)"
+                                raise
                 
-                result['argocd']['applications'] = argocd_apps_created
-                if argocd_errors:
-                    result['argocd']['errors'] = argocd_errors
-                    result['argocd']['message'] = f'Created {len(argocd_apps_created)} apps with {len(argocd_errors)} errors'
-                else:
-                    result['argocd']['message'] = f'Successfully created {len(argocd_apps_created)} ArgoCD applications'
-                    
-            except Exception as argocd_error:
-                result['argocd']['error'] = str(argocd_error)
-                result['argocd']['message'] = 'Failed to create ArgoCD applications'
-                print(f"ArgoCD creation error: {argocd_error}")
-        else:
-            result['argocd']['applications'] = []
-            result['argocd']['message'] = 'K8s not available - ArgoCD apps not created'
+                        
+                        # One K8s executor call per environment, run concurrently
+                        outcomes = await fan_out({
+                            env['name']: functools.partial(run_k8s, create_app, env)
+                            for env in environments
+                        })
+                        for env in environments:
+                            outcome = outcomes[env['name']]
+                            if outcome['ok']:
+                                argocd_apps_created.append(outcome['value'])
+                            else:
+                                error_msg = f"Failed to create {customer_id}-{env['name']}: {outcome['error']}"
+                                argocd_errors.append(error_msg)
+                                print(f"❌ {error_msg}")
+                        
+                        result['argocd']['applications'] = argocd_apps_created
+                        if argocd_errors:
+                            result['argocd']['errors'] = argocd_errors
+                            result['argocd']['message'] = f'Created {len(argocd_apps_created)} apps with {len(argocd_errors)} errors'
+                            step['status'] = 'error'
+                        else:
+                            result['argocd']['message'] = f'Successfully created {len(argocd_apps_created)} ArgoCD applications'
+                        step['message'] = result['argocd']['message']
+                            
+                    except Exception as argocd_error:
+                        result['argocd']['error'] = str(argocd_error)
+                        result['argocd']['message'] = 'Failed to create ArgoCD applications'
+                        print(f"ArgoCD creation error: {argocd_error}")
+                        step.update(status='error', message=str(argocd_error))
+            else:
+                result['argocd']['applications'] = []
+                result['argocd']['message'] = 'K8s not available - ArgoCD apps not created'
+                job.skip('argocd_apps', result['argocd']['message'])
+            
+            # Step 6: Push CI/CD templates to GitHub repo (git clone/push, off the event loop)
+            async with job.step('repo_templates') as step:
+                template_result = await asyncio.to_thread(initialize_customer_repo, customer_id, customer_name, stack, github)
+                result['github'].update(template_result)
+                step['message'] = template_result['message'] or '; '.join(template_result['errors'])
+                if template_result['errors']:
+                    step['status'] = 'error'
+            
+            if k8s_available:
+                # Blocking DB reads and index rebuilds - off the event loop
+                await asyncio.to_thread(deployment_index.refresh_customers)
+                await asyncio.to_thread(approvals_engine.refresh_customers)
+                pipeline_tracker.invalidate_repos()
+            
+            job.result = result
         
-        # Step 6: Push CI/CD templates to GitHub repo
-        template_result = initialize_customer_repo(customer_id, customer_name, stack, github)
-        result['github'].update(template_result)
+        job = provisioner.submit(
+            customer_id, ['github_repo', 'customer_record', 'integrations', 'namespaces', 'argocd_apps', 'repo_templates'],
+            onboard, persist=customer_saved
+        )
+        job.record('github_repo', result['github']['message'], github_started)
+        job.record('customer_record', customer_message, customer_started, status='success' if customer_saved or not db_available else 'error')
         
-        return result
+        return JSONResponse(status_code=202, content={
+            'success': True,
+            'job_id': job.id,
+            'customer_id': customer_id,
+            'customer_name': customer_name,
+            'status': job.status,
+            'progress_url': f'/provisioning/jobs/{job.id}'
+        })
         
     except Exception as e:
         return JSONResponse(status_code=500, content={'error': str(e)})
 
+@app.get("/provisioning/jobs/{job_id}")
+def get_provisioning_job(job_id: str):
+    """Progress of a customer onboarding job (steps with status and timing)"""
+    job = provisioner.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={'error': f'Provisioning job {job_id} not found'})
+    return job
+
+@app.get("/customers/{customer_id}/provisioning")
+def get_customer_provisioning(customer_id: str):
+    """Latest onboarding job of a customer"""
+    job = provisioner.latest(customer_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={'error': f'No provisioning job for customer {customer_id}'})
+    return job
+
 @app.post("/customers/{customer_id}/reinitialize")
 async def reinitialize_customer_repo(customer_id: str, request: Request):
     """
@@ -1338,70 +1563,71 @@ async def delete_customer(customer_id: str, request: Request, db: Session = Depe
         # Step 2: Delete ArgoCD applications
         if k8s_available:
             try:
-                from kubernetes import client
-                custom_api = client.CustomObjectsApi()
+                custom_api = k8s_client.custom_objects()
                 
-                for env in ['dev', 'preprod', 'prod']:
-                    app_name = f"{customer_id}-{env}"
-                    try:
-                        custom_api.delete_namespaced_custom_object(
-                            group="argoproj.io",
-                            version="v1alpha1",
-                            namespace="argocd",
-                            plural="applications",
-                            name=app_name
-                        )
+                app_names = [f"{customer_id}-{env}" for env in ['dev', 'preprod', 'prod']]
+                deletions = await fan_out({
+                    app_name: functools.partial(
+                        run_k8s,
+                        custom_api.delete_namespaced_custom_object,
+                        group="argoproj.io",
+                        version="v1alpha1",
+                        namespace="argocd",
+                        plural="applications",
+                        name=app_name
+                    )
+                    for app_name in app_names
+                })
+                for app_name in app_names:
+                    outcome = deletions[app_name]
+                    if outcome['ok']:
                         result['deleted']['argocd_apps'].append(app_name)
-                    except Exception as e:
-                        if '404' not in str(e):  # Ignore if doesn't exist
-                            result['errors'].append(f'Failed to delete ArgoCD app {app_name}: {e}')
+                    elif '404' not in outcome['error']:  # Ignore if doesn't exist
+                        result['errors'].append(f"Failed to delete ArgoCD app {app_name}: {outcome['error']}")
             except Exception as e:
                 result['errors'].append(f'ArgoCD deletion error: {e}')
         
         # Step 3: Delete K8s namespaces
         if k8s_available:
             try:
-                for env in ['dev', 'preprod', 'prod']:
-                    namespace_name = f"{customer_id}-{env}"
-                    try:
-                        v1.delete_namespace(namespace_name)
+                namespace_names = [f"{customer_id}-{env}" for env in ['dev', 'preprod', 'prod']]
+                deletions = await fan_out({
+                    namespace_name: functools.partial(run_k8s, v1.delete_namespace, namespace_name)
+                    for namespace_name in namespace_names
+                })
+                for namespace_name in namespace_names:
+                    outcome = deletions[namespace_name]
+                    if outcome['ok']:
                         result['deleted']['k8s_namespaces'].append(namespace_name)
-                    except Exception as e:
-                        if '404' not in str(e):  # Ignore if doesn't exist
-                            result['errors'].append(f'Failed to delete namespace {namespace_name}: {e}')
+                    elif '404' not in outcome['error']:  # Ignore if doesn't exist
+                        result['errors'].append(f"Failed to delete namespace {namespace_name}: {outcome['error']}")
             except Exception as e:
                 result['errors'].append(f'K8s namespace deletion error: {e}')
         
         # Step 4: Archive or delete GitHub repository
         if github_config:
             try:
-                import requests
-                
                 org = github_config.get('org')
                 repo = github_config.get('repo')
                 token = github_config.get('token')
                 
                 if delete_repo:
                     # Permanently delete repository
-                    delete_url = f"https://api.github.com/repos/{org}/{repo}"
-                    delete_response = requests.delete(delete_url, headers={
-                        'Authorization': f"token {token}",
-                        'Accept': 'application/vnd.github.v3+json'
-                    })
+                    delete_response = await github_api.request(
+                        'DELETE', f"/repos/{org}/{repo}", token=token, customer=customer_id
+                    )
                     
-                    if delete_response.ok or delete_response.status_code == 404:
+                    if delete_response.is_success or delete_response.status_code == 404:
                         result['deleted']['github_repo'] = f'Deleted: {org}/{repo}'
                     else:
                         result['errors'].append(f'Failed to delete repo: {delete_response.json().get("message", "Unknown error")}')
                 else:
                     # Archive repository (safer)
-                    archive_url = f"https://api.github.com/repos/{org}/{repo}"
-                    archive_response = requests.patch(archive_url, json={'archived': True}, headers={
-                        'Authorization': f"token {token}",
-                        'Accept': 'application/vnd.github.v3+json'
-                    })
+                    archive_response = await github_api.request(
+                        'PATCH', f"/repos/{org}/{repo}", token=token, customer=customer_id, json={'archived': True}
+                    )
                     
-                    if archive_response.ok:
+                    if archive_response.is_success:
                         result['deleted']['github_repo'] = f'Archived: {org}/{repo}'
                     else:
                         result['errors'].append(f'Failed to archive repo: {archive_response.json().get("message", "Unknown error")}')
@@ -1440,6 +1666,11 @@ async def delete_customer(customer_id: str, request: Request, db: Session = Depe
             del integrations_store[customer_id]
             save_integrations()
         
+        if k8s_available:
+            await asyncio.to_thread(deployment_index.refresh_customers)
+            await asyncio.to_thread(approvals_engine.refresh_customers)
+            pipeline_tracker.invalidate_repos()
+        
         # Determine overall success
         result['success'] = len(result['errors']) == 0
         
@@ -1448,70 +1679,50 @@ async def delete_customer(customer_id: str, request: Request, db: Session = Depe
     except Exception as e:
         return JSONResponse(status_code=500, content={'error': str(e)})
 @app.get("/deployments")
-def get_deployments():
-    """Get all deployments across all customer namespaces and environments - dynamically discovered"""
-    if not k8s_available:
-        return {'error': 'K8s not available', 'deployments': [], 'total': 0}
+def get_deployments(
+    request: Request,
+    customer: Optional[str] = None,
+    environment: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """Get all deployments across all customer namespaces and environments - dynamically discovered
     
-    deployments = []
+    Query params:
+    - customer, environment, status: server-side filters
+    - limit: page size (max DEPLOYMENTS_PAGE_MAX); without it every match is returned
+    - cursor: `next_cursor` from the previous page
     
-    # Discover all customer namespaces dynamically
+    Pages are ordered by (namespace, name) and the cursor is a keyset
+    position, so deployments created or deleted between requests don't shift
+    later pages.
+    """
     try:
-        all_namespaces = v1.list_namespace()
-        
-        for ns_obj in all_namespaces.items:
-            ns_name = ns_obj.metadata.name
-            labels = ns_obj.metadata.labels or {}
-            
-            # Check if this is a customer namespace
-            customer_id = None
-            env = None
-            
-            if 'customer' in labels and 'environment' in labels:
-                # Namespace created by OpenLuffy (has our labels)
-                customer_id = labels['customer']
-                env = labels['environment']
-            elif '-dev' in ns_name or '-preprod' in ns_name or '-prod' in ns_name:
-                # Legacy namespace (pattern-based: customer-id-env)
-                if ns_name.endswith('-dev'):
-                    customer_id = ns_name.replace('-dev', '')
-                    env = 'dev'
-                elif ns_name.endswith('-preprod'):
-                    customer_id = ns_name.replace('-preprod', '')
-                    env = 'preprod'
-                elif ns_name.endswith('-prod'):
-                    customer_id = ns_name.replace('-prod', '')
-                    env = 'prod'
-            
-            if customer_id and env:
-                # Get deployments from this namespace
-                try:
-                    deploys = apps_v1.list_namespaced_deployment(ns_name)
-                    
-                    for deploy in deploys.items:
-                        name = deploy.metadata.name
-                        replicas = deploy.status.replicas or 0
-                        ready = deploy.status.ready_replicas or 0
-                        
-                        deployments.append({
-                            'id': f"{ns_name}-{name}",
-                            'name': name,
-                            'namespace': ns_name,
-                            'customer': customer_id,
-                            'environment': env,
-                            'replicas': replicas,
-                            'ready': ready,
-                            'status': 'running' if ready == replicas and ready > 0 else 'degraded',
-                            'image': deploy.spec.template.spec.containers[0].image
-                        })
-                except ApiException as e:
-                    # Namespace exists but no deployments or access denied
-                    pass
-    
-    except Exception as e:
-        print(f"Error discovering deployments: {e}")
-    
-    return {'deployments': deployments, 'total': len(deployments)}
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+    if limit is not None:
+        limit = max(1, min(limit, DEPLOYMENTS_PAGE_MAX))
+    
+    etag = version_etag(
+        'deployments', cluster_cache.version('namespaces', 'deployments'),
+        {'customer': customer, 'environment': environment, 'status': status, 'limit': limit, 'after': after}
+    )
+    if etag_matches(request, etag):
+        return not_modified('/deployments', etag)
+    
+    body = build_deployments(customer=customer, environment=environment, status=status, limit=limit, after=after)
+    return conditional_json(request, '/deployments', body, etag)
+
+
+def build_deployments(customer: Optional[str] = None, environment: Optional[str] = None,
+                      status: Optional[str] = None, limit: Optional[int] = None, after=None):
+    """Deployments in customer namespaces (shared by GET /deployments and live updates)"""
+    if not k8s_available:
+        return {'error': 'K8s not available', 'deployments': [], 'total': 0}
+    return list_deployments(v1, apps_v1, customer=customer, environment=environment, status=status,
+                            limit=limit, after=after)
 
 # Integration models
 class IntegrationConfig(BaseModel):
@@ -1520,15 +1731,21 @@ class IntegrationConfig(BaseModel):
     config: Dict[str, Any]
 
 @app.get("/integrations")
-def get_integrations():
+def get_integrations(request: Request):
     """Get all configured integrations"""
+    # Content-hash ETag: the K8s card comes from platform_health counters, not cluster cache versions
+    return conditional_json(request, '/integrations', build_integrations())
+
+
+def build_integrations():
+    """Integration cards (K8s summary from the cluster cache plus configured integrations)"""
     integrations = []
     
     # Always include K8s (it's available if we're running in K8s)
     if k8s_available:
         try:
-            deploys = apps_v1.list_deployment_for_all_namespaces()
-            pod_count = sum(d.status.replicas or 0 for d in deploys.items)
+            # Counter snapshot - no cluster-wide listing per request
+            health = platform_health.snapshot()
             
             integrations.append({
                 'id': 'kubernetes',
@@ -1537,8 +1754,8 @@ def get_integrations():
                 'status': 'healthy',
                 'statusText': 'Cluster healthy',
                 'metrics': {
-                    'Deployments': len(deploys.items),
-                    'Pods': f'{pod_count} running',
+                    'Deployments': health['deployments']['total'],
+                    'Pods': f"{health['pods']['running']} running",
                     'Cluster': 'K3s on Pi5'
                 }
             })
@@ -1617,15 +1834,19 @@ def get_integration_status(integration_id: str):
     if integration_id == 'kubernetes' and k8s_available:
         try:
             nodes = v1.list_node()
-            pods = v1.list_pod_for_all_namespaces()
+            pods = cluster_cache.pods(fallback=shared(
+                ('fastlist.list_pod_for_all_namespaces', ''),
+                lambda: fastlist.list_pods(v1.list_pod_for_all_namespaces),
+                SINGLEFLIGHT_TTL
+            ))
             
             return {
                 'id': 'kubernetes',
                 'status': 'healthy',
                 'metrics': {
                     'Nodes': len(nodes.items),
-                    'Pods': len(pods.items),
-                    'Namespaces': len(set(p.metadata.namespace for p in pods.items))
+                    'Pods': len(pods),
+                    'Namespaces': len(set(p.metadata.namespace for p in pods))
                 }
             }
         except:
@@ -1663,41 +1884,37 @@ def get_deployment_details(deployment_id: str):
     if not k8s_available:
         return {'error': 'K8s not available'}
     
-    # Parse deployment_id (format: namespace-deploymentname)
-    parts = deployment_id.rsplit('-', 1)
-    if len(parts) < 2:
-        raise HTTPException(status_code=400, detail='Invalid deployment ID format')
-    
-    namespace = '-'.join(parts[:-1])
-    deployment_name = parts[-1]
+    namespace, deployment_name = parse_deployment_id(deployment_id)
+    if not namespace or not deployment_name:
+        raise HTTPException(status_code=404, detail=f'Deployment not found: {deployment_id}')
     
     try:
         # Get deployment details
-        deployment = apps_v1.read_namespaced_deployment(deployment_name, namespace)
+        deployment = read_deployment(namespace, deployment_name)
         
         # Get pods for this deployment
-        label_key = list(deployment.spec.selector.match_labels.keys())[0]
-        label_value = deployment.spec.selector.match_labels[label_key]
-        pods = v1.list_namespaced_pod(
+        match_labels = deployment.spec.selector.match_labels
+        label_selector = ','.join(f"{k}={v}" for k, v in match_labels.items())
+        pods = cluster_cache.pods(
             namespace,
-            label_selector=f"{label_key}={label_value}"
+            selector=match_labels,
+            fallback=pod_fallback(namespace, label_selector)
         )
         
-        # Get recent events
-        events = v1.list_namespaced_event(namespace)
+        # Get recent events (field-selected for the deployment, its ReplicaSets and pods)
+        events, _ = list_deployment_events(v1, apps_v1, namespace, deployment, pods=pods, limit=10)
         deployment_events = []
-        for event in events.items[-20:]:  # Last 20 events
-            if deployment_name in str(event.involved_object.name):
-                deployment_events.append({
-                    'timestamp': event.last_timestamp.isoformat() if event.last_timestamp else str(event.first_timestamp),
-                    'type': event.type,
-                    'reason': event.reason,
-                    'message': event.message
-                })
+        for event in events:
+            deployment_events.append({
+                'timestamp': event_timestamp(event).isoformat(),
+                'type': event.type,
+                'reason': event.reason,
+                'message': event.message
+            })
         
         # Build pod details
         pod_details = []
-        for pod in pods.items:
+        for pod in pods:
             pod_info = {
                 'name': pod.metadata.name,
                 'status': pod.status.phase,
@@ -1747,8 +1964,9 @@ def get_pod_logs(deployment_id: str, pod_name: str, lines: int = 100, container:
     if not k8s_available:
         return {'error': 'K8s not available'}
     
-    parts = deployment_id.rsplit('-', 1)
-    namespace = '-'.join(parts[:-1])
+    namespace, _ = parse_deployment_id(deployment_id)
+    if not namespace:
+        raise HTTPException(status_code=404, detail=f'Deployment not found: {deployment_id}')
     
     try:
         logs = v1.read_namespaced_pod_log(
@@ -1768,39 +1986,155 @@ def get_pod_logs(deployment_id: str, pod_name: str, lines: int = 100, container:
     except ApiException as e:
         raise HTTPException(status_code=404, detail=f'Pod logs not found: {str(e)}')
 
+@app.get("/deployments/{deployment_id}/pods/{pod_name}/logs/stream")
+async def stream_pod_logs(
+    deployment_id: str,
+    pod_name: str,
+    container: Optional[str] = None,
+    follow: bool = True,
+    lines: Optional[int] = 100,
+    since_seconds: Optional[int] = None,
+    timestamps: bool = False,
+    format: str = 'text'
+):
+    """
+    Stream logs from a specific pod
+    
+    Holds one upstream follow stream per open log view instead of repeated
+    tail reads. Query params:
+    - container: container name (multi-container pods)
+    - follow: keep the stream open for new lines (default true)
+    - lines: initial tail size (default 100)
+    - since_seconds: only lines newer than this many seconds
+    - timestamps: prefix each line with its RFC3339 timestamp
+    - format: 'text' (chunked text/plain, default) or 'sse' (text/event-stream)
+    """
+    if not k8s_available:
+        return JSONResponse(status_code=503, content={'error': 'K8s not available'})
+    
+    namespace, _ = await run_k8s(parse_deployment_id, deployment_id)
+    if not namespace:
+        raise HTTPException(status_code=404, detail=f'Deployment not found: {deployment_id}')
+    
+    stream = PodLogStream(
+        v1, namespace, pod_name,
+        container=container,
+        follow=follow,
+        tail_lines=lines,
+        since_seconds=since_seconds,
+        timestamps=timestamps
+    )
+    try:
+        await stream.open()
+    except ApiException as e:
+        status = e.status if e.status in (404, 429, 504) else 400
+        raise HTTPException(status_code=status, detail=f'Pod logs not available: {e.reason}')
+    
+    headers = {
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Don't let nginx buffer the stream
+    }
+    if format == 'sse':
+        return LogStreamResponse(stream, sse_lines(stream), media_type='text/event-stream', headers=headers)
+    return LogStreamResponse(stream, text_chunks(stream), media_type='text/plain; charset=utf-8', headers=headers)
+
+@app.get("/deployments/{deployment_id}/logs")
+async def get_deployment_logs(
+    deployment_id: str,
+    container: Optional[str] = None,
+    lines: Optional[int] = 200,
+    since_seconds: Optional[int] = None,
+    timestamps: bool = False,
+    follow: bool = False,
+    max_lines: int = LOG_FANOUT_MAX_LINES,
+    max_bytes: int = LOG_FANOUT_MAX_BYTES
+):
+    """
+    Logs from every pod of a deployment, merged into one stream
+    
+    Each line is prefixed with [pod/container]. Pods are read concurrently;
+    without follow the result is ordered by log timestamp, with follow=true
+    lines are interleaved as they arrive. max_lines/max_bytes form a global
+    budget (capped server-side) split fairly across pods.
+    """
+    if not k8s_available:
+        return JSONResponse(status_code=503, content={'error': 'K8s not available'})
+    
+    namespace, deployment_name = await run_k8s(parse_deployment_id, deployment_id)
+    if not namespace or not deployment_name:
+        raise HTTPException(status_code=404, detail=f'Deployment not found: {deployment_id}')
+    
+    try:
+        deployment = await run_k8s(read_deployment, namespace, deployment_name)
+        match_labels = deployment.spec.selector.match_labels
+        label_selector = ','.join(f"{k}={v}" for k, v in match_labels.items())
+        pods = await run_k8s(
+            cluster_cache.pods,
+            namespace,
+            selector=match_labels,
+            fallback=pod_fallback(namespace, label_selector)
+        )
+    except ApiException as e:
+        raise HTTPException(status_code=404, detail=f'Deployment not found: {e.reason}')
+    
+    targets = log_targets(pods, container)
+    budget = {
+        'max_lines': max(1, min(max_lines, LOG_FANOUT_MAX_LINES)),
+        'max_bytes': max(1024, min(max_bytes, LOG_FANOUT_MAX_BYTES))
+    }
+    
+    if follow:
+        body = follow_logs(v1, namespace, targets, tail_lines=lines, since_seconds=since_seconds,
+                           timestamps=timestamps, **budget)
+    else:
+        body = aggregate_logs(v1, namespace, targets, run_k8s, tail_lines=lines, since_seconds=since_seconds,
+                              timestamps=timestamps, **budget)
+    
+    return StreamingResponse(
+        body,
+        media_type='text/plain; charset=utf-8',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.get("/deployments/{deployment_id}/events")
 def get_deployment_events(deployment_id: str, limit: int = 50):
     """Get all events for a deployment"""
     if not k8s_available:
         return {'error': 'K8s not available'}
     
-    parts = deployment_id.rsplit('-', 1)
-    namespace = '-'.join(parts[:-1])
-    deployment_name = parts[-1]
+    namespace, deployment_name = parse_deployment_id(deployment_id)
+    if not namespace or not deployment_name:
+        raise HTTPException(status_code=404, detail=f'Deployment not found: {deployment_id}')
     
     try:
-        events = v1.list_namespaced_event(namespace)
+        deployment = read_deployment(namespace, deployment_name)
+        match_labels = deployment.spec.selector.match_labels
+        label_selector = ','.join(f"{k}={v}" for k, v in match_labels.items())
+        pods = cluster_cache.pods(
+            namespace,
+            selector=match_labels,
+            fallback=pod_fallback(namespace, label_selector)
+        )
         
-        deployment_events = []
-        for event in events.items:
-            if deployment_name in str(event.involved_object.name):
-                deployment_events.append({
-                    'timestamp': str(event.last_timestamp if event.last_timestamp else event.first_timestamp),
-                    'type': event.type,
-                    'reason': event.reason,
-                    'message': event.message,
-                    'count': event.count,
-                    'object': event.involved_object.name
-                })
+        # Newest first, picked with a heap over real timestamps
+        events, total = list_deployment_events(v1, apps_v1, namespace, deployment, pods=pods, limit=limit)
         
-        # Sort by timestamp descending
-        deployment_events.sort(key=lambda x: x['timestamp'], reverse=True)
+        deployment_events = []
+        for event in events:
+            deployment_events.append({
+                'timestamp': event_timestamp(event).isoformat(),
+                'type': event.type,
+                'reason': event.reason,
+                'message': event.message,
+                'count': event.count,
+                'object': event.involved_object.name
+            })
         
         return {
             'deployment': deployment_id,
             'namespace': namespace,
-            'events': deployment_events[:limit],
-            'total': len(deployment_events)
+            'events': deployment_events,
+            'total': total
         }
     except ApiException as e:
         raise HTTPException(status_code=404, detail=f'Events not found: {str(e)}')
@@ -1811,29 +2145,34 @@ def parse_deployment_id(deployment_id: str):
     Format: {namespace}-{deployment-name}
     Challenge: both can contain hyphens
     
-    Solution: Look up in deployments list to get the actual mapping
+    Solution: O(1) lookup in the maintained deployment index
     """
-    # Get all deployments to find the match
     if not k8s_available:
         return None, None
     
-    # Try to find the deployment in our list
-    customers = ['acme-corp', 'techstart', 'widgetco']
-    environments = ['dev', 'preprod', 'prod']
-    
-    for customer in customers:
-        for env in environments:
-            ns = f"{customer}-{env}"
-            try:
-                deploys = apps_v1.list_namespaced_deployment(ns)
-                for deploy in deploys.items:
-                    expected_id = f"{ns}-{deploy.metadata.name}"
-                    if expected_id == deployment_id:
-                        return ns, deploy.metadata.name
-            except:
-                continue
+    location = deployment_index.resolve(deployment_id)
+    if not location:
+        return None, None
     
-    return None, None
+    return location
+
+
+def read_deployment(namespace: str, deployment_name: str):
+    """Deployment object (concurrent identical reads share one API call)"""
+    return singleflight.call(
+        ('k8s.read_namespaced_deployment', namespace, deployment_name),
+        lambda: apps_v1.read_namespaced_deployment(deployment_name, namespace),
+        SINGLEFLIGHT_TTL
+    )
+
+
+def pod_fallback(namespace: str, label_selector: str):
+    """Coalesced pod listing for cluster cache misses"""
+    return shared(
+        ('k8s.list_namespaced_pod', namespace, label_selector),
+        lambda: v1.list_namespaced_pod(namespace, label_selector=label_selector).items,
+        SINGLEFLIGHT_TTL
+    )
 
 @app.get("/deployments/{deployment_id}/details-v2")
 def get_deployment_details_v2(deployment_id: str):
@@ -1848,28 +2187,31 @@ def get_deployment_details_v2(deployment_id: str):
     
     try:
         # Get deployment details
-        deployment = apps_v1.read_namespaced_deployment(deployment_name, namespace)
+        deployment = read_deployment(namespace, deployment_name)
         
         # Get pods
-        label_key = list(deployment.spec.selector.match_labels.keys())[0]
-        label_value = deployment.spec.selector.match_labels[label_key]
-        pods = v1.list_namespaced_pod(namespace, label_selector=f"{label_key}={label_value}")
+        match_labels = deployment.spec.selector.match_labels
+        label_selector = ','.join(f"{k}={v}" for k, v in match_labels.items())
+        pods = cluster_cache.pods(
+            namespace,
+            selector=match_labels,
+            fallback=pod_fallback(namespace, label_selector)
+        )
         
         # Get events
-        events = v1.list_namespaced_event(namespace)
+        events, _ = list_deployment_events(v1, apps_v1, namespace, deployment, pods=pods, limit=10)
         deployment_events = []
-        for event in events.items[-20:]:
-            if deployment_name in str(event.involved_object.name):
-                deployment_events.append({
-                    'timestamp': str(event.last_timestamp or event.first_timestamp),
-                    'type': event.type,
-                    'reason': event.reason,
-                    'message': event.message
-                })
+        for event in events:
+            deployment_events.append({
+                'timestamp': event_timestamp(event).isoformat(),
+                'type': event.type,
+                'reason': event.reason,
+                'message': event.message
+            })
         
         # Build pod details
         pod_details = []
-        for pod in pods.items:
+        for pod in pods:
             pod_info = {
                 'name': pod.metadata.name,
                 'status': pod.status.phase,
@@ -1921,10 +2263,9 @@ def promote_to_production(customer_id: str):
     try:
         # Import kubernetes dynamic client for patching
         from kubernetes import dynamic
-        from kubernetes.client import api_client
         
         dyn_client = dynamic.DynamicClient(
-            api_client.ApiClient()
+            k8s_client.api_client()
         )
         
         # Get ArgoCD Application API
@@ -1969,49 +2310,16 @@ def promote_to_production(customer_id: str):
 
 @app.get("/customers/{customer_id}/approval-status")
 def get_approval_status(customer_id: str):
-    """Check if customer has pending production approval"""
+    """Check if customer has pending production approval
+    
+    Compares every container of every preprod deployment with prod; `drift`
+    lists each differing (deployment, container) pair.
+    """
     if not k8s_available:
         return {'error': 'K8s not available'}
     
     try:
-        # Check preprod vs prod status
-        preprod_ns = f"{customer_id}-preprod"
-        prod_ns = f"{customer_id}-prod"
-        
-        preprod_deploys = apps_v1.list_namespaced_deployment(preprod_ns)
-        prod_deploys = apps_v1.list_namespaced_deployment(prod_ns)
-        
-        if not preprod_deploys.items or not prod_deploys.items:
-            return {
-                'customer': customer_id,
-                'approval_needed': False,
-                'reason': 'No deployments found'
-            }
-        
-        preprod_deploy = preprod_deploys.items[0]
-        prod_deploy = prod_deploys.items[0]
-        
-        preprod_image = preprod_deploy.spec.template.spec.containers[0].image
-        prod_image = prod_deploy.spec.template.spec.containers[0].image
-        
-        # If images differ, approval might be needed
-        approval_needed = preprod_image != prod_image
-        
-        return {
-            'customer': customer_id,
-            'approval_needed': approval_needed,
-            'preprod': {
-                'image': preprod_image,
-                'ready': preprod_deploy.status.ready_replicas or 0,
-                'replicas': preprod_deploy.spec.replicas
-            },
-            'prod': {
-                'image': prod_image,
-                'ready': prod_deploy.status.ready_replicas or 0,
-                'replicas': prod_deploy.spec.replicas
-            }
-        }
-        
+        return approvals_engine.status(customer_id)
     except Exception as e:
         return {
             'customer': customer_id,
@@ -2020,37 +2328,26 @@ def get_approval_status(customer_id: str):
         }
 
 @app.get("/approvals/pending")
-def get_pending_approvals():
+def get_pending_approvals(request: Request):
     """Get all customers with pending production approvals"""
+    etag = version_etag('approvals', approvals_engine.version())
+    if etag_matches(request, etag):
+        return not_modified('/approvals/pending', etag)
+    return conditional_json(request, '/approvals/pending', build_pending_approvals(), etag)
+
+
+def build_pending_approvals():
+    """Customers (from the customers table) whose preprod differs from prod"""
     if not k8s_available:
         return {'approvals': [], 'total': 0}
     
-    customers = ['acme-corp', 'techstart', 'widgetco']
-    pending = []
-    
-    for customer in customers:
-        status = get_approval_status(customer)
-        if status.get('approval_needed'):
-            pending.append({
-                'customer_id': customer,
-                'customer_name': customer.replace('-', ' ').title(),
-                'preprod_image': status['preprod']['image'],
-                'prod_image': status['prod']['image'],
-                'preprod_ready': status['preprod']['ready'],
-                'prod_ready': status['prod']['ready']
-            })
-    
+    pending = approvals_engine.pending()
     return {
         'approvals': pending,
         'total': len(pending)
     }
 
-# GitHub Actions Integration
-CUSTOMER_REPOS = {
-    'acme-corp': 'lebrick07/acme-corp-api',
-    'techstart': 'lebrick07/techstart-webapp',
-    'widgetco': 'lebrick07/widgetco-api'
-}
+# GitHub Actions Integration (customer repos come from the integrations table)
 
 @app.get("/deployments/{deployment_id}/pipeline")
 async def get_deployment_pipeline(deployment_id: str):
@@ -2074,72 +2371,43 @@ async def get_deployment_pipeline(deployment_id: str):
     environment = parts[env_index]
     
     # Get GitHub repo
-    repo = CUSTOMER_REPOS.get(customer)
-    if not repo:
+    source = await pipeline_tracker.repo_for(customer)
+    if not source:
         return {'runs': [], 'total': 0, 'error': f'No repo mapping for {customer}'}
+    repo = source['repo']
     
-    # Fetch workflow runs from GitHub API
-    github_token = os.getenv('GITHUB_TOKEN', '')
-    headers = {
-        'Accept': 'application/vnd.github.v3+json'
-    }
-    if github_token:
-        headers['Authorization'] = f'token {github_token}'
-    
+    # Workflow runs (webhook-fed state, else the GitHub API)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f'https://api.github.com/repos/{repo}/actions/runs',
-                headers=headers,
-                params={'per_page': 10, 'page': 1}
-            )
+        runs = []
+        for run in await pipeline_tracker.runs(customer, source):
+            runs.append({
+                'id': run['id'],
+                'name': run['name'],
+                'status': run['status'],
+                'conclusion': run['conclusion'],
+                'branch': run['head_branch'],
+                'commit_sha': run['head_sha'][:7],
+                'commit_message': run['head_commit']['message'].split('\n')[0],
+                'author': run['head_commit']['author']['name'],
+                'created_at': run['created_at'],
+                'updated_at': run['updated_at'],
+                'duration': None,  # Set for completed runs
+                'url': run['html_url'],
+                'jobs_url': run['jobs_url']
+            })
             
-            if response.status_code == 200:
-                data = response.json()
-                runs = []
-                
-                for run in data.get('workflow_runs', []):
-                    runs.append({
-                        'id': run['id'],
-                        'name': run['name'],
-                        'status': run['status'],
-                        'conclusion': run['conclusion'],
-                        'branch': run['head_branch'],
-                        'commit_sha': run['head_sha'][:7],
-                        'commit_message': run.get('head_commit', {}).get('message', '').split('\n')[0],
-                        'author': run.get('head_commit', {}).get('author', {}).get('name', 'Unknown'),
-                        'created_at': run['created_at'],
-                        'updated_at': run['updated_at'],
-                        'duration': None,  # Calculate if completed
-                        'url': run['html_url'],
-                        'jobs_url': run['jobs_url']
-                    })
-                    
-                    # Calculate duration for completed runs
-                    if run['status'] == 'completed' and run['created_at'] and run['updated_at']:
-                        try:
-                            created = datetime.fromisoformat(run['created_at'].replace('Z', '+00:00'))
-                            updated = datetime.fromisoformat(run['updated_at'].replace('Z', '+00:00'))
-                            duration_seconds = (updated - created).total_seconds()
-                            runs[-1]['duration'] = int(duration_seconds)
-                        except:
-                            pass
-                
-                return {
-                    'deployment_id': deployment_id,
-                    'customer': customer,
-                    'environment': environment,
-                    'repo': repo,
-                    'runs': runs,
-                    'total': len(runs)
-                }
-            else:
-                return {
-                    'runs': [],
-                    'total': 0,
-                    'error': f'GitHub API returned {response.status_code}'
-                }
-                
+            duration_seconds = run_duration(run)
+            if duration_seconds is not None:
+                runs[-1]['duration'] = int(duration_seconds)
+        
+        return {
+            'deployment_id': deployment_id,
+            'customer': customer,
+            'environment': environment,
+            'repo': repo,
+            'runs': runs,
+            'total': len(runs)
+        }
     except Exception as e:
         return {
             'runs': [],
@@ -2153,61 +2421,40 @@ async def get_pipeline_jobs(deployment_id: str, run_id: int):
     parts = deployment_id.split('-')
     customer = '-'.join(parts[:-1]) if parts[-1] in ['dev', 'preprod', 'prod'] else parts[0]
     
-    repo = CUSTOMER_REPOS.get(customer)
-    if not repo:
+    source = await pipeline_tracker.repo_for(customer)
+    if not source:
         return {'jobs': [], 'error': f'No repo mapping for {customer}'}
     
-    github_token = os.getenv('GITHUB_TOKEN', '')
-    headers = {
-        'Accept': 'application/vnd.github.v3+json'
-    }
-    if github_token:
-        headers['Authorization'] = f'token {github_token}'
-    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f'https://api.github.com/repos/{repo}/actions/runs/{run_id}/jobs',
-                headers=headers
-            )
+        jobs = []
+        for job in await pipeline_tracker.jobs(customer, source, run_id):
+            steps = []
+            for step in job.get('steps', []):
+                steps.append({
+                    'name': step['name'],
+                    'status': step['status'],
+                    'conclusion': step.get('conclusion'),
+                    'number': step['number'],
+                    'started_at': step.get('started_at'),
+                    'completed_at': step.get('completed_at')
+                })
             
-            if response.status_code == 200:
-                data = response.json()
-                jobs = []
-                
-                for job in data.get('jobs', []):
-                    steps = []
-                    for step in job.get('steps', []):
-                        steps.append({
-                            'name': step['name'],
-                            'status': step['status'],
-                            'conclusion': step.get('conclusion'),
-                            'number': step['number'],
-                            'started_at': step.get('started_at'),
-                            'completed_at': step.get('completed_at')
-                        })
-                    
-                    jobs.append({
-                        'id': job['id'],
-                        'name': job['name'],
-                        'status': job['status'],
-                        'conclusion': job.get('conclusion'),
-                        'started_at': job.get('started_at'),
-                        'completed_at': job.get('completed_at'),
-                        'steps': steps,
-                        'url': job['html_url']
-                    })
-                
-                return {
-                    'run_id': run_id,
-                    'jobs': jobs,
-                    'total': len(jobs)
-                }
-            else:
-                return {
-                    'jobs': [],
-                    'error': f'GitHub API returned {response.status_code}'
-                }
+            jobs.append({
+                'id': job['id'],
+                'name': job['name'],
+                'status': job['status'],
+                'conclusion': job.get('conclusion'),
+                'started_at': job.get('started_at'),
+                'completed_at': job.get('completed_at'),
+                'steps': steps,
+                'url': job['html_url']
+            })
+        
+        return {
+            'run_id': run_id,
+            'jobs': jobs,
+            'total': len(jobs)
+        }
     except Exception as e:
         return {
             'jobs': [],
@@ -2215,81 +2462,75 @@ async def get_pipeline_jobs(deployment_id: str, run_id: int):
         }
 
 @app.get("/pipelines/status")
-async def get_all_pipelines_status():
+async def get_all_pipelines_status(request: Request):
     """Get pipeline status summary for all customers"""
-    customers = {
-        'acme-corp': 'lebrick07/acme-corp-api',
-        'techstart': 'lebrick07/techstart-webapp',
-        'widgetco': 'lebrick07/widgetco-api'
-    }
-    
-    github_token = os.getenv('GITHUB_TOKEN', '')
-    headers = {
-        'Accept': 'application/vnd.github.v3+json'
-    }
-    if github_token:
-        headers['Authorization'] = f'token {github_token}'
-    
-    results = []
-    
+    # No upstream version for GitHub data - ETag is a hash of the body
+    return conditional_json(request, '/pipelines/status', await build_pipelines_status())
+
+
+@app.get("/pipelines/stats")
+def get_pipelines_stats(request: Request, customer_id: Optional[str] = None, branch: Optional[str] = None,
+                        days: int = PIPELINES_STATS_DAYS):
+    """Build duration and queue time (p50/p95) and failure rate per customer and branch"""
+    days = min(max(days, 1), 365)
+    if not pipeline_history.enabled:
+        return JSONResponse(status_code=503, content={'error': 'Pipeline history needs a database (DATABASE_URL)'})
     try:
-        async with httpx.AsyncClient() as client:
-            for customer_id, repo in customers.items():
-                try:
-                    response = await client.get(
-                        f'https://api.github.com/repos/{repo}/actions/runs',
-                        headers=headers,
-                        params={'per_page': 1, 'page': 1, 'branch': 'develop'}
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        runs = data.get('workflow_runs', [])
-                        
-                        if runs:
-                            latest = runs[0]
-                            results.append({
-                                'customer_id': customer_id,
-                                'repo': repo,
-                                'status': latest['status'],
-                                'conclusion': latest.get('conclusion'),
-                                'branch': latest['head_branch'],
-                                'commit_sha': latest['head_sha'][:7],
-                                'run_id': latest['id'],
-                                'url': latest['html_url'],
-                                'created_at': latest['created_at']
-                            })
-                        else:
-                            results.append({
-                                'customer_id': customer_id,
-                                'repo': repo,
-                                'status': 'no_runs',
-                                'conclusion': None
-                            })
-                    else:
-                        results.append({
-                            'customer_id': customer_id,
-                            'repo': repo,
-                            'status': 'error',
-                            'error': f'GitHub API returned {response.status_code}'
-                        })
-                except Exception as e:
-                    results.append({
-                        'customer_id': customer_id,
-                        'repo': repo,
-                        'status': 'error',
-                        'error': str(e)
-                    })
-        
-        return {
-            'pipelines': results,
-            'total': len(results)
-        }
+        stats = pipeline_history.build_stats(customer_id, branch, days)
     except Exception as e:
-        return {
-            'pipelines': [],
-            'error': str(e)
-        }
+        return {'stats': [], 'total': 0, 'error': str(e)}
+    return conditional_json(request, '/pipelines/stats', stats, volatile=('since',))
+
+
+async def build_pipelines_status(priority: int = INTERACTIVE):
+    """Latest develop-branch run per customer repo (all repos queried concurrently)"""
+    return await pipeline_tracker.status(priority)
+
+
+# ============================================================================
+# LIVE UPDATES - push channel replacing dashboard polling
+# ============================================================================
+
+def live_customers():
+    result = build_customers()
+    if 'error' in result:
+        raise Exception(result['error'])
+    return result['customers']
+
+def live_deployments():
+    result = build_deployments()
+    if 'error' in result:
+        raise Exception(result['error'])
+    return result['deployments']
+
+async def live_pipelines():
+    result = await build_pipelines_status(BACKGROUND)
+    if 'error' in result:
+        raise Exception(result['error'])
+    return result['pipelines']
+
+@app.get("/events/stream")
+async def stream_live_updates(topics: str = 'customers,deployments,pipelines'):
+    """
+    Server-Sent Events stream of customer, deployment and pipeline changes
+    
+    Sends one `snapshot` event per topic, then `diff` events carrying only
+    upserted items and removed keys. A client that falls behind receives
+    fresh snapshots instead of the backlog.
+    """
+    names = [t.strip() for t in topics.split(',') if t.strip()]
+    unknown = [name for name in names if name not in live_updates.topics]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(unknown) or topics}")
+    
+    if not live_updates.has_capacity():
+        raise HTTPException(status_code=429, detail='Too many live update subscribers')
+    
+    return StreamingResponse(
+        live_updates.sse(names),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 # Customer Creation Endpoint
 class CustomerCreate(BaseModel):
@@ -0,0 +1,88 @@
+"""
+Namespace Discovery - find tenant namespaces by label instead of by name
+
+Tenant namespaces carry `customer`, `environment` and `managed-by=openluffy`
+labels (set by POST /customers/create, or added to older namespaces by
+backfill_namespace_labels.py). Discovery asks for `managed-by=openluffy`
+only, so its cost follows the number of tenants rather than the number of
+namespaces in the cluster.
+
+Namespaces created before labels existed are only recognised by their
+"{customer}-{env}" name. Until the backfill has run, LEGACY_NAMESPACE_SCAN
+keeps the old full scan with name heuristics; set it to "false" afterwards.
+"""
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from cluster_cache import cluster_cache, object_labels, parse_label_selector
+import k8s_fastlist as fastlist
+from singleflight import shared, SINGLEFLIGHT_TTL
+
+ENVIRONMENTS = ['dev', 'preprod', 'prod']
+
+# Label every OpenLuffy tenant namespace carries
+TENANT_NAMESPACE_SELECTOR = os.getenv('TENANT_NAMESPACE_SELECTOR', 'managed-by=openluffy')
+
+# Also scan all namespaces for unlabeled "{customer}-{env}" names (disable after the backfill)
+LEGACY_NAMESPACE_SCAN = os.getenv('LEGACY_NAMESPACE_SCAN', 'true').lower() == 'true'
+
+
+def legacy_tenant(ns_name: str) -> Optional[Tuple[str, str]]:
+    """Pattern-based (customer, env) for namespaces created before labels existed"""
+    for env in ENVIRONMENTS:
+        suffix = f"-{env}"
+        if ns_name.endswith(suffix) and len(ns_name) > len(suffix):
+            return ns_name[:-len(suffix)], env
+    return None
+
+
+def tenant_for(ns_name: str, labels: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """(customer, env) from namespace labels, or from the name while the legacy scan is on"""
+    if 'customer' in labels and 'environment' in labels:
+        return labels['customer'], labels['environment']
+    return legacy_tenant(ns_name) if LEGACY_NAMESPACE_SCAN else None
+
+
+def namespace_tenant(ns: Any) -> Optional[Tuple[str, str]]:
+    return tenant_for(ns.metadata.name, object_labels(ns))
+
+
+def tenant_namespaces(core_api, on_list=None) -> List[Tuple[Any, str, str]]:
+    """
+    [(namespace object, customer, env)] sorted by namespace name
+
+    Reads the cluster cache when synced; otherwise one list call (label
+    selected unless the legacy scan is on). Concurrent callers share that
+    list call. `on_list` is called before each API list, for callers that
+    count calls.
+    """
+    def list_namespaces(**kwargs):
+        if on_list:
+            on_list()
+        return fastlist.list_namespaces(core_api.list_namespace, **kwargs)
+
+    # Concurrent cache misses share one list call
+    if LEGACY_NAMESPACE_SCAN:
+        candidates = cluster_cache.namespaces(
+            fallback=shared(('fastlist.list_namespace', ''), list_namespaces, SINGLEFLIGHT_TTL)
+        )
+    else:
+        candidates = cluster_cache.namespaces(
+            selector=parse_label_selector(TENANT_NAMESPACE_SELECTOR),
+            fallback=shared(
+                ('fastlist.list_namespace', TENANT_NAMESPACE_SELECTOR),
+                lambda: list_namespaces(label_selector=TENANT_NAMESPACE_SELECTOR),
+                SINGLEFLIGHT_TTL
+            )
+        )
+
+    tenants = []
+    for ns in sorted(candidates, key=lambda ns: ns.metadata.name):
+        tenant = namespace_tenant(ns)
+        if tenant:
+            tenants.append((ns, *tenant))
+    return tenants
+
+
+def discovery_stats() -> Dict[str, Any]:
+    return {'selector': TENANT_NAMESPACE_SELECTOR, 'legacy_scan': LEGACY_NAMESPACE_SCAN}
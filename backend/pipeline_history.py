@@ -0,0 +1,431 @@
+"""
+Pipeline History - persisted workflow runs/jobs and build statistics
+
+The pipeline tracker keeps only the last few runs per customer in memory.
+Every run and job it learns about (GitHub reads, webhook deliveries) is
+written to the pipeline_runs / pipeline_jobs tables here, on a single
+writer thread so a slow database never holds up a request and updates to
+one run are applied in order.
+
+A background sync every PIPELINES_HISTORY_INTERVAL fills the gaps
+incrementally: it pages through a repo's runs only until it reaches the
+newest run already stored, then refreshes stored runs that were still
+open. Jobs are fetched for runs that finished since the last sync.
+
+Queue time and build duration are derived once, when a row is written;
+build_stats() answers p50/p95 duration, queue time and failure rate per
+customer and branch from an indexed range query.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fanout import fan_out
+from github_client import github_api, BACKGROUND
+from pipelines import pipeline_tracker, run_record, job_record, jobs_completed, STATUS_RANK, PIPELINES_CONCURRENCY
+
+# Incremental sync interval in seconds (0 disables the sync loop)
+PIPELINES_HISTORY_INTERVAL = float(os.getenv('PIPELINES_HISTORY_INTERVAL', '600'))
+# Pages of runs read per repo and sync (bounds the first backfill)
+PIPELINES_HISTORY_MAX_PAGES = int(os.getenv('PIPELINES_HISTORY_MAX_PAGES', '5'))
+# Finished runs whose jobs are fetched per repo and sync
+PIPELINES_HISTORY_JOBS_PER_SYNC = int(os.getenv('PIPELINES_HISTORY_JOBS_PER_SYNC', '20'))
+# Default statistics window in days
+PIPELINES_STATS_DAYS = int(os.getenv('PIPELINES_STATS_DAYS', '30'))
+
+HISTORY_PAGE_SIZE = 100
+FAILED_CONCLUSIONS = ('failure', 'timed_out', 'startup_failure')
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """GitHub ISO-8601 timestamp -> naive UTC datetime"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def seconds_between(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return max((end - start).total_seconds(), 0.0)
+
+
+def run_duration(run: Dict[str, Any]) -> Optional[float]:
+    """Build time of a completed run (start of its latest attempt to last update)"""
+    if run.get('status') != 'completed':
+        return None
+    return seconds_between(parse_time(run.get('run_started_at') or run.get('created_at')), parse_time(run.get('updated_at')))
+
+
+def run_values(customer_id: str, repo: str, run: Dict[str, Any]) -> Dict[str, Any]:
+    """pipeline_runs column values for a run record"""
+    created_at = parse_time(run.get('created_at'))
+    run_started_at = parse_time(run.get('run_started_at')) or created_at
+    updated_at = parse_time(run.get('updated_at'))
+    return {
+        'id': run['id'],
+        'customer_id': customer_id,
+        'repo': repo,
+        'name': run.get('name'),
+        'head_branch': run.get('head_branch'),
+        'head_sha': run.get('head_sha') or None,
+        'status': run.get('status'),
+        'conclusion': run.get('conclusion'),
+        'run_attempt': run.get('run_attempt') or 1,
+        'html_url': run.get('html_url'),
+        'created_at': created_at,
+        'run_started_at': run_started_at,
+        'updated_at': updated_at,
+        'queue_seconds': seconds_between(created_at, run_started_at),
+        'duration_seconds': run_duration(run)
+    }
+
+
+def job_values(customer_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """pipeline_jobs column values for a job record"""
+    started_at = parse_time(job.get('started_at'))
+    completed_at = parse_time(job.get('completed_at'))
+    created_at = parse_time(job.get('created_at'))
+    return {
+        'id': job['id'],
+        'run_id': job['run_id'],
+        'customer_id': customer_id,
+        'name': job.get('name'),
+        'status': job.get('status'),
+        'conclusion': job.get('conclusion'),
+        'created_at': created_at,
+        'started_at': started_at,
+        'completed_at': completed_at,
+        'queue_seconds': seconds_between(created_at, started_at),
+        'duration_seconds': seconds_between(started_at, completed_at) if job.get('status') == 'completed' else None
+    }
+
+
+def _row_progress(values: Dict[str, Any]):
+    # Same ordering as the in-memory state: never let an older delivery overwrite a newer row
+    return (
+        values.get('run_attempt') or 1,
+        STATUS_RANK.get(values.get('status'), 0),
+        values.get('updated_at') or values.get('completed_at') or datetime.min
+    )
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    index = max(math.ceil(pct / 100 * len(values)) - 1, 0)
+    return round(values[index], 1)
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(value for value in values if value is not None)
+    return {'p50': percentile(values, 50), 'p95': percentile(values, 95), 'samples': len(values)}
+
+
+class PipelineHistory:
+    """Writes tracker runs/jobs to the database, syncs gaps and answers statistics"""
+
+    def __init__(self):
+        # One writer: updates to the same run are applied in arrival order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-history')
+        self._pending_lock = threading.Lock()
+        self.writes_pending = 0
+        self._task: Optional[asyncio.Task] = None
+        self._synced_at: Optional[float] = None
+        self.runs_written = 0
+        self.jobs_written = 0
+        self.write_errors = 0
+        self.syncs = 0
+        self.sync_errors = 0
+        self.github_reads = 0
+        self.enabled = False
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def listener(self, kind: str, customer_id: str, repo: str, records: List[Dict[str, Any]]):
+        """Pipeline tracker listener (queues the write, never blocks the caller)"""
+        self._submit(self._write, kind, customer_id, repo, records)
+
+    def _submit(self, fn, *args):
+        """Queue fn on the writer thread, counting it until it has run"""
+        with self._pending_lock:
+            self.writes_pending += 1
+
+        def counted():
+            try:
+                return fn(*args)
+            finally:
+                with self._pending_lock:
+                    self.writes_pending -= 1
+        return self._executor.submit(counted)
+
+    def _write(self, kind: str, customer_id: str, repo: str, records: List[Dict[str, Any]]):
+        try:
+            if kind == 'runs':
+                self.record_runs(customer_id, repo, records)
+            elif kind == 'jobs':
+                self.record_jobs(customer_id, records)
+        except Exception as e:
+            self.write_errors += 1
+            print(f"⚠️ Could not persist pipeline {kind} for {customer_id}: {e}")
+
+    def record_runs(self, customer_id: str, repo: str, runs: List[Dict[str, Any]]) -> List[int]:
+        """Upsert runs (blocking); returns the IDs of runs that finished with this write"""
+        if not runs:
+            return []
+        # Import here to avoid circular dependencies
+        from database import SessionLocal, PipelineRun
+
+        db = SessionLocal()
+        try:
+            incoming = {run['id']: run_values(customer_id, repo, run) for run in runs}
+            stored = {row.id: row for row in db.query(PipelineRun).filter(PipelineRun.id.in_(list(incoming)))}
+            finished = []
+            for run_id, values in incoming.items():
+                row = stored.get(run_id)
+                if row is None:
+                    db.add(PipelineRun(**values))
+                else:
+                    current = {'run_attempt': row.run_attempt, 'status': row.status, 'updated_at': row.updated_at}
+                    if _row_progress(values) < _row_progress(current):
+                        continue
+                    for key, value in values.items():
+                        setattr(row, key, value)
+                if values['status'] == 'completed' and (row is None or current['status'] != 'completed'):
+                    finished.append(run_id)
+            db.commit()
+            self.runs_written += len(incoming)
+            return finished
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def record_jobs(self, customer_id: str, jobs: List[Dict[str, Any]]):
+        """Upsert jobs (blocking)"""
+        if not jobs:
+            return
+        # Import here to avoid circular dependencies
+        from database import SessionLocal, PipelineJob
+
+        db = SessionLocal()
+        try:
+            incoming = {job['id']: job_values(customer_id, job) for job in jobs}
+            stored = {row.id: row for row in db.query(PipelineJob).filter(PipelineJob.id.in_(list(incoming)))}
+            for job_id, values in incoming.items():
+                row = stored.get(job_id)
+                if row is None:
+                    db.add(PipelineJob(**values))
+                    continue
+                if _row_progress(values) < _row_progress({'status': row.status, 'completed_at': row.completed_at}):
+                    continue
+                if values['created_at'] is None:
+                    # Older webhook payloads omit created_at; keep the one a REST read stored
+                    values.pop('created_at')
+                    values.pop('queue_seconds')
+                for key, value in values.items():
+                    setattr(row, key, value)
+            db.commit()
+            self.jobs_written += len(incoming)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run_on_writer(self, fn, *args):
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    # ------------------------------------------------------------------
+    # Incremental sync
+    # ------------------------------------------------------------------
+
+    def _sync_point(self, customer_id: str):
+        """(newest stored run ID, IDs of stored runs not yet completed)"""
+        # Import here to avoid circular dependencies
+        from database import SessionLocal, PipelineRun
+        from sqlalchemy import func
+
+        db = SessionLocal()
+        try:
+            last_id = db.query(func.max(PipelineRun.id)).filter(PipelineRun.customer_id == customer_id).scalar()
+            open_ids = [row.id for row in db.query(PipelineRun.id).filter(
+                PipelineRun.customer_id == customer_id,
+                PipelineRun.status != 'completed'
+            )]
+            return last_id, open_ids
+        finally:
+            db.close()
+
+    async def _get(self, customer_id: str, source: Dict[str, Any], path: str, **kwargs) -> Dict[str, Any]:
+        self.github_reads += 1
+        response = await github_api.get(f"/repos/{source['repo']}{path}", token=source['token'], cache=True,
+                                        priority=BACKGROUND, customer=customer_id, **kwargs)
+        if response.status_code != 200:
+            raise Exception(f'GitHub API returned {response.status_code}')
+        return response.json()
+
+    async def sync_customer(self, customer_id: str, source: Dict[str, Any]) -> int:
+        """Store runs newer than the last stored one and refresh open runs; returns runs fetched"""
+        last_id, open_ids = await asyncio.to_thread(self._sync_point, customer_id)
+
+        runs: Dict[int, Dict[str, Any]] = {}
+        for page in range(1, PIPELINES_HISTORY_MAX_PAGES + 1):
+            body = await self._get(customer_id, source, '/actions/runs', params={'per_page': HISTORY_PAGE_SIZE, 'page': page})
+            page_runs = [run_record(run) for run in body.get('workflow_runs', [])]
+            runs.update((run['id'], run) for run in page_runs)
+            reached_stored = last_id is not None and any(run['id'] <= last_id for run in page_runs)
+            if reached_stored or len(page_runs) < HISTORY_PAGE_SIZE:
+                break
+
+        for run_id in open_ids:
+            if run_id not in runs:
+                runs[run_id] = run_record(await self._get(customer_id, source, f'/actions/runs/{run_id}'))
+
+        finished = await self._run_on_writer(self.record_runs, customer_id, source['repo'], list(runs.values()))
+
+        # Jobs of finished runs never change - cached without revalidation
+        for run_id in sorted(finished, reverse=True)[:PIPELINES_HISTORY_JOBS_PER_SYNC]:
+            body = await self._get(customer_id, source, f'/actions/runs/{run_id}/jobs', immutable=jobs_completed)
+            jobs = [job_record({'run_id': run_id, **job}) for job in body.get('jobs', [])]
+            await self._run_on_writer(self.record_jobs, customer_id, jobs)
+        return len(runs)
+
+    async def sync(self):
+        """Incremental sync of every customer repo"""
+        repos = await asyncio.to_thread(pipeline_tracker.repos)
+        semaphore = asyncio.Semaphore(PIPELINES_CONCURRENCY)
+
+        async def sync_one(customer_id: str, source: Dict[str, Any]):
+            async with semaphore:
+                return await self.sync_customer(customer_id, source)
+
+        outcomes = await fan_out({
+            customer_id: (lambda c=customer_id, s=source: sync_one(c, s)) for customer_id, source in repos.items()
+        })
+        failed = sorted(customer_id for customer_id, outcome in outcomes.items() if not outcome['ok'])
+        if failed:
+            self.sync_errors += 1
+            print(f"⚠️ Pipeline history sync failed for {', '.join(failed)}")
+        self.syncs += 1
+        self._synced_at = time.time()
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                self.sync_errors += 1
+                print(f"⚠️ Pipeline history sync error: {e}")
+            await asyncio.sleep(PIPELINES_HISTORY_INTERVAL)
+
+    def start(self):
+        """
+        Persist tracker updates and start the sync loop (call from the event
+        loop, only once the database is available)
+        """
+        self.enabled = True
+        pipeline_tracker.add_listener(self.listener)
+        if PIPELINES_HISTORY_INTERVAL > 0 and self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def build_stats(self, customer_id: Optional[str] = None, branch: Optional[str] = None,
+                    days: int = PIPELINES_STATS_DAYS) -> Dict[str, Any]:
+        """p50/p95 duration and queue time, failure rate per customer and branch (blocking)"""
+        # Import here to avoid circular dependencies
+        from database import SessionLocal, PipelineRun, PipelineJob
+
+        since = datetime.utcnow() - timedelta(days=days)
+        db = SessionLocal()
+        try:
+            runs = db.query(
+                PipelineRun.id, PipelineRun.customer_id, PipelineRun.head_branch, PipelineRun.conclusion,
+                PipelineRun.duration_seconds, PipelineRun.queue_seconds
+            ).filter(PipelineRun.created_at >= since, PipelineRun.status == 'completed')
+            if customer_id:
+                runs = runs.filter(PipelineRun.customer_id == customer_id)
+            if branch:
+                runs = runs.filter(PipelineRun.head_branch == branch)
+
+            jobs = db.query(PipelineRun.customer_id, PipelineRun.head_branch, PipelineJob.queue_seconds).join(
+                PipelineJob, PipelineJob.run_id == PipelineRun.id
+            ).filter(PipelineRun.created_at >= since, PipelineJob.queue_seconds.isnot(None))
+            if customer_id:
+                jobs = jobs.filter(PipelineRun.customer_id == customer_id)
+            if branch:
+                jobs = jobs.filter(PipelineRun.head_branch == branch)
+
+            groups: Dict[tuple, Dict[str, list]] = defaultdict(lambda: {'runs': [], 'job_queue': []})
+            for row in runs:
+                groups[(row.customer_id, row.head_branch)]['runs'].append(row)
+            for row in jobs:
+                groups[(row.customer_id, row.head_branch)]['job_queue'].append(row.queue_seconds)
+        finally:
+            db.close()
+
+        results = []
+        for (group_customer, group_branch), group in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+            group_runs = group['runs']
+            # Cancelled and skipped runs are neither passes nor failures
+            decided = [row for row in group_runs if row.conclusion not in ('cancelled', 'skipped', 'neutral')]
+            failed = sum(1 for row in decided if row.conclusion in FAILED_CONCLUSIONS)
+            results.append({
+                'customer_id': group_customer,
+                'branch': group_branch,
+                'runs': len(group_runs),
+                'failed': failed,
+                'failure_rate': round(failed / len(decided), 3) if decided else None,
+                'duration_seconds': _summary([row.duration_seconds for row in group_runs]),
+                'queue_seconds': _summary([row.queue_seconds for row in group_runs]),
+                'job_queue_seconds': _summary(group['job_queue'])
+            })
+
+        return {
+            'since': since.isoformat() + 'Z',
+            'days': days,
+            'stats': results,
+            'total': len(results)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'runs_written': self.runs_written,
+            'jobs_written': self.jobs_written,
+            'write_errors': self.write_errors,
+            'writes_queued': self.writes_pending,
+            'syncs': self.syncs,
+            'sync_errors': self.sync_errors,
+            'github_reads': self.github_reads,
+            'last_sync_age_seconds': round(time.time() - self._synced_at, 1) if self._synced_at else None,
+            'sync_interval_seconds': PIPELINES_HISTORY_INTERVAL
+        }
+
+
+# Global instance
+pipeline_history = PipelineHistory()
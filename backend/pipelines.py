@@ -0,0 +1,620 @@
+"""
+Pipelines - GitHub Actions state for every customer repo
+
+Customer repos come from the `github` rows of the integrations table (cached
+for a short TTL), not from hard-coded maps.
+
+Runs and jobs are kept per customer in memory. With GitHub webhooks enabled
+(see github_webhooks), `workflow_run` / `workflow_job` deliveries update that
+state as they happen and a slow reconciliation loop re-lists recent runs
+every PIPELINES_RECONCILE_INTERVAL to repair missed deliveries; reads are
+served from state without calling GitHub. Without webhooks - or for a
+customer whose state is older than PIPELINES_STATE_MAX_AGE - reads fetch
+from GitHub through the shared client (conditional-request cached) and seed
+the state.
+
+The status summary covers all repos concurrently, at most
+PIPELINES_CONCURRENCY GitHub requests at a time and within one
+PIPELINES_DEADLINE. A repo that fails or misses the deadline is reported
+with its last known result, marked stale.
+
+Repos whose state is not fresh are first looked up with batched GraphQL
+queries: one aliased `repository` field per repo (PIPELINES_GRAPHQL_BATCH
+per query, fewer if the node estimate would exceed GitHub's limit) reading
+the newest GitHub Actions check suite among the last commits of
+PIPELINES_BRANCH. Repos the batch can't answer (query failed, repo not
+accessible, no Actions run in those commits, no token) fall back to one
+REST call each.
+
+UI reads go to GitHub at INTERACTIVE priority and refresh loops at
+BACKGROUND priority, attributed to the customer (see github_client).
+
+Listeners registered with add_listener() are called as
+listener(kind, customer_id, repo, records) with kind 'runs' or 'jobs' and
+only the records that changed the state (see pipeline_history).
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fanout import fan_out
+from github_client import github_api, token_key, GITHUB_TOKEN, INTERACTIVE, BACKGROUND
+
+# Branch whose latest run is shown in the status summary
+PIPELINES_BRANCH = os.getenv('PIPELINES_BRANCH', 'develop')
+# Concurrent GitHub requests for one status summary
+PIPELINES_CONCURRENCY = int(os.getenv('PIPELINES_CONCURRENCY', '8'))
+# Overall deadline for one status summary, in seconds
+PIPELINES_DEADLINE = float(os.getenv('PIPELINES_DEADLINE', '8'))
+# How long the customer -> repo map is reused before re-reading the database
+PIPELINE_REPOS_TTL = float(os.getenv('PIPELINE_REPOS_TTL', '30'))
+# Re-list recent runs this often when webhooks keep the state current
+PIPELINES_RECONCILE_INTERVAL = float(os.getenv('PIPELINES_RECONCILE_INTERVAL', '300'))
+# Webhook-fed state older than this is not trusted (reads fetch from GitHub)
+PIPELINES_STATE_MAX_AGE = float(os.getenv('PIPELINES_STATE_MAX_AGE', '900'))
+# Runs kept per customer (plus the latest run on PIPELINES_BRANCH)
+PIPELINES_RUNS_KEPT = int(os.getenv('PIPELINES_RUNS_KEPT', '20'))
+# Batched GraphQL lookup for the status summary (REST per repo when off)
+PIPELINES_GRAPHQL = os.getenv('PIPELINES_GRAPHQL', 'true').lower() == 'true'
+# Repos per GraphQL query
+PIPELINES_GRAPHQL_BATCH = int(os.getenv('PIPELINES_GRAPHQL_BATCH', '50'))
+
+RUNS_PAGE_SIZE = 10
+# Branch commits and check suites per commit read by the GraphQL status query
+GRAPHQL_COMMITS = 3
+GRAPHQL_SUITES = 5
+# GitHub rejects queries that could return more nodes than this
+GRAPHQL_NODE_LIMIT = 500000
+STATUS_RANK = {'requested': 0, 'waiting': 0, 'pending': 0, 'queued': 1, 'in_progress': 2, 'completed': 3}
+
+
+def repo_slug(config: Dict[str, Any]) -> Optional[str]:
+    """'org/repo' from a github integration config"""
+    repo = config.get('repo')
+    if not repo:
+        return None
+    if '/' in repo or not config.get('org'):
+        return repo
+    return f"{config['org']}/{repo}"
+
+
+def run_record(run: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a workflow run (REST or webhook payload) the API reads"""
+    head_commit = run.get('head_commit') or {}
+    return {
+        'id': run['id'],
+        'name': run.get('name'),
+        'status': run.get('status'),
+        'conclusion': run.get('conclusion'),
+        'head_branch': run.get('head_branch'),
+        'head_sha': run.get('head_sha') or '',
+        'head_commit': {
+            'message': head_commit.get('message') or '',
+            'author': {'name': (head_commit.get('author') or {}).get('name', 'Unknown')}
+        },
+        'run_attempt': run.get('run_attempt') or 1,
+        'created_at': run.get('created_at'),
+        'updated_at': run.get('updated_at'),
+        'run_started_at': run.get('run_started_at'),
+        'html_url': run.get('html_url'),
+        'jobs_url': run.get('jobs_url')
+    }
+
+
+def job_record(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a workflow job (REST or webhook payload) the API reads"""
+    return {
+        'id': job['id'],
+        'run_id': job.get('run_id'),
+        'name': job.get('name'),
+        'status': job.get('status'),
+        'conclusion': job.get('conclusion'),
+        'created_at': job.get('created_at'),
+        'started_at': job.get('started_at'),
+        'completed_at': job.get('completed_at'),
+        'html_url': job.get('html_url'),
+        'steps': [
+            {key: step.get(key) for key in ('name', 'status', 'conclusion', 'number', 'started_at', 'completed_at')}
+            for step in job.get('steps') or []
+        ]
+    }
+
+
+def _progress(record: Dict[str, Any]):
+    # Deliveries can arrive out of order; never let an older state win
+    return record.get('run_attempt') or 1, STATUS_RANK.get(record.get('status'), 0), record.get('updated_at') or record.get('completed_at') or ''
+
+
+def run_summary(customer_id: str, repo: str, latest: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Status row for the latest run (or no_runs)"""
+    if not latest:
+        return {'customer_id': customer_id, 'repo': repo, 'status': 'no_runs', 'conclusion': None}
+    return {
+        'customer_id': customer_id,
+        'repo': repo,
+        'status': latest['status'],
+        'conclusion': latest.get('conclusion'),
+        'branch': latest['head_branch'],
+        'commit_sha': latest['head_sha'][:7],
+        'run_id': latest['id'],
+        'url': latest['html_url'],
+        'created_at': latest['created_at']
+    }
+
+
+GRAPHQL_REPO_FRAGMENT = """
+fragment LatestRun on Repository {
+  ref(qualifiedName: $ref) {
+    target {
+      ... on Commit {
+        history(first: %d) {
+          nodes {
+            oid
+            checkSuites(last: %d) {
+              nodes {
+                status
+                conclusion
+                createdAt
+                workflowRun { databaseId url createdAt }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+""" % (GRAPHQL_COMMITS, GRAPHQL_SUITES)
+
+
+def graphql_batch_size() -> int:
+    """Repos per query: PIPELINES_GRAPHQL_BATCH, capped by GitHub's node limit"""
+    nodes_per_repo = 1 + GRAPHQL_COMMITS * (1 + GRAPHQL_SUITES)
+    return max(1, min(PIPELINES_GRAPHQL_BATCH, GRAPHQL_NODE_LIMIT // nodes_per_repo))
+
+
+def graphql_status_query(repos: List[str]):
+    """Aliased query (r0, r1, ...) for the given 'org/repo' names; returns (query, variables)"""
+    params = ['$ref: String!']
+    fields = ['rateLimit { cost remaining }']
+    variables: Dict[str, Any] = {'ref': f"refs/heads/{PIPELINES_BRANCH}"}
+    for i, repo in enumerate(repos):
+        owner, name = repo.split('/', 1)
+        params += [f"$o{i}: String!", f"$n{i}: String!"]
+        fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...LatestRun }}")
+        variables.update({f"o{i}": owner, f"n{i}": name})
+    query = f"query({', '.join(params)}) {{\n  " + '\n  '.join(fields) + "\n}\n" + GRAPHQL_REPO_FRAGMENT
+    return query, variables
+
+
+def graphql_latest_run(node: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Newest Actions check suite in a repository node as a run record (None if there is none)"""
+    target = ((node or {}).get('ref') or {}).get('target') or {}
+    latest = None
+    for commit in (target.get('history') or {}).get('nodes') or []:
+        for suite in (commit.get('checkSuites') or {}).get('nodes') or []:
+            run = suite.get('workflowRun')
+            if not run:
+                continue  # not a GitHub Actions suite
+            if latest is None or (run['createdAt'], run['databaseId']) > (latest['created_at'], latest['id']):
+                latest = {
+                    'id': run['databaseId'],
+                    'status': (suite.get('status') or '').lower(),
+                    'conclusion': (suite.get('conclusion') or '').lower() or None,
+                    'head_branch': PIPELINES_BRANCH,
+                    'head_sha': commit['oid'],
+                    'html_url': run['url'],
+                    'created_at': run['createdAt']
+                }
+    return latest
+
+
+class RepoState:
+    """Recent runs and their jobs for one customer repo"""
+
+    def __init__(self):
+        self.runs: Dict[int, Dict[str, Any]] = {}
+        self.jobs: Dict[int, Dict[int, Dict[str, Any]]] = {}  # run_id -> job_id -> job
+        self.synced_at: Optional[float] = None  # last full listing (fetch or reconcile)
+
+    def upsert_run(self, run: Dict[str, Any]) -> bool:
+        """Merge a run; True if the state changed"""
+        current = self.runs.get(run['id'])
+        changed = current != run and (current is None or _progress(run) >= _progress(current))
+        if changed:
+            self.runs[run['id']] = run
+        self._trim()
+        return changed
+
+    def upsert_job(self, job: Dict[str, Any]) -> bool:
+        """Merge a job; True if the state changed"""
+        jobs = self.jobs.setdefault(job['run_id'], {})
+        current = jobs.get(job['id'])
+        changed = current != job and (current is None or _progress(job) >= _progress(current))
+        if changed:
+            jobs[job['id']] = job
+        return changed
+
+    def recent_runs(self, limit: int, branch: Optional[str] = None) -> List[Dict[str, Any]]:
+        runs = [run for run in self.runs.values() if branch is None or run['head_branch'] == branch]
+        return sorted(runs, key=lambda run: (run['created_at'] or '', run['id']), reverse=True)[:limit]
+
+    def _trim(self):
+        if len(self.runs) <= PIPELINES_RUNS_KEPT:
+            return
+        keep = {run['id'] for run in self.recent_runs(PIPELINES_RUNS_KEPT)}
+        keep.update(run['id'] for run in self.recent_runs(1, PIPELINES_BRANCH))
+        for run_id in [run_id for run_id in self.runs if run_id not in keep]:
+            del self.runs[run_id]
+            self.jobs.pop(run_id, None)
+
+
+class PipelineTracker:
+    """Customer repos, webhook-fed run/job state and the status summary"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._repos: Dict[str, Dict[str, Any]] = {}  # customer_id -> {'repo', 'token'}
+        self._repos_loaded_at: Optional[float] = None
+        self._state: Dict[str, RepoState] = {}
+        self._last_good: Dict[str, Dict[str, Any]] = {}  # customer_id -> last fresh status row
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[str, str, str, List[Dict[str, Any]]], None]] = []
+        self.push = False  # True when webhooks keep the state current
+        self.summaries = 0
+        self.stale_rows = 0
+        self.state_reads = 0
+        self.github_reads = 0
+        self.webhook_events = 0
+        self.reconciles = 0
+        self.graphql = PIPELINES_GRAPHQL
+        self.graphql_queries = 0
+        self.graphql_rows = 0
+        self.graphql_fallbacks = 0
+        self.graphql_cost = 0
+
+    # ------------------------------------------------------------------
+    # Customer repos
+    # ------------------------------------------------------------------
+
+    def _load_repos(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, Integration
+
+            db = SessionLocal()
+            try:
+                repos = {}
+                for integration in db.query(Integration).filter(Integration.type == 'github').all():
+                    config = integration.config or {}
+                    repo = repo_slug(config)
+                    if repo and config.get('enabled', True):
+                        repos[integration.customer_id] = {'repo': repo, 'token': config.get('token') or None}
+                return repos
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Could not load customer repos: {e}")
+            return None
+
+    def repos(self) -> Dict[str, Dict[str, Any]]:
+        """{customer_id: {'repo': 'org/repo', 'token'}} (blocking; cached for PIPELINE_REPOS_TTL)"""
+        with self._lock:
+            if self._repos_loaded_at and time.time() - self._repos_loaded_at < PIPELINE_REPOS_TTL:
+                return dict(self._repos)
+        repos = self._load_repos()
+        with self._lock:
+            if repos is not None:
+                self._repos = repos
+                self._repos_loaded_at = time.time()
+            return dict(self._repos)
+
+    def invalidate_repos(self):
+        """Re-read the integrations table on next use (after onboarding/offboarding)"""
+        with self._lock:
+            self._repos_loaded_at = None
+
+    async def repo_for(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        repos = await asyncio.to_thread(self.repos)
+        return repos.get(customer_id)
+
+    async def customer_for_repo(self, full_name: str) -> Optional[str]:
+        repos = await asyncio.to_thread(self.repos)
+        return next((c for c, source in repos.items() if source['repo'].lower() == full_name.lower()), None)
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def add_listener(self, listener: Callable[[str, str, str, List[Dict[str, Any]]], None]):
+        """Call listener(kind, customer_id, repo, records) for changed runs / jobs"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _notify(self, kind: str, customer_id: str, repo: str, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(kind, customer_id, repo, records)
+            except Exception as e:
+                print(f"⚠️ Pipeline {kind} listener failed: {e}")
+
+    def _repo_state(self, customer_id: str) -> RepoState:
+        # Caller holds self._lock
+        return self._state.setdefault(customer_id, RepoState())
+
+    def _fresh(self, customer_id: str) -> bool:
+        state = self._state.get(customer_id)
+        return bool(self.push and state and state.synced_at and time.time() - state.synced_at < PIPELINES_STATE_MAX_AGE)
+
+    async def _fetch_runs(self, customer_id: str, source: Dict[str, Any], full: bool,
+                          priority: int = INTERACTIVE, **params) -> List[Dict[str, Any]]:
+        """List runs from GitHub and merge them into the state"""
+        self.github_reads += 1
+        response = await github_api.get(
+            f"/repos/{source['repo']}/actions/runs", token=source['token'], params=params, cache=True,
+            priority=priority, customer=customer_id
+        )
+        if response.status_code != 200:
+            raise Exception(f'GitHub API returned {response.status_code}')
+        runs = [run_record(run) for run in response.json().get('workflow_runs', [])]
+        with self._lock:
+            state = self._repo_state(customer_id)
+            changed = [run for run in runs if state.upsert_run(run)]
+            if full:
+                state.synced_at = time.time()
+        self._notify('runs', customer_id, source['repo'], changed)
+        return runs
+
+    async def runs(self, customer_id: str, source: Dict[str, Any], limit: int = RUNS_PAGE_SIZE,
+                   priority: int = INTERACTIVE) -> List[Dict[str, Any]]:
+        """Most recent runs, newest first"""
+        with self._lock:
+            if self._fresh(customer_id):
+                self.state_reads += 1
+                return self._state[customer_id].recent_runs(limit)
+        return await self._fetch_runs(customer_id, source, full=limit >= RUNS_PAGE_SIZE, priority=priority,
+                                      per_page=limit, page=1)
+
+    async def latest_run(self, customer_id: str, source: Dict[str, Any], branch: str = PIPELINES_BRANCH,
+                         priority: int = INTERACTIVE) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._fresh(customer_id):
+                self.state_reads += 1
+                runs = self._state[customer_id].recent_runs(1, branch)
+                return runs[0] if runs else None
+        runs = await self._fetch_runs(customer_id, source, full=False, priority=priority,
+                                      per_page=1, page=1, branch=branch)
+        return runs[0] if runs else None
+
+    async def jobs(self, customer_id: str, source: Dict[str, Any], run_id: int) -> List[Dict[str, Any]]:
+        """Jobs of one run (from webhook state when it is complete enough)"""
+        with self._lock:
+            state = self._state.get(customer_id)
+            known = list((state.jobs.get(run_id) or {}).values()) if state else []
+            run = state.runs.get(run_id) if state else None
+            usable = known and self._fresh(customer_id) and not (
+                run and run['status'] == 'completed' and any(job['status'] != 'completed' for job in known)
+            )
+            if usable:
+                self.state_reads += 1
+                return sorted(known, key=lambda job: (job['started_at'] or '', job['id']))
+
+        # Jobs of a finished run never change - cached without revalidation
+        self.github_reads += 1
+        response = await github_api.get(
+            f"/repos/{source['repo']}/actions/runs/{run_id}/jobs", token=source['token'], cache=True,
+            immutable=jobs_completed, customer=customer_id
+        )
+        if response.status_code != 200:
+            raise Exception(f'GitHub API returned {response.status_code}')
+        jobs = [job_record({'run_id': run_id, **job}) for job in response.json().get('jobs', [])]
+        with self._lock:
+            state = self._repo_state(customer_id)
+            changed = [job for job in jobs if state.upsert_job(job)]
+        self._notify('jobs', customer_id, source['repo'], changed)
+        return jobs
+
+    async def apply_event(self, event: str, payload: Dict[str, Any]) -> Optional[str]:
+        """Merge a workflow_run / workflow_job delivery; returns the customer it belongs to"""
+        full_name = (payload.get('repository') or {}).get('full_name') or ''
+        customer_id = await self.customer_for_repo(full_name)
+        if customer_id is None:
+            return None
+        with self._lock:
+            state = self._repo_state(customer_id)
+            if event == 'workflow_run' and payload.get('workflow_run'):
+                kind, record = 'runs', run_record(payload['workflow_run'])
+                changed = state.upsert_run(record)
+            elif event == 'workflow_job' and payload.get('workflow_job'):
+                kind, record = 'jobs', job_record(payload['workflow_job'])
+                changed = state.upsert_job(record)
+            else:
+                return None
+            self.webhook_events += 1
+        if changed:
+            self._notify(kind, customer_id, full_name, [record])
+        return customer_id
+
+    # ------------------------------------------------------------------
+    # Reconciliation (webhook mode)
+    # ------------------------------------------------------------------
+
+    def start(self, push: bool):
+        """Serve reads from state and start the reconcile loop (call from the event loop)"""
+        self.push = push
+        if push and self._task is None:
+            self._task = asyncio.create_task(self._reconcile_loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def reconcile(self):
+        """Re-list recent runs (and the latest PIPELINES_BRANCH run) for every repo"""
+        repos = await asyncio.to_thread(self.repos)
+        semaphore = asyncio.Semaphore(PIPELINES_CONCURRENCY)
+
+        async def relist(customer_id: str, source: Dict[str, Any]):
+            async with semaphore:
+                await self._fetch_runs(customer_id, source, full=False, priority=BACKGROUND,
+                                       per_page=1, page=1, branch=PIPELINES_BRANCH)
+                await self._fetch_runs(customer_id, source, full=True, priority=BACKGROUND,
+                                       per_page=RUNS_PAGE_SIZE, page=1)
+
+        outcomes = await fan_out({
+            customer_id: (lambda c=customer_id, s=source: relist(c, s)) for customer_id, source in repos.items()
+        })
+        failed = [customer_id for customer_id, outcome in outcomes.items() if not outcome['ok']]
+        if failed:
+            print(f"⚠️ Pipeline reconcile failed for {', '.join(sorted(failed))}")
+        self.reconciles += 1
+
+    async def _reconcile_loop(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"⚠️ Pipeline reconcile error: {e}")
+            await asyncio.sleep(PIPELINES_RECONCILE_INTERVAL)
+
+    # ------------------------------------------------------------------
+    # Status summary
+    # ------------------------------------------------------------------
+
+    async def _latest_summary(self, semaphore: asyncio.Semaphore, customer_id: str, source: Dict[str, Any],
+                              priority: int) -> Dict[str, Any]:
+        async with semaphore:
+            latest = await self.latest_run(customer_id, source, priority=priority)
+        return run_summary(customer_id, source['repo'], latest)
+
+    async def _graphql_batch(self, semaphore: asyncio.Semaphore, batch: List[tuple], token: Optional[str],
+                             priority: int) -> Dict[str, Dict[str, Any]]:
+        """Status rows for one query's worth of (customer_id, source); repos it can't answer are left out"""
+        query, variables = graphql_status_query([source['repo'] for _, source in batch])
+        async with semaphore:
+            self.graphql_queries += 1
+            body = await github_api.graphql(query, variables, token=token, priority=priority)
+        self.graphql_cost += ((body['data'].get('rateLimit') or {}).get('cost') or 0)
+
+        rows = {}
+        for i, (customer_id, source) in enumerate(batch):
+            latest = graphql_latest_run(body['data'].get(f"r{i}"))
+            if latest is not None:
+                rows[customer_id] = run_summary(customer_id, source['repo'], latest)
+        return rows
+
+    async def _graphql_summaries(self, repos: Dict[str, Dict[str, Any]], semaphore: asyncio.Semaphore,
+                                 priority: int, deadline: float) -> Dict[str, Dict[str, Any]]:
+        """Status rows from batched GraphQL queries (one batch list per token)"""
+        by_token: Dict[str, List[tuple]] = {}
+        for customer_id, source in sorted(repos.items()):
+            token = source['token'] if source['token'] is not None else GITHUB_TOKEN
+            if token and '/' in source['repo']:  # GraphQL requires authentication and an owner
+                by_token.setdefault(token, []).append((customer_id, source))
+
+        size = graphql_batch_size()
+        probes = {}
+        for token, entries in by_token.items():
+            for start in range(0, len(entries), size):
+                batch = entries[start:start + size]
+                probes[f"{token_key(token)}:{start}"] = lambda b=batch, t=token: self._graphql_batch(semaphore, b, t, priority)
+
+        rows = {}
+        outcomes = await fan_out(probes, deadline=deadline)
+        for name, outcome in outcomes.items():
+            if outcome['ok']:
+                rows.update(outcome['value'])
+            else:
+                print(f"⚠️ GraphQL pipeline status batch failed ({outcome['error']}) - falling back to REST")
+        return rows
+
+    async def status(self, priority: int = INTERACTIVE) -> Dict[str, Any]:
+        """Latest run per customer repo; partial=True when any row is stale or failed"""
+        started = time.monotonic()
+        repos = await asyncio.to_thread(self.repos)
+        semaphore = asyncio.Semaphore(PIPELINES_CONCURRENCY)
+
+        batched: Dict[str, Dict[str, Any]] = {}
+        if self.graphql:
+            with self._lock:
+                stale = {c: source for c, source in repos.items() if not self._fresh(c)}
+            if stale:
+                # Leave at least half of the deadline for the REST fallback
+                batched = await self._graphql_summaries(stale, semaphore, priority, PIPELINES_DEADLINE / 2)
+                self.graphql_rows += len(batched)
+                self.graphql_fallbacks += len(stale) - len(batched)
+
+        remaining = max(PIPELINES_DEADLINE - (time.monotonic() - started), 0.1)
+        outcomes = await fan_out({
+            customer_id: (lambda c=customer_id, s=source: self._latest_summary(semaphore, c, s, priority))
+            for customer_id, source in repos.items() if customer_id not in batched
+        }, deadline=remaining)
+        outcomes.update({customer_id: {'ok': True, 'value': row} for customer_id, row in batched.items()})
+
+        results = []
+        partial = False
+        for customer_id in sorted(outcomes):
+            outcome = outcomes[customer_id]
+            if outcome['ok']:
+                row = outcome['value']
+                with self._lock:
+                    self._last_good[customer_id] = row
+                results.append(row)
+                continue
+
+            partial = True
+            with self._lock:
+                previous = self._last_good.get(customer_id)
+            if previous is not None:
+                self.stale_rows += 1
+                results.append({**previous, 'stale': True, 'error': outcome['error']})
+            else:
+                results.append({
+                    'customer_id': customer_id,
+                    'repo': repos[customer_id]['repo'],
+                    'status': 'error',
+                    'error': outcome['error']
+                })
+
+        self.summaries += 1
+        return {'pipelines': results, 'total': len(results), 'partial': partial}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'push': self.push,
+                'repos': len(self._repos),
+                'repos_age_seconds': round(time.time() - self._repos_loaded_at, 1) if self._repos_loaded_at else None,
+                'fresh_customers': sum(1 for customer_id in self._state if self._fresh(customer_id)),
+                'state_reads': self.state_reads,
+                'github_reads': self.github_reads,
+                'webhook_events': self.webhook_events,
+                'reconciles': self.reconciles,
+                'summaries': self.summaries,
+                'stale_rows': self.stale_rows,
+                'graphql': {
+                    'enabled': self.graphql,
+                    'queries': self.graphql_queries,
+                    'rows': self.graphql_rows,
+                    'rest_fallbacks': self.graphql_fallbacks,
+                    'cost': self.graphql_cost,
+                    'batch_size': graphql_batch_size()
+                },
+                'concurrency': PIPELINES_CONCURRENCY,
+                'deadline_seconds': PIPELINES_DEADLINE
+            }
+
+
+def jobs_completed(body: Dict[str, Any]) -> bool:
+    """True once every job of a run has finished"""
+    jobs = body.get('jobs') or []
+    return bool(jobs) and all(job.get('status') == 'completed' for job in jobs)
+
+
+# Global instance
+pipeline_tracker = PipelineTracker()
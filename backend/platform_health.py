@@ -0,0 +1,218 @@
+"""
+Platform Health - running counters for pods, deployments and ArgoCD apps
+
+The health snapshot used to list every pod (full specs) and every ArgoCD
+Application on each call just to count phases and statuses. Instead this
+module subscribes to the cluster cache informers and keeps, per object, only
+the field it counts (pod phase, deployment replicas, app sync/health),
+adjusting tallies on every watch event. A snapshot is then O(distinct
+values), independent of cluster size.
+
+Without the cluster cache the snapshot falls back to raw list calls that are
+parsed as plain JSON (no model objects) and reused for a short TTL.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from cluster_cache import cluster_cache, ARGOCD_NAMESPACE
+from k8s_fastlist import raw_list
+
+# Reuse window for the list-based fallback snapshot
+HEALTH_FALLBACK_TTL = float(os.getenv('HEALTH_FALLBACK_TTL', '15'))
+
+
+def _get(obj: Any, *path: str) -> Any:
+    """Nested lookup that works for model objects and raw dicts"""
+    for attr in path:
+        if obj is None:
+            return None
+        obj = obj.get(attr) if isinstance(obj, dict) else getattr(obj, attr, None)
+    return obj
+
+
+def _key(obj: Any) -> Tuple[Optional[str], Optional[str]]:
+    return _get(obj, 'metadata', 'namespace'), _get(obj, 'metadata', 'name')
+
+
+def pod_value(pod: Any) -> str:
+    return _get(pod, 'status', 'phase') or 'Unknown'
+
+
+def deployment_value(deploy: Any) -> Tuple[int, int]:
+    if isinstance(deploy, dict):
+        status = deploy.get('status') or {}
+        return status.get('replicas') or 0, status.get('readyReplicas') or 0
+    return deploy.status.replicas or 0, deploy.status.ready_replicas or 0
+
+
+def application_value(app: Dict[str, Any]) -> Tuple[str, str]:
+    status = app.get('status') or {}
+    return (status.get('sync') or {}).get('status') or 'Unknown', (status.get('health') or {}).get('status') or 'Unknown'
+
+
+class Tally:
+    """Counts of one extracted value per object, updated incrementally"""
+
+    def __init__(self, extract: Callable[[Any], Hashable]):
+        self.extract = extract
+        self.values: Dict[Tuple, Hashable] = {}
+        self.counts: Counter = Counter()
+
+    def reset(self, objects):
+        self.values = {_key(obj): self.extract(obj) for obj in objects}
+        self.counts = Counter(self.values.values())
+
+    def apply(self, event_type: str, obj: Any):
+        key = _key(obj)
+        old = self.values.pop(key, None)
+        if old is not None:
+            self.counts[old] -= 1
+            if not self.counts[old]:
+                del self.counts[old]
+        if event_type != 'DELETED':
+            value = self.extract(obj)
+            self.values[key] = value
+            self.counts[value] += 1
+
+    def total(self) -> int:
+        return len(self.values)
+
+
+def summarize(pods: Counter, deployments: Counter, applications: Counter) -> Dict[str, Any]:
+    """Snapshot body from value counts"""
+    by_sync, by_health = Counter(), Counter()
+    for (sync, health), count in applications.items():
+        by_sync[sync] += count
+        by_health[health] += count
+
+    return {
+        'pods': {
+            'total': sum(pods.values()),
+            'running': pods.get('Running', 0),
+            'by_phase': dict(pods)
+        },
+        'deployments': {
+            'total': sum(deployments.values()),
+            'replicas': sum(replicas * count for (replicas, _), count in deployments.items()),
+            'ready': sum(ready * count for (_, ready), count in deployments.items())
+        },
+        'argocd': {
+            'total': sum(applications.values()),
+            'synced': by_sync.get('Synced', 0),
+            'healthy': by_health.get('Healthy', 0),
+            'degraded': by_health.get('Degraded', 0),
+            'by_sync': dict(by_sync),
+            'by_health': dict(by_health)
+        }
+    }
+
+
+class PlatformHealth:
+    """Watch-fed counters with a list-based fallback"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tallies = {
+            'pods': Tally(pod_value),
+            'deployments': Tally(deployment_value),
+            'applications': Tally(application_value)
+        }
+        self._readers = {
+            'pods': cluster_cache.pods,
+            'deployments': cluster_cache.deployments,
+            'applications': cluster_cache.applications
+        }
+        self.live: Dict[str, bool] = {kind: False for kind in self._tallies}
+        self._core_api = None
+        self._apps_api = None
+        self._custom_api = None
+        self._fallback: Dict[str, Tuple[float, Counter]] = {}
+        self.fallback_lists = 0
+
+    def start(self, core_api, apps_api, custom_api=None):
+        """Subscribe to cluster cache events (kinds the cache doesn't watch use the fallback)"""
+        self._core_api = core_api
+        self._apps_api = apps_api
+        self._custom_api = custom_api
+        for kind in self._tallies:
+            self.live[kind] = cluster_cache.add_listener(kind, self._listener(kind))
+            if self.live[kind] and cluster_cache.is_synced(kind):
+                self._reset(kind)
+
+    def _listener(self, kind: str) -> Callable[[str, Any], None]:
+        def on_event(event_type: str, obj: Any):
+            if event_type == 'SYNC':
+                self._reset(kind)
+                return
+            with self._lock:
+                self._tallies[kind].apply(event_type, obj)
+        return on_event
+
+    def _reset(self, kind: str):
+        objects = self._readers[kind]()
+        with self._lock:
+            self._tallies[kind].reset(objects)
+
+    # ------------------------------------------------------------------
+    # Fallback (no watch): raw JSON lists, no model deserialization
+    # ------------------------------------------------------------------
+
+    def _list_counts(self, kind: str) -> Counter:
+        if kind == 'pods' and self._core_api is not None:
+            items = raw_list(self._core_api.list_pod_for_all_namespaces).get('items') or []
+            return Counter(pod_value(pod) for pod in items)
+        if kind == 'deployments' and self._apps_api is not None:
+            items = raw_list(self._apps_api.list_deployment_for_all_namespaces).get('items') or []
+            return Counter(deployment_value(deploy) for deploy in items)
+        if kind == 'applications' and self._custom_api is not None:
+            items = self._custom_api.list_namespaced_custom_object(
+                group='argoproj.io',
+                version='v1alpha1',
+                namespace=ARGOCD_NAMESPACE,
+                plural='applications'
+            ).get('items', [])
+            return Counter(application_value(app) for app in items)
+        return Counter()
+
+    def _fallback_counts(self, kind: str) -> Counter:
+        now = time.time()
+        cached = self._fallback.get(kind)
+        if cached and now - cached[0] < HEALTH_FALLBACK_TTL:
+            return cached[1]
+        try:
+            counts = self._list_counts(kind)
+        except Exception as e:
+            print(f"⚠️ Health fallback list failed for {kind}: {e}")
+            return Counter()
+        self.fallback_lists += 1
+        self._fallback[kind] = (now, counts)
+        return counts
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts for pods, deployments and ArgoCD apps (may block on the fallback path)"""
+        watched = {kind for kind in self._tallies if self.live[kind] and cluster_cache.is_synced(kind)}
+        with self._lock:
+            counts = {kind: Counter(self._tallies[kind].counts) for kind in watched}
+        for kind in self._tallies:
+            if kind not in watched:
+                counts[kind] = self._fallback_counts(kind)
+
+        snapshot = summarize(counts['pods'], counts['deployments'], counts['applications'])
+        snapshot['source'] = {kind: 'watch' if kind in watched else 'list' for kind in self._tallies}
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tracked = {kind: tally.total() for kind, tally in self._tallies.items()}
+        return {'live': dict(self.live), 'tracked': tracked, 'fallback_lists': self.fallback_lists}
+
+
+# Global instance shared by main.py and tools.py
+platform_health = PlatformHealth()
@@ -56,7 +56,7 @@ Reply with the tokens and I'll create the customer.
 **Step 2 - Execute (after user provides tokens):**
 ONLY after user provides both tokens:
 - Call create_customer tool with all parameters
-- Report success or errors clearly
+- Report success or errors clearly (if provisioning is still running, say so and give the progress_url)
 
 **DO NOT** call create_customer until you have both tokens.
 **DO NOT** proceed without explicit user confirmation and token provision.
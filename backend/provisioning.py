@@ -0,0 +1,329 @@
+"""
+Provisioning - customer onboarding as a background job
+
+POST /customers/create used to run the whole onboarding (GitHub repo,
+database rows, namespaces, ArgoCD apps, template push) inside the request,
+often for tens of seconds. The handler now validates, records the customer
+and returns a job ID; the remaining steps run here as an asyncio task, at
+most PROVISIONING_CONCURRENCY jobs at a time.
+
+Each step's status and timing is kept in memory for progress polling and
+written to provisioning_jobs / provisioning_steps on a single writer
+thread, so progress survives a restart. Jobs a restart interrupted are
+marked failed by recover().
+
+Usage:
+    job = provisioner.submit(customer_id, ['namespaces', 'argocd_apps'], run_onboarding)
+
+    async def run_onboarding(job):
+        async with job.step('namespaces') as step:
+            ...
+            step['message'] = 'Created 3 namespaces'
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Onboarding jobs running at once (the rest wait, status "pending")
+PROVISIONING_CONCURRENCY = int(os.getenv('PROVISIONING_CONCURRENCY', '2'))
+# Finished jobs kept in memory for progress reads (older ones are read from the database)
+PROVISIONING_JOBS_KEPT = int(os.getenv('PROVISIONING_JOBS_KEPT', '100'))
+
+FINISHED = ('success', 'partial', 'error')
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class Job:
+    """One onboarding run: planned steps, their status and timing"""
+
+    def __init__(self, provisioner: 'Provisioner', customer_id: str, steps: List[str], persist: bool):
+        self._provisioner = provisioner
+        self.persist = persist
+        self.id = str(uuid.uuid4())
+        self.customer_id = customer_id
+        self.status = 'pending'
+        self.message: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.steps: "OrderedDict[str, Dict[str, Any]]" = OrderedDict(
+            (name, {'step': name, 'status': 'pending', 'message': None,
+                    'started_at': None, 'completed_at': None, 'duration_ms': None})
+            for name in steps
+        )
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        """
+        Run one step: marks it running, then success - or error if the body
+        raises (the job stops) or sets step['status'] = 'error' itself (the
+        job goes on and ends as "partial")
+        """
+        record = self.steps.setdefault(name, {'step': name, 'status': 'pending', 'message': None,
+                                              'started_at': None, 'completed_at': None, 'duration_ms': None})
+        record.update(status='running', started_at=datetime.utcnow())
+        self._provisioner.save_step(self, name)
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record.update(status='error', message=str(e))
+            raise
+        else:
+            if record['status'] == 'running':
+                record['status'] = 'success'
+        finally:
+            record.update(completed_at=datetime.utcnow(), duration_ms=int((time.perf_counter() - started) * 1000))
+            self._provisioner.save_step(self, name)
+
+    def record(self, name: str, message: str, started_at: datetime, status: str = 'success'):
+        """Record a step that already ran before the job started (in the request)"""
+        completed_at = datetime.utcnow()
+        self.steps[name].update(status=status, message=message, started_at=started_at, completed_at=completed_at,
+                                duration_ms=int((completed_at - started_at).total_seconds() * 1000))
+        self._provisioner.save_step(self, name)
+
+    def skip(self, name: str, message: str):
+        """Record a planned step that won't run"""
+        self.steps[name].update(status='skipped', message=message)
+        self._provisioner.save_step(self, name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        steps = []
+        for record in self.steps.values():
+            steps.append({
+                **record,
+                'started_at': _iso(record['started_at']),
+                'completed_at': _iso(record['completed_at'])
+            })
+        done = sum(1 for record in self.steps.values() if record['status'] in ('success', 'error', 'skipped'))
+        return {
+            'job_id': self.id,
+            'customer_id': self.customer_id,
+            'status': self.status,
+            'message': self.message,
+            'result': self.result if self.status in FINISHED else None,
+            'created_at': _iso(self.created_at),
+            'started_at': _iso(self.started_at),
+            'completed_at': _iso(self.completed_at),
+            'progress': {'completed': done, 'total': len(self.steps)},
+            'steps': steps
+        }
+
+
+class Provisioner:
+    """Runs onboarding jobs in the background and persists their progress"""
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # One writer: step updates reach the database in the order they happened
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='provisioning')
+        self._stats = Counter()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def submit(self, customer_id: str, steps: List[str], run: Callable[[Job], Awaitable[None]],
+               persist: bool = True) -> Job:
+        """
+        Create a job with its planned steps and start it (call from the event loop)
+
+        persist=False keeps progress in memory only (no database configured)
+        """
+        job = Job(self, customer_id, steps, persist)
+        self._jobs[job.id] = job
+        self._trim()
+        self._stats['submitted'] += 1
+        self._save_job(job, list(job.steps))
+        self._tasks[job.id] = asyncio.create_task(self._run(job, run))
+        return job
+
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[None]]):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(PROVISIONING_CONCURRENCY)
+        try:
+            async with self._semaphore:
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                self._save_job(job)
+                try:
+                    await run(job)
+                    failed = [name for name, record in job.steps.items() if record['status'] == 'error']
+                    job.status = 'partial' if failed else 'success'
+                    job.message = f"Completed with errors in: {', '.join(failed)}" if failed else 'Customer provisioned'
+                except Exception as e:
+                    job.status = 'error'
+                    job.message = str(e)
+                    for name, record in job.steps.items():
+                        if record['status'] == 'pending':
+                            job.skip(name, 'Not run: an earlier step failed')
+                    print(f"❌ Provisioning {job.customer_id} failed: {e}")
+                job.completed_at = datetime.utcnow()
+                self._stats[job.status] += 1
+                self._save_job(job)
+                print(f"{'✅' if job.status == 'success' else '⚠️'} Provisioning {job.customer_id}: {job.status} "
+                      f"in {(job.completed_at - job.started_at).total_seconds():.1f}s")
+        finally:
+            self._tasks.pop(job.id, None)
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(len(finished) - PROVISIONING_JOBS_KEPT, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job progress (in memory while recent, else from the database)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._load(job_id=job_id)
+
+    def latest(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Most recent job of a customer"""
+        jobs = [job for job in self._jobs.values() if job.customer_id == customer_id]
+        if jobs:
+            return max(jobs, key=lambda job: job.created_at).to_dict()
+        return self._load(customer_id=customer_id)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _save_job(self, job: Job, planned: Optional[List[str]] = None):
+        if job.persist:
+            self._executor.submit(self._write_job, job, planned)
+
+    def save_step(self, job: Job, name: str):
+        if job.persist:
+            self._executor.submit(self._write_step, job, name, dict(job.steps[name]))
+
+    def _write_job(self, job: Job, planned: Optional[List[str]] = None):
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, ProvisioningJob, ProvisioningStep
+
+            db = SessionLocal()
+            try:
+                row = db.query(ProvisioningJob).filter(ProvisioningJob.id == job.id).first()
+                if row is None:
+                    row = ProvisioningJob(id=job.id, customer_id=job.customer_id, created_at=job.created_at)
+                    db.add(row)
+                    for name in planned or []:
+                        db.add(ProvisioningStep(customer_id=job.customer_id, job_id=job.id, step=name, status='pending'))
+                row.status = job.status
+                row.message = job.message
+                row.started_at = job.started_at
+                row.completed_at = job.completed_at
+                if job.status in FINISHED:
+                    row.result = job.result
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        except Exception as e:
+            self._stats['write_errors'] += 1
+            print(f"⚠️ Could not persist provisioning job {job.id}: {e}")
+
+    def _write_step(self, job: Job, name: str, record: Dict[str, Any]):
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, ProvisioningStep
+
+            db = SessionLocal()
+            try:
+                row = db.query(ProvisioningStep).filter(
+                    ProvisioningStep.job_id == job.id, ProvisioningStep.step == name
+                ).first()
+                if row is None:
+                    row = ProvisioningStep(customer_id=job.customer_id, job_id=job.id, step=name)
+                    db.add(row)
+                row.status = record['status']
+                row.message = record['message']
+                row.started_at = record['started_at']
+                row.completed_at = record['completed_at']
+                row.duration_ms = record['duration_ms']
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        except Exception as e:
+            self._stats['write_errors'] += 1
+            print(f"⚠️ Could not persist provisioning step {name} of {job.id}: {e}")
+
+    def _load(self, job_id: Optional[str] = None, customer_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, ProvisioningJob
+
+            db = SessionLocal()
+            try:
+                query = db.query(ProvisioningJob)
+                if job_id:
+                    query = query.filter(ProvisioningJob.id == job_id)
+                else:
+                    query = query.filter(ProvisioningJob.customer_id == customer_id).order_by(ProvisioningJob.created_at.desc())
+                row = query.first()
+                if row is None:
+                    return None
+                data = row.to_dict()
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Could not load provisioning job: {e}")
+            return None
+        done = sum(1 for step in data['steps'] if step['status'] in ('success', 'error', 'skipped'))
+        data['progress'] = {'completed': done, 'total': len(data['steps'])}
+        return data
+
+    def recover(self):
+        """Mark jobs left pending/running by a previous process as failed (blocking, call at startup)"""
+        try:
+            # Import here to avoid circular dependencies
+            from database import SessionLocal, ProvisioningJob
+
+            db = SessionLocal()
+            try:
+                interrupted = db.query(ProvisioningJob).filter(ProvisioningJob.status.in_(['pending', 'running'])).all()
+                for row in interrupted:
+                    row.status = 'error'
+                    row.message = 'Interrupted by a backend restart'
+                    row.completed_at = datetime.utcnow()
+                    for step in row.steps:
+                        if step.status in ('pending', 'running'):
+                            step.status = 'skipped' if step.status == 'pending' else 'error'
+                db.commit()
+                if interrupted:
+                    print(f"⚠️ Marked {len(interrupted)} interrupted provisioning job(s) as failed")
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Could not recover provisioning jobs: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': sum(1 for job in self._jobs.values() if job.status == 'running'),
+            'pending': sum(1 for job in self._jobs.values() if job.status == 'pending'),
+            'concurrency': PROVISIONING_CONCURRENCY,
+            **self._stats
+        }
+
+
+# Global instance
+provisioner = Provisioner()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Send signed fake GitHub webhook deliveries to a local backend
+
+Simulates a workflow run for a customer repo: workflow_run requested /
+in_progress / completed and workflow_job in_progress / completed, each
+signed with GITHUB_WEBHOOK_SECRET like GitHub would sign it.
+
+Usage: GITHUB_WEBHOOK_SECRET=... python send_fake_webhook.py --repo lebrick07/acme-corp-api
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+
+from github_webhooks import sign
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def run_payload(repo: str, run_id: int, branch: str, created_at: str, status: str, conclusion=None):
+    return {
+        'action': 'completed' if status == 'completed' else ('requested' if status == 'queued' else 'in_progress'),
+        'repository': {'full_name': repo},
+        'workflow_run': {
+            'id': run_id,
+            'name': 'CI',
+            'status': status,
+            'conclusion': conclusion,
+            'head_branch': branch,
+            'head_sha': f"{run_id:040x}",
+            'head_commit': {'message': 'Fake webhook run', 'author': {'name': 'Webhook Tester'}},
+            'run_attempt': 1,
+            'created_at': created_at,
+            'updated_at': now(),
+            'run_started_at': created_at,
+            'html_url': f"https://github.com/{repo}/actions/runs/{run_id}",
+            'jobs_url': f"https://api.github.com/repos/{repo}/actions/runs/{run_id}/jobs"
+        }
+    }
+
+
+def job_payload(repo: str, run_id: int, job_id: int, status: str, conclusion=None):
+    steps = [{'name': 'Build', 'status': status, 'conclusion': conclusion, 'number': 1,
+              'started_at': now(), 'completed_at': now() if status == 'completed' else None}]
+    return {
+        'action': status,
+        'repository': {'full_name': repo},
+        'workflow_job': {
+            'id': job_id,
+            'run_id': run_id,
+            'name': 'build',
+            'status': status,
+            'conclusion': conclusion,
+            'started_at': now(),
+            'completed_at': now() if status == 'completed' else None,
+            'html_url': f"https://github.com/{repo}/actions/runs/{run_id}/job/{job_id}",
+            'steps': steps
+        }
+    }
+
+
+def send(url: str, secret: str, event: str, payload: dict):
+    body = json.dumps(payload).encode()
+    response = httpx.post(url, content=body, headers={
+        'Content-Type': 'application/json',
+        'X-GitHub-Event': event,
+        'X-GitHub-Delivery': str(uuid.uuid4()),
+        'X-Hub-Signature-256': sign(body, secret)
+    }, timeout=10.0)
+    print(f"{'✅' if response.is_success else '❌'} {event} ({payload.get('action')}): {response.status_code} {response.text}")
+
+
+def main():
+    """Main function for CLI usage"""
+    parser = argparse.ArgumentParser(description="Send signed fake GitHub webhook deliveries")
+    parser.add_argument('--url', default='http://localhost:8000/webhooks/github')
+    parser.add_argument('--repo', required=True, help="repository full name (org/repo) linked to a customer")
+    parser.add_argument('--branch', default='develop')
+    parser.add_argument('--conclusion', default='success', choices=['success', 'failure', 'cancelled'])
+    parser.add_argument('--secret', default=os.getenv('GITHUB_WEBHOOK_SECRET', ''))
+    args = parser.parse_args()
+
+    if not args.secret:
+        print("❌ Set GITHUB_WEBHOOK_SECRET or pass --secret")
+        sys.exit(1)
+
+    run_id = random.randint(10**9, 10**10)
+    job_id = run_id + 1
+    created_at = now()
+    send(args.url, args.secret, 'workflow_run', run_payload(args.repo, run_id, args.branch, created_at, 'queued'))
+    send(args.url, args.secret, 'workflow_run', run_payload(args.repo, run_id, args.branch, created_at, 'in_progress'))
+    send(args.url, args.secret, 'workflow_job', job_payload(args.repo, run_id, job_id, 'in_progress'))
+    send(args.url, args.secret, 'workflow_job', job_payload(args.repo, run_id, job_id, 'completed', args.conclusion))
+    send(args.url, args.secret, 'workflow_run', run_payload(args.repo, run_id, args.branch, created_at, 'completed', args.conclusion))
+    print(f"\nRun {run_id} sent for {args.repo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Single Flight - one upstream call for concurrent identical requests
+
+When several dashboards poll at once, each request used to make its own
+identical K8s list, ArgoCD read or GitHub call at the same moment. Callers
+passing the same key while a call for it is in flight now wait for that
+call and share its result (or its exception) instead of starting another.
+With `ttl` the result is also kept for that many seconds, so callers
+arriving just after it finished reuse it (micro-cache; off by default).
+
+Results are shared between callers - treat them as read-only. Use it for
+reads only, never for calls that change anything.
+
+Blocking code (sync endpoints, cluster cache fallbacks) uses call(); async
+code uses run(). Keys are tuples whose first element names the call for
+the per-call coalescing metrics.
+
+Usage:
+    pods = singleflight.call(('k8s.list_namespaced_pod', namespace), lambda: v1.list_namespaced_pod(namespace).items)
+    deployment = await singleflight.run(('k8s.read_namespaced_deployment', namespace, name),
+                                        lambda: run_k8s(apps_v1.read_namespaced_deployment, name, namespace))
+    pods = cluster_cache.pods(namespace, fallback=shared(('k8s.list_namespaced_pod', namespace), list_pods, SINGLEFLIGHT_TTL))
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Micro-cache for polled read paths that opt in, in seconds (0 = coalesce only)
+SINGLEFLIGHT_TTL = float(os.getenv('SINGLEFLIGHT_TTL', '1'))
+# Most results kept in the micro-cache
+SINGLEFLIGHT_CACHE_MAX = int(os.getenv('SINGLEFLIGHT_CACHE_MAX', '1024'))
+
+Key = Tuple[Hashable, ...]
+
+
+class _Flight:
+    """A blocking call in progress, awaited by its followers"""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """In-flight call registry with an optional short-lived result cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Key, _Flight] = {}
+        self._tasks: Dict[Key, asyncio.Future] = {}
+        self._cache: "OrderedDict[Key, Tuple[float, Any]]" = OrderedDict()  # key -> (expires_at, value)
+        self._stats: Dict[str, Counter] = {}
+
+    def _count(self, key: Key, outcome: str):
+        # Caller holds self._lock
+        self._stats.setdefault(str(key[0]), Counter())[outcome] += 1
+
+    def _cached(self, key: Key) -> Tuple[bool, Any]:
+        # Caller holds self._lock
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._cache[key]
+            return False, None
+        return True, entry[1]
+
+    def _store(self, key: Key, value: Any, ttl: float):
+        # Caller holds self._lock
+        if ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + ttl, value)
+        self._cache.move_to_end(key)
+        if len(self._cache) > SINGLEFLIGHT_CACHE_MAX:
+            now = time.monotonic()
+            for expired in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[expired]
+            while len(self._cache) > SINGLEFLIGHT_CACHE_MAX:
+                self._cache.popitem(last=False)
+
+    def call(self, key: Key, fn: Callable[[], Any], ttl: float = 0.0) -> Any:
+        """Blocking: run fn() unless an identical call is in flight (or cached)"""
+        with self._lock:
+            self._count(key, 'calls')
+            hit, value = self._cached(key)
+            if hit:
+                self._count(key, 'cached')
+                return value
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._count(key, 'coalesced')
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                self._count(key, 'upstream')
+                if flight.error is None:
+                    self._store(key, flight.value, ttl)
+                else:
+                    self._count(key, 'errors')
+            flight.done.set()
+        return flight.value
+
+    async def run(self, key: Key, factory: Callable[[], Awaitable[Any]], ttl: float = 0.0) -> Any:
+        """Async: await factory() unless an identical call is in flight (or cached)"""
+        with self._lock:
+            self._count(key, 'calls')
+            hit, value = self._cached(key)
+            if hit:
+                self._count(key, 'cached')
+                return value
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(self._lead(key, factory, ttl))
+                # Nobody may be left to await a failed call once every caller was cancelled
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            else:
+                self._count(key, 'coalesced')
+        # A cancelled caller (client went away) doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _lead(self, key: Key, factory: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        failed = True
+        try:
+            value = await factory()
+            failed = False
+            return value
+        finally:
+            with self._lock:
+                self._tasks.pop(key, None)
+                self._count(key, 'upstream')
+                if failed:
+                    self._count(key, 'errors')
+                else:
+                    self._store(key, value, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-call counters; coalescing_rate is the share of calls that didn't go upstream"""
+        with self._lock:
+            calls = {name: dict(counts) for name, counts in self._stats.items()}
+            cached = len(self._cache)
+            in_flight = len(self._flights) + len(self._tasks)
+        for counts in calls.values():
+            shared = counts.get('coalesced', 0) + counts.get('cached', 0)
+            counts['coalescing_rate'] = round(shared / counts['calls'], 3) if counts.get('calls') else 0.0
+        total = sum(counts.get('calls', 0) for counts in calls.values())
+        shared = sum(counts.get('coalesced', 0) + counts.get('cached', 0) for counts in calls.values())
+        return {
+            'calls': total,
+            'coalescing_rate': round(shared / total, 3) if total else 0.0,
+            'in_flight': in_flight,
+            'cached_results': cached,
+            'ttl_seconds': SINGLEFLIGHT_TTL,
+            'by_call': calls
+        }
+
+
+def shared(key: Key, fn: Callable[[], Any], ttl: float = 0.0) -> Callable[[], Any]:
+    """fn wrapped in a blocking single-flight call (for cluster cache fallbacks)"""
+    return lambda: singleflight.call(key, fn, ttl)
+
+
+# Global instance
+singleflight = SingleFlight()
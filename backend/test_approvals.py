@@ -0,0 +1,63 @@
+"""
+Tests for preprod vs prod drift (compute_drift)
+"""
+from types import SimpleNamespace
+
+from approvals import compute_drift
+
+
+def deployment(name, images, ready=1, replicas=1):
+    containers = [SimpleNamespace(name=container, image=image) for container, image in images.items()]
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name),
+        spec=SimpleNamespace(replicas=replicas, template=SimpleNamespace(spec=SimpleNamespace(containers=containers))),
+        status=SimpleNamespace(ready_replicas=ready)
+    )
+
+
+def test_no_drift_when_images_match():
+    result = compute_drift('acme', [deployment('api', {'api': 'api:1.2'})], [deployment('api', {'api': 'api:1.2'})])
+
+    assert result['approval_needed'] is False
+    assert result['drift'] == []
+    assert result['preprod'] == {'image': 'api:1.2', 'ready': 1, 'replicas': 1}
+    assert result['prod'] == {'image': 'api:1.2', 'ready': 1, 'replicas': 1}
+    assert 'reason' not in result
+
+
+def test_drift_is_reported_per_container():
+    preprod = [deployment('api', {'api': 'api:1.3', 'sidecar': 'proxy:2'})]
+    prod = [deployment('api', {'api': 'api:1.2', 'sidecar': 'proxy:2'}, ready=0, replicas=2)]
+
+    result = compute_drift('acme', preprod, prod)
+
+    assert result['approval_needed'] is True
+    assert result['drift'] == [
+        {'deployment': 'api', 'container': 'api', 'preprod_image': 'api:1.3', 'prod_image': 'api:1.2'}
+    ]
+    # Headline fields describe the drifted container
+    assert result['preprod']['image'] == 'api:1.3'
+    assert result['prod'] == {'image': 'api:1.2', 'ready': 0, 'replicas': 2}
+
+
+def test_missing_prod_counterpart_and_containers():
+    preprod = [deployment('worker', {'worker': 'worker:5'}), deployment('api', {'api': 'api:1', 'init': 'init:1'})]
+    prod = [deployment('api', {'api': 'api:1', 'metrics': 'metrics:1'})]
+
+    drift = compute_drift('acme', preprod, prod)['drift']
+
+    assert drift == [
+        {'deployment': 'api', 'container': 'init', 'preprod_image': 'init:1', 'prod_image': None},
+        {'deployment': 'api', 'container': 'metrics', 'preprod_image': None, 'prod_image': 'metrics:1'},
+        {'deployment': 'worker', 'container': 'worker', 'preprod_image': 'worker:5', 'prod_image': None},
+    ]
+
+
+def test_empty_environment():
+    result = compute_drift('acme', [deployment('api', {'api': 'api:1'})], [])
+
+    assert result['approval_needed'] is True
+    assert result['prod'] is None
+    assert result['reason'] == 'No deployments found'
+
+    assert compute_drift('acme', [], [])['preprod'] is None
@@ -0,0 +1,95 @@
+"""
+Tests for the watch-backed cluster cache (ResourceInformer)
+"""
+import threading
+
+import cluster_cache as cc
+from cluster_cache import ResourceInformer, ClusterCache
+
+
+def obj(namespace, name, resource_version='1', labels=None):
+    return {'metadata': {'namespace': namespace, 'name': name, 'resourceVersion': resource_version,
+                         'labels': labels or {}}}
+
+
+def listing(items, resource_version):
+    return {'items': items, 'metadata': {'resourceVersion': resource_version}}
+
+
+class FakeWatch:
+    """Replays one scripted event list per watch.Watch().stream() call"""
+
+    def __init__(self, streams, informer, calls):
+        self.streams = streams
+        self.informer = informer
+        self.calls = calls
+        self.resource_version = None
+
+    def stream(self, func, **kwargs):
+        self.calls.append(kwargs['resource_version'])
+        if not self.streams:
+            self.informer._stop.set()
+            return
+        for event in self.streams.pop(0):
+            yield event
+
+    def stop(self):
+        pass
+
+
+def test_apply_adds_modifies_and_deletes():
+    informer = ResourceInformer('pods', lambda: listing([obj('a', 'p1')], '10'))
+    events = []
+    informer.add_listener(lambda event_type, o: events.append(event_type))
+    informer._relist()
+
+    informer._apply('ADDED', obj('a', 'p2', '11'))
+    informer._apply('MODIFIED', obj('a', 'p1', '12', labels={'app': 'web'}))
+    informer._apply('ADDED', obj('b', 'p3', '13'))
+    informer._apply('DELETED', obj('b', 'p3', '14'))
+
+    assert [o['metadata']['name'] for o in informer.items()] == ['p1', 'p2']
+    assert informer.items('a', selector={'app': 'web'}) == [obj('a', 'p1', '12', labels={'app': 'web'})]
+    assert 'b' not in informer._store  # empty namespace buckets are dropped
+    assert informer.resource_version == '14'
+    assert informer.events == 4
+    assert events == ['SYNC', 'ADDED', 'MODIFIED', 'ADDED', 'DELETED']
+
+
+def test_relists_after_410_gone(monkeypatch):
+    lists = iter([
+        listing([obj('a', 'p1')], '10'),
+        listing([obj('a', 'p1'), obj('a', 'p2')], '50'),
+    ])
+    informer = ResourceInformer('pods', lambda **kwargs: next(lists))
+    calls = []
+    streams = [
+        [{'type': 'ADDED', 'object': obj('a', 'p9', '11')},
+         {'type': 'ERROR', 'raw_object': {'code': 410, 'message': 'too old resource version'}}],
+    ]
+    monkeypatch.setattr(cc.watch, 'Watch', lambda: FakeWatch(streams, informer, calls))
+
+    thread = threading.Thread(target=informer._run)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert informer.relists == 2
+    assert informer.errors == 0  # 410 relists immediately, it isn't an error
+    # The watch resumed from the new listing's version, and the relist replaced the store
+    assert calls == ['10', '50']
+    assert [o['metadata']['name'] for o in informer.items()] == ['p1', 'p2']
+
+
+def test_cache_reads_fall_back_until_synced():
+    cache = ClusterCache()
+    assert cache.pods('a', fallback=lambda: ['direct']) == ['direct']
+
+    informer = ResourceInformer('pods', lambda: listing([obj('a', 'p1')], '7'))
+    cache.informers['pods'] = informer
+    informer._relist()
+    assert cache.pods('a', fallback=lambda: ['direct']) == [obj('a', 'p1')]
+    assert cache.version('pods') == 'pods:1:7'
+    assert cache.version('pods', 'deployments') is None
+    assert cache.stats()['resources']['pods']['hits'] == 1
+    assert cache.stats()['resources']['pods']['misses'] == 1
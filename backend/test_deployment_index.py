@@ -0,0 +1,85 @@
+"""
+Tests for deployment ID resolution (DeploymentIndex)
+"""
+from types import SimpleNamespace
+
+import deployment_index as di
+from deployment_index import DeploymentIndex
+
+
+def resource(namespace, name, labels=None):
+    return SimpleNamespace(metadata=SimpleNamespace(namespace=namespace, name=name, labels=labels or {}))
+
+
+class FakeCache:
+    """Stands in for cluster_cache: a fixed deployment list"""
+
+    def __init__(self, deployments):
+        self.deployment_list = deployments
+        self.lists = 0
+
+    def deployments(self, namespace=None, fallback=None):
+        self.lists += 1
+        return [d for d in self.deployment_list if namespace is None or d.metadata.namespace == namespace]
+
+
+def make_index(monkeypatch, deployments, labelled=(), customers=('acme-corp',)):
+    cache = FakeCache(deployments)
+    monkeypatch.setattr(di, 'cluster_cache', cache)
+    monkeypatch.setattr(di, 'tenant_namespaces', lambda core_api: list(labelled))
+    index = DeploymentIndex()
+    index._customer_ids = set(customers)
+    index._apps_api = object()
+    index.rebuild()
+    return index, cache
+
+
+def test_resolve_hyphenated_ids(monkeypatch):
+    index, _ = make_index(monkeypatch, [
+        resource('acme-corp-dev', 'api-server'),
+        resource('acme-corp-prod', 'api'),
+        resource('kube-system', 'coredns'),
+    ])
+
+    assert index.resolve('acme-corp-dev-api-server') == ('acme-corp-dev', 'api-server')
+    assert index.resolve('acme-corp-prod-api') == ('acme-corp-prod', 'api')
+    # Deployments outside tenant namespaces are not indexed
+    assert index.resolve('kube-system-coredns') is None
+    assert (index.hits, index.misses) == (2, 1)
+
+
+def test_labelled_namespaces_are_tenants(monkeypatch):
+    labelled = [(resource(None, 'team-x'), 'widgetco', 'dev')]
+    index, _ = make_index(monkeypatch, [resource('team-x', 'web')], labelled=labelled, customers=())
+
+    assert index.resolve('team-x-web') == ('team-x', 'web')
+    assert index.tenant('team-x') == ('widgetco', 'dev')
+
+
+def test_miss_rebuilds_at_most_once_per_interval(monkeypatch):
+    index, cache = make_index(monkeypatch, [])
+    cache.deployment_list.append(resource('acme-corp-dev', 'worker'))
+
+    # Built just now: a miss inside the interval doesn't rebuild
+    assert index.resolve('acme-corp-dev-worker') is None
+    assert cache.lists == 1
+
+    index.built_at -= di.REBUILD_INTERVAL_SECONDS
+    assert index.resolve('acme-corp-dev-worker') == ('acme-corp-dev', 'worker')
+    assert cache.lists == 2
+
+
+def test_events_update_live_index(monkeypatch):
+    index, _ = make_index(monkeypatch, [resource('acme-corp-dev', 'api')])
+    index.live = True
+
+    index._on_deployment_event('ADDED', resource('acme-corp-dev', 'worker'))
+    index._on_deployment_event('DELETED', resource('acme-corp-dev', 'api'))
+    index._on_deployment_event('ADDED', resource('other-dev', 'web'))  # not a tenant namespace
+
+    assert index.resolve('acme-corp-dev-worker') == ('acme-corp-dev', 'worker')
+    assert index.resolve('acme-corp-dev-api') is None
+    assert index.resolve('other-dev-web') is None
+
+    index._on_namespace_event('DELETED', resource(None, 'acme-corp-dev'))
+    assert index.resolve('acme-corp-dev-worker') is None
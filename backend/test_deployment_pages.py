@@ -0,0 +1,125 @@
+"""
+Tests for keyset pagination of GET /deployments
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import deployment_pages as dp
+from deployment_pages import encode_cursor, decode_cursor, list_deployments
+
+
+def deployment(namespace, name, ready=1, replicas=1):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(namespace=namespace, name=name),
+        status=SimpleNamespace(replicas=replicas, ready_replicas=ready),
+        spec=SimpleNamespace(template=SimpleNamespace(spec=SimpleNamespace(
+            containers=[SimpleNamespace(image=f'{name}:1')]
+        )))
+    )
+
+
+class FakeCache:
+    """Stands in for cluster_cache: a fixed deployment list"""
+
+    def __init__(self, deployments):
+        self.deployment_list = deployments
+        self.reads = []
+
+    def deployments(self, namespace=None, fallback=None):
+        self.reads.append(namespace)
+        return [d for d in self.deployment_list if d.metadata.namespace == namespace]
+
+
+TENANTS = [('acme-dev', 'acme', 'dev'), ('acme-prod', 'acme', 'prod'), ('globex-dev', 'globex', 'dev')]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FakeCache([
+        # Deliberately unsorted: pages are ordered by (namespace, name)
+        deployment('acme-dev', 'worker'),
+        deployment('acme-dev', 'api'),
+        deployment('acme-prod', 'api', ready=0),
+        deployment('acme-prod', 'web'),
+        deployment('globex-dev', 'api'),
+        deployment('globex-dev', 'cron', ready=1, replicas=2),
+    ])
+    monkeypatch.setattr(dp, 'cluster_cache', cache)
+    monkeypatch.setattr(dp, 'tenant_namespaces', lambda core_api: [
+        (SimpleNamespace(metadata=SimpleNamespace(name=name)), customer, env) for name, customer, env in TENANTS
+    ])
+    return cache
+
+
+def ids(page):
+    return [row['id'] for row in page['deployments']]
+
+
+def walk(**filters):
+    """Follow next_cursor until the last page; returns the pages"""
+    pages, after = [], None
+    while True:
+        page = list_deployments(None, None, after=after, **filters)
+        pages.append(page)
+        if not page['next_cursor']:
+            return pages
+        after = decode_cursor(page['next_cursor'])
+
+
+def test_cursor_round_trip_and_malformed_cursor():
+    cursor = encode_cursor('acme-dev', 'api-server')
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == ('acme-dev', 'api-server')
+
+    for bad in ('not-a-cursor', encode_cursor('only-one', 'x')[:5], 'eyJhIjogMX0'):  # last: {"a": 1}
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_unpaged_listing_returns_everything(cache):
+    page = list_deployments(None, None)
+
+    assert page['total'] == 6 and 'next_cursor' not in page
+    assert ids(page) == ['acme-dev-api', 'acme-dev-worker', 'acme-prod-api', 'acme-prod-web',
+                         'globex-dev-api', 'globex-dev-cron']
+
+
+def test_pages_skip_across_namespaces(cache):
+    pages = walk(limit=4)
+
+    assert [ids(page) for page in pages] == [
+        ['acme-dev-api', 'acme-dev-worker', 'acme-prod-api', 'acme-prod-web'],
+        ['globex-dev-api', 'globex-dev-cron'],
+    ]
+    # The second page starts after acme-prod/web without re-reading acme-dev
+    assert cache.reads[-2:] == ['acme-prod', 'globex-dev']
+
+
+def test_exact_page_boundary(cache):
+    pages = walk(limit=3)
+
+    assert [page['count'] for page in pages] == [3, 3]
+    # Exactly full last page: no further cursor, and no empty extra page
+    assert pages[-1]['next_cursor'] is None
+    assert list_deployments(None, None, limit=6)['next_cursor'] is None
+    assert list_deployments(None, None, limit=5)['next_cursor'] == encode_cursor('globex-dev', 'api')
+
+
+def test_filters_with_limit(cache):
+    pages = walk(limit=1, customer='acme', status='running')
+    assert [ids(page) for page in pages] == [['acme-dev-api'], ['acme-dev-worker'], ['acme-prod-web']]
+
+    degraded = list_deployments(None, None, status='degraded', limit=10)
+    assert ids(degraded) == ['acme-prod-api', 'globex-dev-cron'] and degraded['next_cursor'] is None
+
+    cache.reads.clear()
+    dev = list_deployments(None, None, environment='dev', limit=2, after=('acme-dev', 'worker'))
+    assert ids(dev) == ['globex-dev-api', 'globex-dev-cron']
+    assert cache.reads == ['acme-dev', 'globex-dev']  # filtered namespaces aren't read
+
+
+def test_cursor_past_deleted_deployment(cache):
+    # The last row of a page was deleted before the next request: keyset still resumes correctly
+    page = list_deployments(None, None, limit=2, after=('acme-prod', 'app'))
+    assert ids(page) == ['acme-prod-web', 'globex-dev-api']
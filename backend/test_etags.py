@@ -0,0 +1,90 @@
+"""
+Tests for ETag / If-None-Match handling on polled endpoints
+"""
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.requests import Request as StarletteRequest
+
+from etags import version_etag, etag_matches, not_modified, conditional_json, etag_stats
+
+
+def request_with(if_none_match=None):
+    headers = [(b'if-none-match', if_none_match.encode())] if if_none_match is not None else []
+    return StarletteRequest({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers})
+
+
+def test_etag_matches():
+    etag = version_etag('deployments', 'deployments:1:42')
+
+    assert etag_matches(request_with(etag), etag)
+    assert etag_matches(request_with(f'W/{etag}'), etag)  # weak comparison
+    assert etag_matches(request_with(f'"other", {etag}'), etag)
+    assert etag_matches(request_with('*'), etag)
+    assert not etag_matches(request_with('"other"'), etag)
+    assert not etag_matches(request_with(), etag)
+    assert not etag_matches(request_with(etag), None)
+
+
+def test_version_etag():
+    assert version_etag('deployments', None) is None  # unknown version: no ETag
+    assert version_etag('a', 1) == version_etag('a', 1)
+    assert version_etag('a', 1) != version_etag('a', 2)
+
+
+def make_app():
+    app = FastAPI()
+    state = {'version': 1, 'builds': 0, 'body': {'items': [1, 2], 'took_ms': 0}}
+
+    def build():
+        state['builds'] += 1
+        state['body']['took_ms'] += 1
+        return dict(state['body'])
+
+    @app.get('/versioned')
+    def versioned(request: Request):
+        etag = version_etag('versioned', state['version'])
+        if etag_matches(request, etag):
+            return not_modified('/test/versioned', etag)
+        return conditional_json(request, '/test/versioned', build(), etag)
+
+    @app.get('/hashed')
+    def hashed(request: Request):
+        return conditional_json(request, '/test/hashed', build(), volatile=('took_ms',))
+
+    return app, state
+
+
+def test_version_etag_304_skips_rebuild():
+    app, state = make_app()
+    client = TestClient(app)
+
+    first = client.get('/versioned')
+    assert first.status_code == 200
+    assert first.headers['cache-control'] == 'no-cache'
+    etag = first.headers['etag']
+
+    second = client.get('/versioned', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.headers['etag'] == etag
+    assert second.content == b''
+    assert state['builds'] == 1
+
+    state['version'] = 2
+    third = client.get('/versioned', headers={'If-None-Match': etag})
+    assert third.status_code == 200
+    assert third.headers['etag'] != etag
+    assert etag_stats()['endpoints']['/test/versioned']['rebuilds_skipped'] == 1
+
+
+def test_content_etag_ignores_volatile_keys():
+    app, state = make_app()
+    client = TestClient(app)
+
+    etag = client.get('/hashed').headers['etag']
+    # took_ms changed, the rest didn't: still 304
+    assert client.get('/hashed', headers={'If-None-Match': etag}).status_code == 304
+
+    state['body']['items'].append(3)
+    changed = client.get('/hashed', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json()['items'] == [1, 2, 3]
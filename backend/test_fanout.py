@@ -0,0 +1,70 @@
+"""
+Tests for concurrent probes under a shared deadline (fan_out)
+"""
+import asyncio
+import time
+
+from fanout import fan_out, probe_summary
+
+
+def probe(value, delay=0.0, error=None, cancelled=None):
+    async def run():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(value)
+            raise
+        if error:
+            raise error
+        return value
+    return run
+
+
+def test_probes_run_concurrently():
+    started = time.perf_counter()
+    results = asyncio.run(fan_out({name: probe(name, 0.1) for name in ('dev', 'preprod', 'prod')}, deadline=2))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.25  # the slowest probe, not the sum
+    assert {name: result['value'] for name, result in results.items()} == {
+        'dev': 'dev', 'preprod': 'preprod', 'prod': 'prod'
+    }
+    assert all(result['ok'] and result['elapsed_ms'] >= 90 for result in results.values())
+
+
+def test_deadline_cancels_slow_probes():
+    cancelled = []
+
+    async def run():
+        started = time.perf_counter()
+        results = await fan_out({
+            'fast': probe('fast'),
+            'slow': probe('slow', 5, cancelled=cancelled),
+        }, deadline=0.1)
+        await asyncio.sleep(0)  # let the cancellation land
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+
+    assert elapsed < 1
+    assert results['fast'] == {'ok': True, 'value': 'fast', 'elapsed_ms': results['fast']['elapsed_ms']}
+    assert results['slow']['ok'] is False
+    assert results['slow']['error'] == 'timed out after 0.1s'
+    assert isinstance(results['slow']['exception'], asyncio.TimeoutError)
+    assert cancelled == ['slow']
+
+
+def test_failures_are_reported_per_probe():
+    results = asyncio.run(fan_out({
+        'ok': probe(1),
+        'broken': probe(None, error=RuntimeError('403 Forbidden')),
+    }, deadline=1))
+
+    assert results['ok']['value'] == 1
+    assert results['broken']['ok'] is False
+    assert isinstance(results['broken']['exception'], RuntimeError)
+    assert probe_summary(results)['broken'] == {
+        'ok': False, 'elapsed_ms': results['broken']['elapsed_ms'], 'error': '403 Forbidden'
+    }
+    assert asyncio.run(fan_out({})) == {}
@@ -0,0 +1,227 @@
+"""
+Tests for the GitHub client's conditional-request cache and rate-limit scheduler
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import github_client
+from github_client import (
+    GitHubClient, ResponseCache, CacheEntry, TokenBudget, PrioritySlots, RateLimited, INTERACTIVE, BACKGROUND
+)
+
+
+def entry(size, immutable=False):
+    return CacheEntry(b'x' * size, {'etag': '"e"'}, immutable)
+
+
+def test_response_cache_lru_bounded_by_bytes():
+    cache = ResponseCache(max_bytes=100)
+    cache.put('a', entry(40))
+    cache.put('b', entry(40))
+    cache.get('a')  # a is now the most recently used
+    cache.put('c', entry(40))
+
+    assert cache.get('b') is None  # least recently used went first
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.size == 80
+    assert cache.stats()['evictions'] == 1
+
+    cache.put('a', entry(10))  # replacing an entry adjusts the size
+    assert cache.size == 50
+
+    cache.put('huge', entry(101))  # larger than the whole cache: not stored
+    assert cache.get('huge') is None
+    assert cache.size == 50
+
+
+class GitHubStub:
+    """api.github.com stand-in: one ETag'd resource, 304 when it matches"""
+
+    def __init__(self):
+        self.body = {'workflow_runs': [{'id': 1, 'status': 'in_progress'}]}
+        self.etag = '"v1"'
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get('if-none-match') == self.etag:
+            return httpx.Response(304, headers={'etag': self.etag})
+        return httpx.Response(200, json=self.body, headers={'etag': self.etag})
+
+
+def run(coroutine_factory):
+    async def main():
+        client = GitHubClient(transport=httpx.MockTransport(stub))
+        try:
+            return await coroutine_factory(client)
+        finally:
+            await client.close()
+    stub = GitHubStub()
+    return asyncio.run(main()), stub
+
+
+def test_revalidates_with_etag_and_replays_304():
+    async def scenario(client):
+        first = await client.get('/repos/o/r/actions/runs', token='t', cache=True)
+        second = await client.get('/repos/o/r/actions/runs', token='t', cache=True)
+        return first, second, client.stats()['cache']
+
+    (first, second, cache), stub = run(scenario)
+
+    assert first.json() == second.json() == stub.body
+    assert second.status_code == 200  # 304 answered from the stored body
+    assert 'if-none-match' not in stub.requests[0].headers
+    assert stub.requests[1].headers['if-none-match'] == '"v1"'
+    assert cache['not_modified'] == 1 and cache['misses'] == 1
+
+
+def test_immutable_responses_skip_revalidation():
+    async def scenario(client):
+        for _ in range(3):
+            response = await client.get('/repos/o/r/actions/runs/1/jobs', token='t', cache=True,
+                                        immutable=lambda body: True)
+        return response, client.stats()['cache']
+
+    (response, cache), stub = run(scenario)
+
+    assert len(stub.requests) == 1
+    assert response.json() == stub.body
+    assert cache['immutable_hits'] == 2
+
+
+def test_cache_is_keyed_by_token_and_params():
+    async def scenario(client):
+        await client.get('/repos/o/r/actions/runs', token='a', cache=True)
+        await client.get('/repos/o/r/actions/runs', token='b', cache=True)
+        await client.get('/repos/o/r/actions/runs', token='a', cache=True, params={'branch': 'develop'})
+
+    _, stub = run(scenario)
+
+    assert ['if-none-match' in request.headers for request in stub.requests] == [False, False, False]
+
+
+def limit_response(status=200, remaining=4000, limit=5000, reset_in=600, **headers):
+    return httpx.Response(status, headers={
+        'x-ratelimit-limit': str(limit),
+        'x-ratelimit-remaining': str(remaining),
+        'x-ratelimit-reset': str(int(time.time() + reset_in)),
+        **headers
+    })
+
+
+def test_token_budget_reserves_headroom_for_interactive():
+    budget = TokenBudget()
+    budget.update(limit_response(remaining=4000))
+    budget.check(BACKGROUND)  # plenty left
+
+    budget.update(limit_response(remaining=int(5000 * github_client.GITHUB_BACKGROUND_RESERVE) - 1))
+    budget.check(INTERACTIVE)
+    with pytest.raises(RateLimited):
+        budget.check(BACKGROUND)
+
+
+def test_token_budget_pauses_on_primary_limit_until_reset():
+    budget = TokenBudget()
+    budget.update(limit_response(status=403, remaining=0, reset_in=120))
+
+    with pytest.raises(RateLimited) as raised:
+        budget.check(INTERACTIVE)
+    assert 100 < raised.value.retry_in <= 120
+    assert budget.snapshot()['pause_reason'] == 'primary'
+
+    budget.paused_until = budget.reset_at = time.time() - 1  # window rolled over
+    budget.check(BACKGROUND)
+    assert budget.remaining == budget.limit
+
+
+def test_token_budget_secondary_limit_backoff():
+    budget = TokenBudget()
+    budget.update(limit_response(status=429, **{'retry-after': '30'}))
+    assert 25 < budget.paused_until - time.time() <= 30
+
+    budget.update(httpx.Response(403, text='You have exceeded a secondary rate limit'))
+    first = budget.paused_until - time.time()
+    budget.update(httpx.Response(403, text='You have exceeded a secondary rate limit'))
+    second = budget.paused_until - time.time()
+    assert second == pytest.approx(min(first * 2, github_client.GITHUB_SECONDARY_BACKOFF_MAX), rel=0.05)
+
+    budget.update(limit_response())  # a success resets the backoff
+    assert budget.secondary_hits == 0
+
+
+def test_priority_slots_admit_interactive_first():
+    async def scenario():
+        slots = PrioritySlots(1)
+        order = []
+        holder_release = asyncio.Event()
+
+        async def holder():
+            async with slots.acquire(BACKGROUND):
+                await holder_release.wait()
+
+        async def waiter(name, priority):
+            async with slots.acquire(priority):
+                order.append(name)
+
+        hold = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(waiter('background', BACKGROUND)),
+                   asyncio.create_task(waiter('interactive', INTERACTIVE))]
+        await asyncio.sleep(0)
+        assert slots.waiting() == {'interactive': 1, 'background': 1}
+
+        holder_release.set()
+        await asyncio.gather(hold, *waiters)
+        return order, slots.in_use
+
+    order, in_use = asyncio.run(scenario())
+    assert order == ['interactive', 'background']
+    assert in_use == 0
+
+
+def test_priority_slots_cancelled_waiter_frees_its_place():
+    async def scenario():
+        slots = PrioritySlots(1)
+        release = asyncio.Event()
+
+        async def holder():
+            async with slots.acquire(INTERACTIVE):
+                await release.wait()
+
+        async def waiter():
+            async with slots.acquire(INTERACTIVE):
+                pass
+
+        hold = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+        await hold
+        await asyncio.gather(cancelled, return_exceptions=True)
+        async with slots.acquire(BACKGROUND):
+            busy = slots.in_use
+        return busy, slots.in_use
+
+    assert asyncio.run(scenario()) == (1, 0)
+
+
+def test_paused_token_serves_stale_cached_body():
+    async def scenario(client):
+        await client.get('/repos/o/r/actions/runs', token='t', cache=True)
+        client._budget('t').paused_until = time.time() + 60
+        stale = await client.get('/repos/o/r/actions/runs', token='t', cache=True)
+        with pytest.raises(RateLimited):
+            await client.request('GET', '/repos/o/r', token='t')
+        return stale, client.stats()['scheduler']
+
+    (stale, scheduler), stub = run(scenario)
+
+    assert len(stub.requests) == 1  # nothing sent while paused
+    assert stale.headers['x-cache'] == 'stale'
+    assert stale.json() == stub.body
+    assert scheduler['stale_served'] == 1 and scheduler['deferred'] == 2
@@ -0,0 +1,123 @@
+"""
+Tests for the GitHub webhook receiver (signatures and duplicate deliveries)
+"""
+import json
+from collections import OrderedDict
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import github_webhooks as gw
+from github_webhooks import sign, verify_signature
+
+SECRET = 'test-secret'
+RUN_EVENT = {
+    'repository': {'full_name': 'acme/acme-app'},
+    'workflow_run': {'id': 7, 'status': 'completed', 'conclusion': 'success'}
+}
+
+
+class FakeTracker:
+    """pipeline_tracker stand-in: records applied deliveries, optionally failing"""
+
+    def __init__(self):
+        self.applied = []
+        self.fail = False
+
+    async def apply_event(self, event, payload):
+        if self.fail:
+            raise RuntimeError('database is locked')
+        self.applied.append((event, payload))
+        return 'acme'
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = FakeTracker()
+    monkeypatch.setattr(gw, 'GITHUB_WEBHOOK_SECRET', SECRET)
+    monkeypatch.setattr(gw, 'pipeline_tracker', tracker)
+    monkeypatch.setattr(gw, '_deliveries', OrderedDict())
+    return tracker
+
+
+@pytest.fixture
+def client(tracker):
+    app = FastAPI()
+    app.include_router(gw.router)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def deliver(client, payload=RUN_EVENT, delivery_id='d-1', event='workflow_run', signature=None, body=None):
+    body = json.dumps(payload).encode() if body is None else body
+    headers = {'X-GitHub-Event': event, 'X-GitHub-Delivery': delivery_id}
+    if signature is not False:
+        headers['X-Hub-Signature-256'] = signature or sign(body, SECRET)
+    return client.post('/webhooks/github', content=body, headers=headers)
+
+
+def test_verify_signature():
+    body = b'{"zen": "Keep it logically awesome."}'
+    signature = sign(body, SECRET)
+
+    assert signature.startswith('sha256=')
+    assert verify_signature(body, signature, SECRET)
+    assert not verify_signature(body + b' ', signature, SECRET)  # body changed
+    assert not verify_signature(body, sign(body, 'other-secret'), SECRET)
+    assert not verify_signature(body, None, SECRET)
+    assert not verify_signature(body, signature, '')  # no secret configured
+
+
+def test_valid_delivery_is_applied(client, tracker):
+    response = deliver(client)
+
+    assert response.status_code == 200
+    assert response.json() == {'ok': True, 'event': 'workflow_run', 'customer_id': 'acme'}
+    assert tracker.applied == [('workflow_run', RUN_EVENT)]
+
+
+def test_bad_or_missing_signature_is_rejected(client, tracker):
+    rejected = gw._stats['rejected']
+
+    assert deliver(client, signature=sign(b'something else', SECRET)).status_code == 401
+    assert deliver(client, signature=sign(json.dumps(RUN_EVENT).encode(), 'wrong')).status_code == 401
+    assert deliver(client, signature=False).status_code == 401
+    assert tracker.applied == []
+    assert gw._stats['rejected'] == rejected + 3
+
+
+def test_disabled_receiver_and_bad_json(client, tracker, monkeypatch):
+    assert deliver(client, body=b'{not json').status_code == 400
+
+    monkeypatch.setattr(gw, 'GITHUB_WEBHOOK_SECRET', '')
+    response = deliver(client)
+    assert response.status_code == 503
+    assert tracker.applied == []
+
+
+def test_redelivery_is_acknowledged_once(client, tracker):
+    first = deliver(client, delivery_id='d-42')
+    again = deliver(client, delivery_id='d-42')
+    other = deliver(client, delivery_id='d-43')
+
+    assert first.json()['customer_id'] == 'acme'
+    assert again.status_code == 200 and again.json() == {'ok': True, 'duplicate': True}
+    assert other.json()['customer_id'] == 'acme'
+    assert len(tracker.applied) == 2
+
+
+def test_failed_apply_is_applied_on_redelivery(client, tracker):
+    tracker.fail = True
+    assert deliver(client, delivery_id='d-99').status_code == 500
+    assert 'd-99' not in gw._deliveries
+
+    tracker.fail = False
+    response = deliver(client, delivery_id='d-99')
+    assert response.json() == {'ok': True, 'event': 'workflow_run', 'customer_id': 'acme'}
+    assert len(tracker.applied) == 1
+
+
+def test_unhandled_events_are_ignored(client, tracker):
+    assert deliver(client, event='ping').json() == {'ok': True, 'event': 'ping'}
+    assert 'ignored' in deliver(client, event='push', delivery_id='d-2').json()
+    assert tracker.applied == []
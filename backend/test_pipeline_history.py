@@ -0,0 +1,170 @@
+"""
+Tests for persisted pipeline history (upserts, incremental sync, build statistics)
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+import pipeline_history as ph
+from database import Base, Customer, PipelineRun
+from pipeline_history import PipelineHistory, percentile
+
+SOURCE = {'repo': 'acme/acme-app', 'token': None}
+
+
+def iso(minutes_ago):
+    return (datetime.utcnow() - timedelta(minutes=minutes_ago)).replace(microsecond=0).isoformat() + 'Z'
+
+
+def run(run_id, status='completed', conclusion='success', created=60, started=None, updated=None,
+        attempt=1, branch='develop'):
+    """Run record; times are minutes ago (started defaults to created, updated to started)"""
+    started = created if started is None else started
+    updated = started if updated is None else updated
+    return {
+        'id': run_id, 'name': 'CI', 'status': status, 'conclusion': conclusion if status == 'completed' else None,
+        'head_branch': branch, 'head_sha': f'{run_id:040d}', 'run_attempt': attempt,
+        'created_at': iso(created), 'run_started_at': iso(started), 'updated_at': iso(updated),
+        'html_url': f'https://github.com/acme/acme-app/actions/runs/{run_id}'
+    }
+
+
+@pytest.fixture
+def session(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, 'SessionLocal', session)
+    with session() as db:
+        db.add_all([Customer(id='acme', name='Acme', stack='nodejs'), Customer(id='globex', name='Globex', stack='go')])
+        db.commit()
+    return session
+
+
+def stored(session, run_id):
+    with session() as db:
+        return db.get(PipelineRun, run_id)
+
+
+def test_record_runs_skips_stale_rows_and_reports_finished(session):
+    history = PipelineHistory()
+
+    assert history.record_runs('acme', 'acme/acme-app', [run(1, status='in_progress', updated=50)]) == []
+    # Finished with this write
+    assert history.record_runs('acme', 'acme/acme-app', [run(1, updated=40)]) == [1]
+    # Late in_progress delivery: ignored
+    assert history.record_runs('acme', 'acme/acme-app', [run(1, status='in_progress', updated=45)]) == []
+    row = stored(session, 1)
+    assert row.status == 'completed' and row.duration_seconds == 20 * 60
+    # Already completed: not reported again
+    assert history.record_runs('acme', 'acme/acme-app', [run(1, updated=40)]) == []
+
+    # Re-run attempt starts over and finishes again
+    assert history.record_runs('acme', 'acme/acme-app', [run(1, status='queued', attempt=2, updated=10)]) == []
+    assert stored(session, 1).run_attempt == 2
+    assert history.record_runs('acme', 'acme/acme-app', [run(1, attempt=2, started=10, updated=5)]) == [1]
+
+
+def test_queue_and_duration_are_derived_on_write(session):
+    PipelineHistory().record_runs('acme', 'acme/acme-app', [run(2, created=30, started=28, updated=20)])
+
+    row = stored(session, 2)
+    assert row.queue_seconds == 120
+    assert row.duration_seconds == 8 * 60
+
+
+class GitHubRuns:
+    """Stands in for PipelineHistory._get: paged runs, single runs and jobs"""
+
+    def __init__(self, runs, jobs=None):
+        self.runs = sorted(runs, key=lambda r: r['id'], reverse=True)
+        self.jobs = jobs or {}
+        self.paths = []
+
+    async def __call__(self, customer_id, source, path, params=None, immutable=None):
+        self.paths.append(path)
+        if path == '/actions/runs':
+            start = (params['page'] - 1) * params['per_page']
+            return {'workflow_runs': self.runs[start:start + params['per_page']]}
+        if path.endswith('/jobs'):
+            return {'jobs': self.jobs.get(int(path.split('/')[3]), [])}
+        return next(r for r in self.runs if r['id'] == int(path.rsplit('/', 1)[1]))
+
+
+def test_sync_stops_at_newest_stored_run(session, monkeypatch):
+    monkeypatch.setattr(ph, 'HISTORY_PAGE_SIZE', 2)
+    history = PipelineHistory()
+    history.record_runs('acme', 'acme/acme-app', [run(i) for i in (1, 2, 3)])
+
+    github = GitHubRuns([run(i) for i in range(1, 8)])
+    history._get = github
+    fetched = asyncio.run(history.sync_customer('acme', SOURCE))
+
+    # Pages: [7, 6], [5, 4], [3, 2] - the third contains stored runs, so paging stops
+    assert github.paths == ['/actions/runs'] * 3 + [f'/actions/runs/{i}/jobs' for i in (7, 6, 5, 4)]
+    assert fetched == 6
+    with session() as db:
+        assert db.query(PipelineRun).count() == 7
+
+
+def test_sync_refreshes_open_runs_and_fetches_jobs_of_finished_ones(session, monkeypatch):
+    monkeypatch.setattr(ph, 'HISTORY_PAGE_SIZE', 2)
+    history = PipelineHistory()
+    history.record_runs('acme', 'acme/acme-app', [run(1, status='in_progress', updated=50), run(5)])
+
+    job = {'id': 900, 'name': 'build', 'status': 'completed', 'conclusion': 'success',
+           'created_at': iso(60), 'started_at': iso(59), 'completed_at': iso(50)}
+    github = GitHubRuns([run(1, updated=40), run(5), run(6)], jobs={1: [job]})
+    history._get = github
+    asyncio.run(history.sync_customer('acme', SOURCE))
+
+    # Run 1 is older than the newest stored run, so it was read by ID
+    assert '/actions/runs/1' in github.paths
+    assert stored(session, 1).status == 'completed'
+    assert sorted(p for p in github.paths if p.endswith('/jobs')) == ['/actions/runs/1/jobs', '/actions/runs/6/jobs']
+    with session() as db:
+        stored_job = db.get(database.PipelineJob, 900)
+    assert stored_job.run_id == 1 and stored_job.queue_seconds == 60
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 21))
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile([7.0], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_build_stats(session):
+    history = PipelineHistory()
+    durations = [60, 120, 180, 240, 300, 360, 420, 480, 540, 600]
+    runs = [run(100 + i, created=200, started=199, updated=199 - d // 60) for i, d in enumerate(durations)]
+    runs += [
+        run(200, conclusion='failure', created=100, started=99, updated=98),
+        run(201, conclusion='timed_out', created=100, started=99, updated=98),
+        run(202, conclusion='cancelled', created=100, started=99, updated=98),
+        run(203, conclusion='skipped', created=100, started=99, updated=99),
+        run(204, status='in_progress', created=10),  # not finished: not counted
+        run(205, created=60 * 24 * 40, started=60 * 24 * 40, updated=60 * 24 * 40 - 1),  # outside the window
+        run(206, branch='main', created=50, started=50, updated=45),
+    ]
+    history.record_runs('acme', 'acme/acme-app', runs)
+    history.record_runs('globex', 'globex/app', [run(300, conclusion='failure')])
+
+    stats = history.build_stats('acme', days=30)
+    develop, main = stats['stats']
+    assert (develop['branch'], main['branch']) == ('develop', 'main')
+    assert develop['runs'] == 14
+    assert develop['failed'] == 2
+    assert develop['failure_rate'] == round(2 / 12, 3)  # cancelled and skipped excluded
+    assert develop['queue_seconds'] == {'p50': 60, 'p95': 60, 'samples': 14}
+    # Durations: 0, 60 x4, 120 ... 600 -> nearest rank 7 of 14 and 14 of 14
+    assert develop['duration_seconds'] == {'p50': 180, 'p95': 600, 'samples': 14}
+    assert main['failure_rate'] == 0 and main['duration_seconds']['p50'] == 300
+
+    assert history.build_stats('acme', branch='main')['total'] == 1
+    assert [row['customer_id'] for row in history.build_stats()['stats']] == ['acme', 'acme', 'globex']
@@ -0,0 +1,134 @@
+"""
+Tests for webhook-fed pipeline state (out-of-order and re-run deliveries)
+"""
+import asyncio
+
+from pipelines import PipelineTracker, RepoState, run_record, job_record
+
+
+def run_payload(status, conclusion=None, updated_at='2026-10-17T10:00:00Z', attempt=1, run_id=101):
+    """`workflow_run` object as GitHub sends it in a webhook delivery"""
+    return {
+        'id': run_id,
+        'name': 'CI',
+        'node_id': 'WFR_kwLOA',
+        'head_branch': 'develop',
+        'head_sha': 'a1b2c3d4e5f60718293a4b5c6d7e8f9012345678',
+        'status': status,
+        'conclusion': conclusion,
+        'run_attempt': attempt,
+        'created_at': '2026-10-17T09:58:00Z',
+        'updated_at': updated_at,
+        'run_started_at': '2026-10-17T09:58:05Z',
+        'html_url': f'https://github.com/acme/acme-app/actions/runs/{run_id}',
+        'jobs_url': f'https://api.github.com/repos/acme/acme-app/actions/runs/{run_id}/jobs',
+        'head_commit': {'id': 'a1b2c3d', 'message': 'Fix login', 'author': {'name': 'Dana', 'email': 'd@acme.io'}},
+        'repository': {'full_name': 'acme/acme-app'}
+    }
+
+
+def job_payload(status, conclusion=None, completed_at=None, job_id=501):
+    """`workflow_job` object as GitHub sends it in a webhook delivery"""
+    return {
+        'id': job_id,
+        'run_id': 101,
+        'run_attempt': 1,
+        'name': 'build',
+        'status': status,
+        'conclusion': conclusion,
+        'created_at': '2026-10-17T09:58:01Z',
+        'started_at': '2026-10-17T09:58:10Z',
+        'completed_at': completed_at,
+        'html_url': f'https://github.com/acme/acme-app/actions/runs/101/job/{job_id}',
+        'labels': ['ubuntu-latest'],
+        'steps': [
+            {'name': 'Checkout', 'status': 'completed', 'conclusion': 'success', 'number': 1,
+             'started_at': '2026-10-17T09:58:11Z', 'completed_at': '2026-10-17T09:58:12Z'}
+        ]
+    }
+
+
+def test_run_and_job_records_from_webhook_payloads():
+    run = run_record(run_payload('completed', 'success'))
+    assert run['id'] == 101 and run['head_branch'] == 'develop'
+    assert run['head_commit'] == {'message': 'Fix login', 'author': {'name': 'Dana'}}
+    assert run['run_attempt'] == 1
+    assert 'repository' not in run and 'node_id' not in run
+
+    sparse = run_record({'id': 5, 'status': 'queued'})  # fields GitHub omits early on
+    assert sparse['head_sha'] == '' and sparse['run_attempt'] == 1
+    assert sparse['head_commit'] == {'message': '', 'author': {'name': 'Unknown'}}
+
+    job = job_record(job_payload('completed', 'failure', completed_at='2026-10-17T10:01:00Z'))
+    assert job['run_id'] == 101 and job['conclusion'] == 'failure'
+    assert job['steps'] == [{'name': 'Checkout', 'status': 'completed', 'conclusion': 'success', 'number': 1,
+                             'started_at': '2026-10-17T09:58:11Z', 'completed_at': '2026-10-17T09:58:12Z'}]
+    assert 'labels' not in job
+
+
+def test_late_in_progress_run_does_not_overwrite_completed():
+    state = RepoState()
+    completed = run_record(run_payload('completed', 'success', updated_at='2026-10-17T10:03:00Z'))
+    in_progress = run_record(run_payload('in_progress', updated_at='2026-10-17T10:01:00Z'))
+
+    assert state.upsert_run(completed) is True
+    assert state.upsert_run(in_progress) is False  # delivered late
+    assert state.runs[101]['status'] == 'completed'
+    assert state.upsert_run(completed) is False  # redelivery: no change
+
+
+def test_newer_update_with_same_status_wins():
+    state = RepoState()
+    state.upsert_run(run_record(run_payload('in_progress', updated_at='2026-10-17T10:02:00Z')))
+
+    assert state.upsert_run(run_record(run_payload('in_progress', updated_at='2026-10-17T10:01:00Z'))) is False
+    assert state.upsert_run(run_record(run_payload('in_progress', updated_at='2026-10-17T10:05:00Z'))) is True
+    assert state.runs[101]['updated_at'] == '2026-10-17T10:05:00Z'
+
+
+def test_rerun_attempt_replaces_completed_run():
+    state = RepoState()
+    state.upsert_run(run_record(run_payload('completed', 'failure', updated_at='2026-10-17T10:03:00Z')))
+
+    # Re-run: same run ID, attempt 2 starts over at queued
+    assert state.upsert_run(run_record(run_payload('queued', updated_at='2026-10-17T10:10:00Z', attempt=2))) is True
+    assert state.runs[101]['status'] == 'queued' and state.runs[101]['run_attempt'] == 2
+
+    # A late delivery from attempt 1 must not bring the failure back
+    assert state.upsert_run(run_record(run_payload('completed', 'failure', updated_at='2026-10-17T10:04:00Z'))) is False
+    assert state.runs[101]['run_attempt'] == 2
+
+
+def test_late_job_delivery_does_not_overwrite_completed_job():
+    state = RepoState()
+    completed = job_record(job_payload('completed', 'success', completed_at='2026-10-17T10:01:00Z'))
+
+    assert state.upsert_job(job_record(job_payload('queued'))) is True
+    assert state.upsert_job(completed) is True
+    assert state.upsert_job(job_record(job_payload('in_progress'))) is False
+    assert state.jobs[101][501]['status'] == 'completed'
+
+
+def test_apply_event_notifies_only_changes():
+    tracker = PipelineTracker()
+    notified = []
+    tracker.add_listener(lambda kind, customer_id, repo, records: notified.append((kind, [r['status'] for r in records])))
+
+    async def customer_for_repo(full_name):
+        return 'acme' if full_name == 'acme/acme-app' else None
+    tracker.customer_for_repo = customer_for_repo
+
+    async def deliver(event, body):
+        return await tracker.apply_event(event, {'repository': {'full_name': 'acme/acme-app'}, event: body})
+
+    async def scenario():
+        await deliver('workflow_run', run_payload('completed', 'success', updated_at='2026-10-17T10:03:00Z'))
+        await deliver('workflow_run', run_payload('in_progress'))  # late, ignored
+        await deliver('workflow_job', job_payload('in_progress'))
+        unlinked = await tracker.apply_event('workflow_run', {'repository': {'full_name': 'other/repo'},
+                                                              'workflow_run': run_payload('queued')})
+        return unlinked
+
+    assert asyncio.run(scenario()) is None
+    assert notified == [('runs', ['completed']), ('jobs', ['in_progress'])]
+    assert tracker.webhook_events == 3
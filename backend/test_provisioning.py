@@ -0,0 +1,140 @@
+"""
+Tests for background onboarding jobs (Provisioner)
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import Base, Customer, ProvisioningJob, ProvisioningStep
+from provisioning import Provisioner
+
+
+def run_job(provisioner, steps, body, persist=False, customer_id='acme'):
+    async def main():
+        job = provisioner.submit(customer_id, steps, body, persist=persist)
+        assert job.status == 'pending'
+        while job.status not in ('success', 'partial', 'error'):
+            await asyncio.sleep(0.01)
+        return job
+    job = asyncio.run(main())
+    provisioner._executor.submit(lambda: None).result()  # drain pending writes
+    return job
+
+
+def statuses(job):
+    return {name: record['status'] for name, record in job.steps.items()}
+
+
+def test_steps_run_to_success():
+    async def body(job):
+        async with job.step('namespaces') as step:
+            assert job.status == 'running' and step['status'] == 'running'
+            step['message'] = 'Created 3 namespaces'
+        async with job.step('argocd_apps'):
+            await asyncio.sleep(0.02)
+        job.result = {'k8s': {'namespaces': 3}}
+
+    job = run_job(Provisioner(), ['namespaces', 'argocd_apps'], body)
+    data = job.to_dict()
+
+    assert data['status'] == 'success'
+    assert statuses(job) == {'namespaces': 'success', 'argocd_apps': 'success'}
+    assert data['steps'][0]['message'] == 'Created 3 namespaces'
+    assert data['steps'][1]['duration_ms'] >= 15
+    assert data['progress'] == {'completed': 2, 'total': 2}
+    assert data['result'] == {'k8s': {'namespaces': 3}}
+
+
+def test_step_marked_error_makes_job_partial():
+    async def body(job):
+        async with job.step('namespaces') as step:
+            step.update(status='error', message='Failed to create acme-prod')
+        async with job.step('repo_templates'):
+            pass
+
+    job = run_job(Provisioner(), ['namespaces', 'repo_templates'], body)
+
+    assert job.status == 'partial'
+    assert job.message == 'Completed with errors in: namespaces'
+    assert statuses(job) == {'namespaces': 'error', 'repo_templates': 'success'}
+
+
+def test_raising_step_fails_job_and_skips_the_rest():
+    async def body(job):
+        async with job.step('integrations'):
+            raise RuntimeError('database is locked')
+        async with job.step('namespaces'):
+            pass
+
+    provisioner = Provisioner()
+    job = run_job(provisioner, ['integrations', 'namespaces', 'argocd_apps'], body)
+
+    assert job.status == 'error'
+    assert job.message == 'database is locked'
+    assert statuses(job) == {'integrations': 'error', 'namespaces': 'skipped', 'argocd_apps': 'skipped'}
+    assert job.steps['integrations']['duration_ms'] is not None
+    assert provisioner.stats()['error'] == 1
+
+
+def test_record_and_skip():
+    async def body(job):
+        job.skip('namespaces', 'K8s not available')
+
+    provisioner = Provisioner()
+
+    async def main():
+        job = provisioner.submit('acme', ['github_repo', 'namespaces'], body, persist=False)
+        job.record('github_repo', 'Using existing repository', datetime.utcnow())
+        while job.status in ('pending', 'running'):
+            await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(main())
+    assert statuses(job) == {'github_repo': 'success', 'namespaces': 'skipped'}
+    assert job.status == 'success'
+    assert provisioner.get(job.id)['steps'][1]['message'] == 'K8s not available'
+    assert provisioner.latest('acme')['job_id'] == job.id
+
+
+def test_progress_is_persisted_and_recovered(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'provisioning.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, 'SessionLocal', session)
+    with session() as db:
+        db.add(Customer(id='acme', name='Acme', stack='nodejs'))
+        db.commit()
+
+    async def body(job):
+        async with job.step('namespaces') as step:
+            step['message'] = 'Created 3 namespaces'
+        async with job.step('argocd_apps') as step:
+            step['status'] = 'error'
+        job.result = {'argocd': {'applications': []}}
+
+    provisioner = Provisioner()
+    job = run_job(provisioner, ['namespaces', 'argocd_apps'], body, persist=True)
+
+    provisioner._jobs.clear()  # force the database read
+    stored = provisioner.get(job.id)
+    assert stored['status'] == 'partial'
+    assert stored['result'] == {'argocd': {'applications': []}}
+    assert [(step['step'], step['status']) for step in stored['steps']] == [
+        ('namespaces', 'success'), ('argocd_apps', 'error')
+    ]
+    assert stored['steps'][0]['message'] == 'Created 3 namespaces'
+    assert stored['progress'] == {'completed': 2, 'total': 2}
+
+    # A job left running by a previous process is failed at startup
+    with session() as db:
+        db.add(ProvisioningJob(id='interrupted', customer_id='acme', status='running'))
+        db.add(ProvisioningStep(customer_id='acme', job_id='interrupted', step='namespaces', status='running'))
+        db.add(ProvisioningStep(customer_id='acme', job_id='interrupted', step='argocd_apps', status='pending'))
+        db.commit()
+    provisioner.recover()
+    recovered = provisioner.get('interrupted')
+    assert recovered['status'] == 'error'
+    assert [step['status'] for step in recovered['steps']] == ['error', 'skipped']
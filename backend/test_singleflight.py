@@ -0,0 +1,143 @@
+"""
+Tests for single-flight coalescing of identical upstream reads
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_call_coalesces_concurrent_threads():
+    flight = SingleFlight()
+    upstream = []
+    started = threading.Event()
+
+    def slow_read():
+        upstream.append(1)
+        started.set()
+        time.sleep(0.2)
+        return ['pod-a']
+
+    results = []
+
+    def caller():
+        results.append(flight.call(('k8s.list_pods', 'acme-dev'), slow_read))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=caller) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(upstream) == 1
+    assert results == [['pod-a']] * 5
+    stats = flight.stats()['by_call']['k8s.list_pods']
+    assert stats['calls'] == 5 and stats['coalesced'] == 4 and stats['upstream'] == 1
+
+
+def test_call_shares_errors_and_doesnt_cache_them():
+    flight = SingleFlight()
+    started = threading.Event()
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError('apiserver unavailable')
+
+    errors = []
+
+    def caller():
+        try:
+            flight.call(('k8s.read', 'x'), failing, ttl=10)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=caller)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert flight.stats()['by_call']['k8s.read']['errors'] == 1
+    # Failures aren't kept: the next call goes upstream again
+    with pytest.raises(RuntimeError):
+        flight.call(('k8s.read', 'x'), failing, ttl=10)
+    assert len(attempts) == 2
+
+
+def test_ttl_cache_and_distinct_keys():
+    flight = SingleFlight()
+    calls = []
+
+    def read(value):
+        calls.append(value)
+        return value
+
+    assert flight.call(('read', 1), lambda: read(1), ttl=0.2) == 1
+    assert flight.call(('read', 1), lambda: read(1), ttl=0.2) == 1  # cached
+    assert flight.call(('read', 2), lambda: read(2), ttl=0.2) == 2  # other key
+    assert flight.call(('read', 3), lambda: read(3)) == 3
+    assert flight.call(('read', 3), lambda: read(3)) == 3  # ttl=0: coalesce only
+    time.sleep(0.25)
+    assert flight.call(('read', 1), lambda: read(1), ttl=0.2) == 1  # expired
+
+    assert calls == [1, 2, 3, 3, 1]
+    assert flight.stats()['by_call']['read']['cached'] == 1
+
+
+def test_run_coalesces_and_shares_errors():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = []
+
+        async def read():
+            upstream.append(1)
+            await asyncio.sleep(0.05)
+            return {'status': 'Synced'}
+
+        async def fail():
+            upstream.append(1)
+            await asyncio.sleep(0.05)
+            raise ValueError('404')
+
+        values = await asyncio.gather(*(flight.run(('argocd.get', 'app'), read) for _ in range(5)))
+        errors = await asyncio.gather(*(flight.run(('argocd.get', 'gone'), fail) for _ in range(3)),
+                                      return_exceptions=True)
+        return values, errors, upstream, flight.stats()
+
+    values, errors, upstream, stats = asyncio.run(scenario())
+
+    assert values == [{'status': 'Synced'}] * 5
+    assert all(isinstance(e, ValueError) for e in errors) and len({id(e) for e in errors}) == 1
+    assert len(upstream) == 2
+    assert stats['by_call']['argocd.get']['coalesced'] == 6
+    assert stats['in_flight'] == 0
+
+
+def test_run_cancelled_caller_doesnt_cancel_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def read():
+            await asyncio.sleep(0.1)
+            return 'deployment'
+
+        first = asyncio.create_task(flight.run(('k8s.read', 'd'), read))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(flight.run(('k8s.read', 'd'), read))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ('deployment', True)
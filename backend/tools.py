@@ -3,20 +3,30 @@ Tool definitions for Luffy AI agent
 """
 
 from typing import List, Dict, Any
-from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 from datetime import datetime
+import asyncio
+import functools
 import os
+import time
 
-# Initialize K8s client
-try:
-    config.load_incluster_config()
-except:
-    config.load_kube_config()
+from cluster_cache import cluster_cache
+from k8s_async import run_k8s
+from deployment_events import newest_events, event_timestamp
+from log_streaming import log_targets, aggregate_logs
+from fanout import fan_out, probe_summary
+from singleflight import singleflight, shared
+from platform_health import platform_health
+import k8s_fastlist as fastlist
+import k8s_client
 
-v1 = client.CoreV1Api()
-apps_v1 = client.AppsV1Api()
-networking_v1 = client.NetworkingV1Api()
+# Shared K8s clients (config, pool and timeouts live in k8s_client)
+v1 = k8s_client.core_v1()
+apps_v1 = k8s_client.apps_v1()
+networking_v1 = k8s_client.networking_v1()
+
+# How long create_customer follows the onboarding job before reporting it as still running (seconds)
+CREATE_CUSTOMER_WAIT = float(os.getenv('CREATE_CUSTOMER_WAIT', '45'))
 
 
 def get_tools() -> List[Dict[str, Any]]:
@@ -68,6 +78,33 @@ def get_tools() -> List[Dict[str, Any]]:
                 "required": ["namespace", "pod_name"]
             }
         },
+        {
+            "name": "get_deployment_logs",
+            "description": "Retrieve logs from ALL pods of a deployment in one call, merged in timestamp order with a [pod/container] prefix on each line. Prefer this over calling get_pod_logs once per pod.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "namespace": {
+                        "type": "string",
+                        "description": "Kubernetes namespace (e.g., 'acme-corp-dev')"
+                    },
+                    "deployment_name": {
+                        "type": "string",
+                        "description": "Name of the deployment"
+                    },
+                    "lines": {
+                        "type": "integer",
+                        "description": "Log lines per pod (default: 100)",
+                        "default": 100
+                    },
+                    "container": {
+                        "type": "string",
+                        "description": "Only read this container (optional)"
+                    }
+                },
+                "required": ["namespace", "deployment_name"]
+            }
+        },
         {
             "name": "analyze_error",
             "description": "Use the AI Triage Engine to classify an error and determine root cause. Returns category (application bug, infrastructure, config, or dependencies), severity, confidence, reasoning, evidence, responsible team, and suggested actions.",
@@ -234,7 +271,7 @@ def get_tools() -> List[Dict[str, Any]]:
         },
         {
             "name": "create_customer",
-            "description": "Create a new customer in OpenLuffy with GitHub repo and ArgoCD applications. IMPORTANT: DO NOT call this tool until you have confirmed details with the user AND received both GitHub token and ArgoCD token. Show smart defaults first (ID auto-generated from name, GitHub org='lebrick07', repo='{id}-api', ArgoCD URL='http://argocd.local'), then ask user to provide tokens. Only call this tool AFTER user provides tokens.",
+            "description": "Create a new customer in OpenLuffy with GitHub repo and ArgoCD applications. Onboarding runs as a background job: the result has a job_id and progress_url, and may report that provisioning is still running. IMPORTANT: DO NOT call this tool until you have confirmed details with the user AND received both GitHub token and ArgoCD token. Show smart defaults first (ID auto-generated from name, GitHub org='lebrick07', repo='{id}-api', ArgoCD URL='http://argocd.local'), then ask user to provide tokens. Only call this tool AFTER user provides tokens.",
             "input_schema": {
                 "type": "object",
                 "properties": {
@@ -314,6 +351,14 @@ async def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> Dict[str,
             tool_input.get("container")
         )
     
+    elif tool_name == "get_deployment_logs":
+        return await get_deployment_logs(
+            tool_input["namespace"],
+            tool_input["deployment_name"],
+            tool_input.get("lines", 100),
+            tool_input.get("container")
+        )
+    
     elif tool_name == "analyze_error":
         return await analyze_error(tool_input["error_log"])
     
@@ -383,10 +428,12 @@ async def get_pod_status(customer: str, environment: str) -> Dict[str, Any]:
     namespace = f"{customer}-{environment}"
     
     try:
-        pods = v1.list_namespaced_pod(namespace)
+        pods = await run_k8s(cluster_cache.pods, namespace, fallback=shared(
+            ('k8s.list_namespaced_pod', namespace, ''), lambda: v1.list_namespaced_pod(namespace).items
+        ))
         
         pod_list = []
-        for pod in pods.items:
+        for pod in pods:
             pod_info = {
                 "name": pod.metadata.name,
                 "status": pod.status.phase,
@@ -418,7 +465,8 @@ async def get_pod_status(customer: str, environment: str) -> Dict[str, Any]:
 async def get_pod_logs(namespace: str, pod_name: str, lines: int = 100, container: str = None) -> Dict[str, Any]:
     """Get logs from a pod"""
     try:
-        logs = v1.read_namespaced_pod_log(
+        logs = await run_k8s(
+            v1.read_namespaced_pod_log,
             name=pod_name,
             namespace=namespace,
             container=container,
@@ -437,6 +485,44 @@ async def get_pod_logs(namespace: str, pod_name: str, lines: int = 100, containe
         return {"error": f"Failed to get logs: {e.reason}"}
 
 
+async def get_deployment_logs(namespace: str, deployment_name: str, lines: int = 100, container: str = None) -> Dict[str, Any]:
+    """Get merged logs from every pod of a deployment"""
+    try:
+        deployment = await read_deployment(namespace, deployment_name)
+        match_labels = deployment.spec.selector.match_labels
+        label_selector = ','.join(f"{k}={v}" for k, v in match_labels.items())
+        pods = await run_k8s(
+            cluster_cache.pods,
+            namespace,
+            selector=match_labels,
+            fallback=shared(
+                ('k8s.list_namespaced_pod', namespace, label_selector),
+                lambda: v1.list_namespaced_pod(namespace, label_selector=label_selector).items
+            )
+        )
+        
+        targets = log_targets(pods, container)
+        chunks = [
+            line async for line in aggregate_logs(
+                v1, namespace, targets, run_k8s,
+                tail_lines=lines,
+                max_lines=lines * max(1, len(targets)),
+                max_bytes=256 * 1024
+            )
+        ]
+        
+        return {
+            "deployment": deployment_name,
+            "namespace": namespace,
+            "pods": sorted({pod for pod, _ in targets}),
+            "lines": lines,
+            "logs": b''.join(chunks).decode(errors='replace')
+        }
+    
+    except ApiException as e:
+        return {"error": f"Failed to get logs: {e.reason}"}
+
+
 async def analyze_error(error_log: str) -> Dict[str, Any]:
     """Analyze error using triage engine"""
     from triage import triage_engine
@@ -454,10 +540,18 @@ async def analyze_error(error_log: str) -> Dict[str, Any]:
     }
 
 
+async def read_deployment(namespace: str, deployment_name: str):
+    """Deployment object (concurrent identical reads share one API call)"""
+    return await singleflight.run(
+        ('k8s.read_namespaced_deployment', namespace, deployment_name),
+        lambda: run_k8s(apps_v1.read_namespaced_deployment, deployment_name, namespace)
+    )
+
+
 async def get_deployment_status(namespace: str, deployment_name: str) -> Dict[str, Any]:
     """Get deployment status"""
     try:
-        deployment = apps_v1.read_namespaced_deployment(deployment_name, namespace)
+        deployment = await read_deployment(namespace, deployment_name)
         
         return {
             "name": deployment_name,
@@ -484,14 +578,12 @@ async def get_deployment_status(namespace: str, deployment_name: str) -> Dict[st
 async def list_recent_events(namespace: str, limit: int = 10) -> Dict[str, Any]:
     """List recent events in namespace"""
     try:
-        events = v1.list_namespaced_event(namespace)
+        events = await singleflight.run(
+            ('k8s.list_namespaced_event', namespace), lambda: run_k8s(v1.list_namespaced_event, namespace)
+        )
         
-        # Sort by timestamp, most recent first
-        sorted_events = sorted(
-            events.items,
-            key=lambda e: e.last_timestamp or e.event_time,
-            reverse=True
-        )[:limit]
+        # Most recent first (heap top-K, events may lack last_timestamp)
+        sorted_events = newest_events(events.items, limit)
         
         event_list = []
         for event in sorted_events:
@@ -501,7 +593,7 @@ async def list_recent_events(namespace: str, limit: int = 10) -> Dict[str, Any]:
                 "message": event.message,
                 "object": f"{event.involved_object.kind}/{event.involved_object.name}",
                 "count": event.count,
-                "timestamp": str(event.last_timestamp or event.event_time)
+                "timestamp": str(event_timestamp(event))
             })
         
         return {
@@ -517,9 +609,13 @@ async def list_ingresses(namespace: str = None) -> Dict[str, Any]:
     """List ingresses across all namespaces or in a specific namespace"""
     try:
         if namespace:
-            ingresses = networking_v1.list_namespaced_ingress(namespace)
+            ingresses = await singleflight.run(
+                ('k8s.list_namespaced_ingress', namespace), lambda: run_k8s(networking_v1.list_namespaced_ingress, namespace)
+            )
         else:
-            ingresses = networking_v1.list_ingress_for_all_namespaces()
+            ingresses = await singleflight.run(
+                ('k8s.list_ingress_for_all_namespaces',), lambda: run_k8s(networking_v1.list_ingress_for_all_namespaces)
+            )
         
         ingress_list = []
         for ing in ingresses.items:
@@ -586,7 +682,8 @@ async def restart_deployment(namespace: str, deployment_name: str) -> Dict[str,
             }
         }
         
-        apps_v1.patch_namespaced_deployment(
+        await run_k8s(
+            apps_v1.patch_namespaced_deployment,
             name=deployment_name,
             namespace=namespace,
             body=body
@@ -612,7 +709,8 @@ async def scale_deployment(namespace: str, deployment_name: str, replicas: int)
             }
         }
         
-        apps_v1.patch_namespaced_deployment_scale(
+        await run_k8s(
+            apps_v1.patch_namespaced_deployment_scale,
             name=deployment_name,
             namespace=namespace,
             body=body
@@ -630,7 +728,8 @@ async def scale_deployment(namespace: str, deployment_name: str, replicas: int)
 async def delete_pod(namespace: str, pod_name: str) -> Dict[str, Any]:
     """Delete a pod (useful for forcing restart)"""
     try:
-        v1.delete_namespaced_pod(
+        await run_k8s(
+            v1.delete_namespaced_pod,
             name=pod_name,
             namespace=namespace
         )
@@ -647,10 +746,13 @@ async def delete_pod(namespace: str, pod_name: str) -> Dict[str, Any]:
 async def list_namespaces() -> Dict[str, Any]:
     """List all namespaces in the cluster"""
     try:
-        namespaces = v1.list_namespace()
+        namespaces = await run_k8s(
+            cluster_cache.namespaces,
+            fallback=shared(('fastlist.list_namespace', ''), lambda: fastlist.list_namespaces(v1.list_namespace))
+        )
         
         ns_list = []
-        for ns in namespaces.items:
+        for ns in namespaces:
             ns_list.append({
                 "name": ns.metadata.name,
                 "status": ns.status.phase,
@@ -698,163 +800,177 @@ async def list_customers() -> Dict[str, Any]:
 
 
 async def get_customer_details(customer_id: str) -> Dict[str, Any]:
-    """Get detailed information about a specific customer"""
-    try:
+    """Get detailed information about a specific customer
+    
+    The DB lookup and the per-environment ArgoCD and deployment probes run
+    concurrently under one deadline; failed or slow probes are reported in
+    "probes" alongside whatever did come back.
+    """
+    def load_customer():
         # Import here to avoid circular dependencies
         from database import SessionLocal, Customer, Integration
         
         db = SessionLocal()
         try:
-            # Get customer
             customer = db.query(Customer).filter(Customer.id == customer_id).first()
             if not customer:
-                return {"error": f"Customer '{customer_id}' not found"}
-            
-            # Get integrations
+                return None
             integrations = db.query(Integration).filter(Integration.customer_id == customer_id).all()
-            
-            integration_data = {}
-            for integration in integrations:
-                integration_data[integration.type] = integration.config
-            
-            # Get ArgoCD application status
-            custom_api = client.CustomObjectsApi()
-            argocd_apps = []
-            
-            for env in ['dev', 'preprod', 'prod']:
-                app_name = f"{customer_id}-{env}"
-                try:
-                    app = custom_api.get_namespaced_custom_object(
-                        group='argoproj.io',
-                        version='v1alpha1',
-                        namespace='argocd',
-                        plural='applications',
-                        name=app_name
-                    )
-                    
-                    argocd_apps.append({
-                        "name": app_name,
-                        "environment": env,
-                        "sync_status": app.get('status', {}).get('sync', {}).get('status'),
-                        "health_status": app.get('status', {}).get('health', {}).get('status'),
-                        "repo": app.get('spec', {}).get('source', {}).get('repoURL')
-                    })
-                except:
-                    argocd_apps.append({
-                        "name": app_name,
-                        "environment": env,
-                        "status": "not_found"
-                    })
-            
-            # Get deployment status
-            deployments = []
-            for env in ['dev', 'preprod', 'prod']:
-                namespace = f"{customer_id}-{env}"
-                try:
-                    deploys = apps_v1.list_namespaced_deployment(namespace)
-                    for deploy in deploys.items:
-                        deployments.append({
-                            "name": deploy.metadata.name,
-                            "environment": env,
-                            "replicas": {
-                                "desired": deploy.spec.replicas,
-                                "ready": deploy.status.ready_replicas or 0,
-                                "available": deploy.status.available_replicas or 0
-                            }
-                        })
-                except:
-                    pass
-            
             return {
-                "customer": {
-                    "id": customer.id,
-                    "name": customer.name,
-                    "stack": customer.stack,
-                    "created_at": str(customer.created_at)
-                },
-                "integrations": integration_data,
-                "argocd_applications": argocd_apps,
-                "deployments": deployments
-            }
-        
+                "id": customer.id,
+                "name": customer.name,
+                "stack": customer.stack,
+                "created_at": str(customer.created_at)
+            }, {integration.type: integration.config for integration in integrations}
         finally:
             db.close()
     
-    except Exception as e:
-        return {"error": f"Failed to get customer details: {str(e)}"}
+    custom_api = k8s_client.custom_objects()
+    environments = ['dev', 'preprod', 'prod']
+    
+    probes = {'database': lambda: asyncio.to_thread(load_customer)}
+    for env in environments:
+        namespace = f"{customer_id}-{env}"
+        probes[f"argocd:{env}"] = functools.partial(
+            singleflight.run,
+            ('argocd.get_application', namespace),
+            functools.partial(
+                run_k8s,
+                custom_api.get_namespaced_custom_object,
+                group='argoproj.io',
+                version='v1alpha1',
+                namespace='argocd',
+                plural='applications',
+                name=namespace
+            )
+        )
+        probes[f"deployments:{env}"] = functools.partial(
+            run_k8s,
+            cluster_cache.deployments,
+            namespace,
+            fallback=shared(
+                ('fastlist.list_namespaced_deployment', namespace),
+                functools.partial(fastlist.list_deployments, apps_v1.list_namespaced_deployment, namespace)
+            )
+        )
+    
+    results = await fan_out(probes)
+    
+    database = results['database']
+    if not database['ok']:
+        return {"error": f"Failed to get customer details: {database['error']}"}
+    if database['value'] is None:
+        return {"error": f"Customer '{customer_id}' not found"}
+    customer, integration_data = database['value']
+    
+    # Get ArgoCD application status
+    argocd_apps = []
+    for env in environments:
+        app_name = f"{customer_id}-{env}"
+        probe = results[f"argocd:{env}"]
+        if probe['ok']:
+            app = probe['value']
+            argocd_apps.append({
+                "name": app_name,
+                "environment": env,
+                "sync_status": app.get('status', {}).get('sync', {}).get('status'),
+                "health_status": app.get('status', {}).get('health', {}).get('status'),
+                "repo": app.get('spec', {}).get('source', {}).get('repoURL')
+            })
+        elif isinstance(probe['exception'], ApiException) and probe['exception'].status == 404:
+            argocd_apps.append({
+                "name": app_name,
+                "environment": env,
+                "status": "not_found"
+            })
+        else:
+            argocd_apps.append({
+                "name": app_name,
+                "environment": env,
+                "status": "unknown",
+                "error": probe['error']
+            })
+    
+    # Get deployment status
+    deployments = []
+    for env in environments:
+        probe = results[f"deployments:{env}"]
+        if not probe['ok']:
+            continue
+        for deploy in probe['value']:
+            deployments.append({
+                "name": deploy.metadata.name,
+                "environment": env,
+                "replicas": {
+                    "desired": deploy.spec.replicas,
+                    "ready": deploy.status.ready_replicas or 0,
+                    "available": deploy.status.available_replicas or 0
+                }
+            })
+    
+    return {
+        "customer": customer,
+        "integrations": integration_data,
+        "argocd_applications": argocd_apps,
+        "deployments": deployments,
+        "probes": probe_summary(results)
+    }
 
 
 async def get_platform_health() -> Dict[str, Any]:
-    """Get overall OpenLuffy platform health"""
-    try:
+    """Get overall OpenLuffy platform health
+    
+    Pod, deployment and ArgoCD counts come from the watch-fed counters in
+    platform_health rather than listing every object per question.
+    """
+    def count_customers():
         # Import here to avoid circular dependencies
         from database import SessionLocal, Customer
         
         db = SessionLocal()
         try:
-            # Count customers
-            customer_count = db.query(Customer).count()
-            
-            # Get ArgoCD applications
-            custom_api = client.CustomObjectsApi()
-            argocd_apps = custom_api.list_namespaced_custom_object(
-                group='argoproj.io',
-                version='v1alpha1',
-                namespace='argocd',
-                plural='applications'
-            )
-            
-            apps_total = len(argocd_apps.get('items', []))
-            apps_synced = 0
-            apps_healthy = 0
-            apps_degraded = 0
-            
-            for app in argocd_apps.get('items', []):
-                sync_status = app.get('status', {}).get('sync', {}).get('status')
-                health_status = app.get('status', {}).get('health', {}).get('status')
-                
-                if sync_status == 'Synced':
-                    apps_synced += 1
-                if health_status == 'Healthy':
-                    apps_healthy += 1
-                elif health_status == 'Degraded':
-                    apps_degraded += 1
-            
-            # Get overall pod count
-            all_pods = v1.list_pod_for_all_namespaces()
-            pods_running = sum(1 for p in all_pods.items if p.status.phase == 'Running')
-            pods_total = len(all_pods.items)
-            
-            # Check for issues
-            issues = []
-            if apps_degraded > 0:
-                issues.append(f"{apps_degraded} ArgoCD applications are degraded")
-            if apps_synced < apps_total:
-                issues.append(f"{apps_total - apps_synced} ArgoCD applications are out of sync")
-            if pods_running < pods_total:
-                issues.append(f"{pods_total - pods_running} pods are not running")
-            
-            return {
-                "status": "healthy" if len(issues) == 0 else "degraded",
-                "customers": {
-                    "total": customer_count
-                },
-                "argocd": {
-                    "total": apps_total,
-                    "synced": apps_synced,
-                    "healthy": apps_healthy,
-                    "degraded": apps_degraded
-                },
-                "pods": {
-                    "total": pods_total,
-                    "running": pods_running
-                },
-                "issues": issues
-            }
-        
+            return db.query(Customer).count()
         finally:
             db.close()
     
+    try:
+        customer_count, health = await asyncio.gather(
+            asyncio.to_thread(count_customers),
+            run_k8s(platform_health.snapshot)
+        )
+        
+        argocd = health['argocd']
+        pods = health['pods']
+        
+        # Check for issues
+        issues = []
+        if argocd['degraded'] > 0:
+            issues.append(f"{argocd['degraded']} ArgoCD applications are degraded")
+        if argocd['synced'] < argocd['total']:
+            issues.append(f"{argocd['total'] - argocd['synced']} ArgoCD applications are out of sync")
+        if pods['running'] < pods['total']:
+            issues.append(f"{pods['total'] - pods['running']} pods are not running")
+        
+        return {
+            "status": "healthy" if len(issues) == 0 else "degraded",
+            "customers": {
+                "total": customer_count
+            },
+            "argocd": {
+                "total": argocd['total'],
+                "synced": argocd['synced'],
+                "healthy": argocd['healthy'],
+                "degraded": argocd['degraded']
+            },
+            "pods": {
+                "total": pods['total'],
+                "running": pods['running'],
+                "by_phase": pods['by_phase']
+            },
+            "deployments": health['deployments'],
+            "issues": issues
+        }
+    
     except Exception as e:
         return {"error": f"Failed to get platform health: {str(e)}"}
 
@@ -933,29 +1049,65 @@ async def create_customer(params: Dict[str, Any]) -> Dict[str, Any]:
                 timeout=60.0
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Generate application URLs
-                urls = {
-                    "dev": f"http://dev.{customer_id}.local",
-                    "preprod": f"http://preprod.{customer_id}.local",
-                    "prod": f"http://{customer_id}.local"
-                }
-                
-                return {
-                    "success": True,
-                    "message": f"Customer '{customer_name}' created successfully",
-                    "customer_id": customer_id,
-                    "urls": urls,
-                    "details": result
-                }
-            else:
+            if response.status_code != 202:
                 error_data = response.json()
                 return {
                     "success": False,
                     "error": error_data.get("error", "Unknown error")
                 }
+            
+            # Onboarding runs as a background job - follow it for a while
+            job_id = response.json()["job_id"]
+            progress_url = f"/provisioning/jobs/{job_id}"
+            job = None
+            deadline = time.monotonic() + CREATE_CUSTOMER_WAIT
+            while time.monotonic() < deadline:
+                job_response = await client.get(f"http://localhost:8000{progress_url}", timeout=10.0)
+                if job_response.status_code == 200:
+                    job = job_response.json()
+                    if job["status"] in ("success", "partial", "error"):
+                        break
+                await asyncio.sleep(2)
+        
+        steps = {step["step"]: step["status"] for step in job["steps"]} if job else {}
+        if job is None or job["status"] not in ("success", "partial", "error"):
+            return {
+                "success": True,
+                "message": f"Provisioning of customer '{customer_name}' has started and is still running",
+                "customer_id": customer_id,
+                "job_id": job_id,
+                "progress_url": progress_url,
+                "steps": steps
+            }
+        
+        if job["status"] == "error":
+            return {
+                "success": False,
+                "error": f"Provisioning of customer '{customer_name}' failed: {job['message']}",
+                "customer_id": customer_id,
+                "job_id": job_id,
+                "progress_url": progress_url,
+                "steps": steps
+            }
+        
+        # Generate application URLs
+        urls = {
+            "dev": f"http://dev.{customer_id}.local",
+            "preprod": f"http://preprod.{customer_id}.local",
+            "prod": f"http://{customer_id}.local"
+        }
+        
+        return {
+            "success": True,
+            "message": (f"Customer '{customer_name}' created successfully" if job["status"] == "success"
+                        else f"Customer '{customer_name}' created with errors: {job['message']}"),
+            "customer_id": customer_id,
+            "job_id": job_id,
+            "progress_url": progress_url,
+            "urls": urls,
+            "steps": steps,
+            "details": job["result"]
+        }
     
     except Exception as e:
         return {
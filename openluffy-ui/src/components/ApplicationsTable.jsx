@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react'
+import { subscribeTopic } from '../utils/liveUpdates'
 import { useCustomer } from '../contexts/CustomerContext'
 import './ApplicationsTable.css'
 import DeploymentDetails from './DeploymentDetails'
@@ -11,29 +12,17 @@ function ApplicationsTable({ selectedEnvironment }) {
   const [selectedDeployment, setSelectedDeployment] = useState(null)
 
   useEffect(() => {
-    fetchData()
-    const interval = setInterval(fetchData, 10000)
-    return () => clearInterval(interval)
-  }, [])
-
-  const fetchData = async () => {
-    try {
-      const [deploymentsRes, customersRes] = await Promise.all([
-        fetch('/api/deployments'),
-        fetch('/api/customers')
-      ])
-      
-      const deploymentsData = await deploymentsRes.json()
-      const customersData = await customersRes.json()
-      
-      setDeployments(deploymentsData.deployments || [])
-      setCustomers(customersData.customers || [])
-    } catch (error) {
-      console.error('Error fetching data:', error)
-    } finally {
+    // Pushed by the backend instead of polling every 10s
+    const unsubscribeCustomers = subscribeTopic('customers', setCustomers)
+    const unsubscribeDeployments = subscribeTopic('deployments', (items) => {
+      setDeployments(items)
       setLoading(false)
+    })
+    return () => {
+      unsubscribeCustomers()
+      unsubscribeDeployments()
     }
-  }
+  }, [])
 
   const getCustomerName = (customerId) => {
     const customer = customers.find(c => c.id === customerId)
@@ -105,37 +105,34 @@ function CreateCustomerWizard({ onClose, onSuccess }) {
     }
   }
   
-  // Add progress step
-  const addProgressStep = (message, status = 'pending') => {
-    setCreationProgress(prev => [...prev, { message, status, timestamp: Date.now() }])
+  // Labels for the backend's provisioning steps
+  const stepLabels = {
+    github_repo: repoStatus?.exists ? 'Verifying GitHub repository' : 'Creating GitHub repository from template',
+    customer_record: 'Saving customer record',
+    integrations: 'Saving integration configurations',
+    namespaces: 'Creating Kubernetes namespaces (dev, preprod, prod)',
+    argocd_apps: 'Creating ArgoCD applications',
+    repo_templates: 'Initializing CI/CD pipelines'
   }
   
-  // Update progress step
-  const updateProgressStep = (index, status) => {
-    setCreationProgress(prev => {
-      const updated = [...prev]
-      updated[index] = { ...updated[index], status }
-      return updated
-    })
-  }
+  // Map a provisioning job to progress items
+  const jobProgress = (job) => job.steps.map(item => ({
+    status: item.status,
+    message: [
+      stepLabels[item.step] || item.step,
+      item.message && ` - ${item.message}`,
+      item.duration_ms != null && ` (${(item.duration_ms / 1000).toFixed(1)}s)`
+    ].filter(Boolean).join('')
+  }))
   
   // Create customer
   const handleCreate = async () => {
     setCreating(true)
-    setCreationProgress([])
+    setCreationProgress([{ message: 'Validating configuration...', status: 'running' }])
     setStep(5) // Move to progress view
     
     try {
-      // Step 1: Validate inputs
-      addProgressStep('Validating configuration...', 'running')
-      await new Promise(resolve => setTimeout(resolve, 500))
-      updateProgressStep(0, 'success')
-      
-      // Step 2: Create/verify GitHub repo
-      addProgressStep(repoStatus.exists ? 'Verifying GitHub repository...' : 'Creating GitHub repository from template...', 'running')
-      await new Promise(resolve => setTimeout(resolve, 1000))
-      
-      // Step 3: Call backend
+      // Backend validates, checks the GitHub repo and returns a provisioning job
       const response = await fetch('/api/customers/create', {
         method: 'POST',
         headers: {
@@ -160,44 +157,45 @@ function CreateCustomerWizard({ onClose, onSuccess }) {
       
       if (!response.ok) {
         const error = await response.json()
-        updateProgressStep(1, 'error')
-        throw new Error(error.message || 'Failed to create customer')
+        throw new Error(error.error || error.message || 'Failed to create customer')
       }
       
-      updateProgressStep(1, 'success')
-      
-      // Step 4: Create K8s namespaces
-      addProgressStep('Creating Kubernetes namespaces (dev, preprod, prod)...', 'running')
-      await new Promise(resolve => setTimeout(resolve, 1500))
-      updateProgressStep(2, 'success')
+      const { job_id } = await response.json()
       
-      // Step 5: Create ArgoCD applications
-      addProgressStep('Creating ArgoCD applications...', 'running')
-      await new Promise(resolve => setTimeout(resolve, 1500))
-      updateProgressStep(3, 'success')
-      
-      // Step 6: Initialize CI/CD
-      addProgressStep('Initializing CI/CD pipelines...', 'running')
-      await new Promise(resolve => setTimeout(resolve, 1000))
-      updateProgressStep(4, 'success')
+      // Poll the job's progress until it finishes
+      let job
+      while (true) {
+        const jobResponse = await fetch(`/api/provisioning/jobs/${job_id}`)
+        if (!jobResponse.ok) {
+          throw new Error('Lost track of the provisioning job')
+        }
+        job = await jobResponse.json()
+        setCreationProgress(jobProgress(job))
+        if (['success', 'partial', 'error'].includes(job.status)) break
+        await new Promise(resolve => setTimeout(resolve, 1000))
+      }
       
-      // Step 7: Save integration configs
-      addProgressStep('Saving integration configurations...', 'running')
-      const result = await response.json()
-      updateProgressStep(5, 'success')
+      if (job.status === 'error') {
+        throw new Error(job.message || 'Provisioning failed')
+      }
       
-      // Done!
-      addProgressStep('Customer created successfully! 🎉', 'success')
+      // Done (partial: the customer exists, failed steps are shown above)
+      setCreationProgress(prev => [...prev, job.status === 'success'
+        ? { message: 'Customer created successfully! 🎉', status: 'success' }
+        : { message: `Customer created with errors: ${job.message}`, status: 'error' }])
       setCreationComplete(true)
-      setCreatedCustomer(result)
+      setCreatedCustomer(job.result)
       
       // Refresh parent component
       if (onSuccess) {
-        onSuccess(result)
+        onSuccess(job.result)
       }
       
     } catch (error) {
-      addProgressStep(`Error: ${error.message}`, 'error')
+      setCreationProgress(prev => [
+        ...prev.map(item => item.status === 'running' ? { ...item, status: 'error' } : item),
+        { message: `Error: ${error.message}`, status: 'error' }
+      ])
     } finally {
       setCreating(false)
     }
@@ -489,6 +487,7 @@ function CreateCustomerWizard({ onClose, onSuccess }) {
                       {item.status === 'success' && '✅'}
                       {item.status === 'error' && '❌'}
                       {item.status === 'pending' && '⏸️'}
+                      {item.status === 'skipped' && '⏭️'}
                     </div>
                     <div className="progress-message">{item.message}</div>
                   </div>
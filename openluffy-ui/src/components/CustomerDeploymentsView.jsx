@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react'
+import { subscribeTopic } from '../utils/liveUpdates'
 import './CustomerDeploymentsView.css'
 import DeploymentDetails from './DeploymentDetails'
 import PipelineStatus from './PipelineStatus'
@@ -10,29 +11,17 @@ function CustomerDeploymentsView({ selectedCustomer }) {
   const [selectedDeployment, setSelectedDeployment] = useState(null)
 
   useEffect(() => {
-    fetchData()
-    const interval = setInterval(fetchData, 10000)
-    return () => clearInterval(interval)
-  }, [])
-
-  const fetchData = async () => {
-    try {
-      const [customersRes, deploymentsRes] = await Promise.all([
-        fetch('/api/customers'),
-        fetch('/api/deployments')
-      ])
-      
-      const customersData = await customersRes.json()
-      const deploymentsData = await deploymentsRes.json()
-      
-      setCustomers(customersData.customers || [])
-      setDeployments(deploymentsData.deployments || [])
-    } catch (error) {
-      console.error('Error fetching data:', error)
-    } finally {
+    // Pushed by the backend instead of polling every 10s
+    const unsubscribeCustomers = subscribeTopic('customers', setCustomers)
+    const unsubscribeDeployments = subscribeTopic('deployments', (items) => {
+      setDeployments(items)
       setLoading(false)
+    })
+    return () => {
+      unsubscribeCustomers()
+      unsubscribeDeployments()
     }
-  }
+  }, [])
 
   const getDeploymentsByCustomerAndEnv = (customerId, environment) => {
     return deployments.filter(d => 
@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react'
+import { subscribeTopic } from '../utils/liveUpdates'
 import { useCustomer } from '../contexts/CustomerContext'
 import './K8sInsights.css'
 import DeploymentDetails from './DeploymentDetails'
@@ -14,29 +15,17 @@ function K8sInsights() {
   const [filterStatus, setFilterStatus] = useState('all')
 
   useEffect(() => {
-    fetchData()
-    const interval = setInterval(fetchData, 10000)
-    return () => clearInterval(interval)
-  }, [])
-
-  const fetchData = async () => {
-    try {
-      const [deploymentsRes, customersRes] = await Promise.all([
-        fetch('/api/deployments'),
-        fetch('/api/customers')
-      ])
-      
-      const deploymentsData = await deploymentsRes.json()
-      const customersData = await customersRes.json()
-      
-      setDeployments(deploymentsData.deployments || [])
-      setCustomers(customersData.customers || [])
-    } catch (error) {
-      console.error('Error fetching data:', error)
-    } finally {
+    // Pushed by the backend instead of polling every 10s
+    const unsubscribeCustomers = subscribeTopic('customers', setCustomers)
+    const unsubscribeDeployments = subscribeTopic('deployments', (items) => {
+      setDeployments(items)
       setLoading(false)
+    })
+    return () => {
+      unsubscribeCustomers()
+      unsubscribeDeployments()
     }
-  }
+  }, [])
 
   const filteredDeployments = deployments.filter(d => {
     if (activeCustomer && d.customer !== activeCustomer.id) return false
@@ -11,29 +11,74 @@ function LogViewer({ deploymentId, deploymentName, namespace, customer }) {
   const [autoRefresh, setAutoRefresh] = useState(false)
   const [followMode, setFollowMode] = useState(false)
   const [lines, setLines] = useState(500)
+  const [streamState, setStreamState] = useState(null) // 'live' | 'reconnecting' | 'ended'
   const logsEndRef = useRef(null)
-  const intervalRef = useRef(null)
 
   useEffect(() => {
     fetchPods()
   }, [deploymentId])
 
   useEffect(() => {
-    if (selectedPod) {
+    if (selectedPod && !autoRefresh) {
       fetchLogs()
     }
-  }, [selectedPod, lines])
+  }, [selectedPod, lines, autoRefresh])
 
+  // Live mode: one long-lived follow stream instead of re-polling the tail
   useEffect(() => {
-    if (autoRefresh && selectedPod) {
-      intervalRef.current = setInterval(fetchLogs, 5000)
-      return () => clearInterval(intervalRef.current)
-    } else {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current)
+    if (!autoRefresh || !selectedPod) {
+      setStreamState(null)
+      return
+    }
+
+    let source = null
+    let retryTimer = null
+    let retryDelay = 1000
+    let stopped = false
+    setLogs([])
+
+    const connect = () => {
+      source = new EventSource(
+        `/api/deployments/${deploymentId}/pods/${selectedPod}/logs/stream?format=sse&lines=${lines}`
+      )
+      let nextId = 0
+      let replaceTail = true // each connection re-sends the tail, so it replaces what we had
+
+      source.onopen = () => {
+        setStreamState('live')
+        retryDelay = 1000
+      }
+      source.onmessage = (event) => {
+        if (!event.data.trim()) return
+        const logObj = parseLogLine(event.data, nextId++)
+        const replace = replaceTail
+        replaceTail = false
+        setLogs(prev => {
+          const updated = [...(replace ? [] : prev), logObj]
+          return updated.length > lines ? updated.slice(updated.length - lines) : updated
+        })
       }
+      source.addEventListener('end', () => {
+        source.close()
+        setStreamState('ended')
+      })
+      source.onerror = () => {
+        // Reconnect ourselves with backoff rather than leaving a dead "live" view
+        source.close()
+        if (stopped) return
+        setStreamState('reconnecting')
+        retryTimer = setTimeout(connect, retryDelay)
+        retryDelay = Math.min(retryDelay * 2, 30000)
+      }
+    }
+    connect()
+
+    return () => {
+      stopped = true
+      clearTimeout(retryTimer)
+      source?.close()
     }
-  }, [autoRefresh, selectedPod])
+  }, [autoRefresh, selectedPod, lines])
 
   useEffect(() => {
     if (followMode) {
@@ -59,6 +104,37 @@ function LogViewer({ deploymentId, deploymentName, namespace, customer }) {
     }
   }
 
+  const parseLogLine = (line, idx) => {
+    const logObj = {
+      id: idx,
+      raw: line,
+      timestamp: null,
+      level: 'INFO',
+      message: line
+    }
+
+    // Try to parse common log formats
+    // ISO timestamp at start: 2026-02-10T12:34:56.789Z
+    const isoMatch = line.match(/^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{3})?(?:Z|[+-]\d{2}:?\d{2})?)/)
+    if (isoMatch) {
+      logObj.timestamp = isoMatch[1]
+      logObj.message = line.substring(isoMatch[0].length).trim()
+    }
+
+    // Detect log level
+    if (/\b(ERROR|ERR|FATAL|CRITICAL)\b/i.test(line)) {
+      logObj.level = 'ERROR'
+    } else if (/\b(WARN|WARNING)\b/i.test(line)) {
+      logObj.level = 'WARN'
+    } else if (/\b(DEBUG|TRACE)\b/i.test(line)) {
+      logObj.level = 'DEBUG'
+    } else if (/\b(INFO)\b/i.test(line)) {
+      logObj.level = 'INFO'
+    }
+
+    return logObj
+  }
+
   const fetchLogs = async () => {
     if (!selectedPod) return
     
@@ -69,36 +145,9 @@ function LogViewer({ deploymentId, deploymentName, namespace, customer }) {
       const data = await response.json()
       
       // Parse logs into structured format
-      const parsedLogs = data.logs.split('\n').map((line, idx) => {
-        const logObj = {
-          id: idx,
-          raw: line,
-          timestamp: null,
-          level: 'INFO',
-          message: line
-        }
-
-        // Try to parse common log formats
-        // ISO timestamp at start: 2026-02-10T12:34:56.789Z
-        const isoMatch = line.match(/^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{3})?(?:Z|[+-]\d{2}:?\d{2})?)/)
-        if (isoMatch) {
-          logObj.timestamp = isoMatch[1]
-          logObj.message = line.substring(isoMatch[0].length).trim()
-        }
-
-        // Detect log level
-        if (/\b(ERROR|ERR|FATAL|CRITICAL)\b/i.test(line)) {
-          logObj.level = 'ERROR'
-        } else if (/\b(WARN|WARNING)\b/i.test(line)) {
-          logObj.level = 'WARN'
-        } else if (/\b(DEBUG|TRACE)\b/i.test(line)) {
-          logObj.level = 'DEBUG'
-        } else if (/\b(INFO)\b/i.test(line)) {
-          logObj.level = 'INFO'
-        }
-
-        return logObj
-      }).filter(log => log.raw.trim())
+      const parsedLogs = data.logs.split('\n')
+        .map((line, idx) => parseLogLine(line, idx))
+        .filter(log => log.raw.trim())
 
       setLogs(parsedLogs)
     } catch (error) {
@@ -207,7 +256,7 @@ function LogViewer({ deploymentId, deploymentName, namespace, customer }) {
           <button
             className={`btn-toggle ${autoRefresh ? 'active' : ''}`}
             onClick={() => setAutoRefresh(!autoRefresh)}
-            title="Auto-refresh every 5s"
+            title="Stream new log lines live"
           >
             🔄 {autoRefresh ? 'Auto-Refresh ON' : 'Auto-Refresh OFF'}
           </button>
@@ -256,6 +305,13 @@ function LogViewer({ deploymentId, deploymentName, namespace, customer }) {
             {logs.filter(l => l.level === 'WARN').length} warnings
           </span>
         </span>
+        {streamState && (
+          <span className={`stat-item stream-state stream-${streamState}`}>
+            {streamState === 'live' && '● Live'}
+            {streamState === 'reconnecting' && '○ Disconnected, reconnecting...'}
+            {streamState === 'ended' && '■ Stream ended'}
+          </span>
+        )}
       </div>
 
       {loading && logs.length === 0 ? (
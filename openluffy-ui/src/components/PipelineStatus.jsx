@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react'
+import { subscribeTopic } from '../utils/liveUpdates'
 import './PipelineStatus.css'
 
 function PipelineStatus({ customerId }) {
@@ -6,24 +7,12 @@ function PipelineStatus({ customerId }) {
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetchStatus()
-    const interval = setInterval(fetchStatus, 30000) // Refresh every 30s
-    return () => clearInterval(interval)
-  }, [customerId])
-
-  const fetchStatus = async () => {
-    try {
-      const response = await fetch('/api/pipelines/status')
-      if (!response.ok) throw new Error('Failed to fetch')
-      const data = await response.json()
-      const customerStatus = data.pipelines?.find(p => p.customer_id === customerId)
-      setStatus(customerStatus)
-    } catch (error) {
-      console.error('Error fetching pipeline status:', error)
-    } finally {
+    // Pipeline state is pushed by the backend (one shared GitHub poller)
+    return subscribeTopic('pipelines', (pipelines) => {
+      setStatus(pipelines.find(p => p.customer_id === customerId))
       setLoading(false)
-    }
-  }
+    })
+  }, [customerId])
 
   if (loading || !status) {
     return (
@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react'
+import { subscribeTopic } from '../utils/liveUpdates'
 import { useCustomer } from '../contexts/CustomerContext'
 import './PipelinesView.css'
 
@@ -12,22 +13,9 @@ function PipelinesView() {
   const [loadingJobs, setLoadingJobs] = useState(false)
 
   useEffect(() => {
-    fetchPipelines()
-    const interval = setInterval(fetchPipelines, 30000)
-    return () => clearInterval(interval)
+    return subscribeTopic('pipelines', setPipelines)
   }, [])
 
-  const fetchPipelines = async () => {
-    try {
-      const response = await fetch('/api/pipelines/status')
-      if (!response.ok) throw new Error('Failed to fetch')
-      const data = await response.json()
-      setPipelines(data.pipelines || [])
-    } catch (error) {
-      console.error('Error fetching pipelines:', error)
-    }
-  }
-
   const fetchRuns = async (customerId, deploymentId) => {
     setLoadingRuns(true)
     try {
@@ -0,0 +1,67 @@
+/**
+ * Live updates from the backend push channel (/api/events/stream)
+ *
+ * All components in a tab share one EventSource. The server sends a full
+ * snapshot per topic on connect (and after reconnects), then diffs with only
+ * the changed items and removed keys.
+ */
+
+const TOPICS = ['customers', 'deployments', 'pipelines']
+const KEYS = { customers: 'id', deployments: 'id', pipelines: 'customer_id' }
+
+const state = {}      // topic -> Map(key -> item)
+const listeners = {}  // topic -> Set(callback)
+const loaded = new Set()
+let source = null
+
+TOPICS.forEach(topic => {
+  state[topic] = new Map()
+  listeners[topic] = new Set()
+})
+
+function notify(topic) {
+  const items = Array.from(state[topic].values())
+  listeners[topic].forEach(callback => callback(items))
+}
+
+function connect() {
+  source = new EventSource(`/api/events/stream?topics=${TOPICS.join(',')}`)
+
+  source.addEventListener('snapshot', (event) => {
+    const { topic, items } = JSON.parse(event.data)
+    state[topic] = new Map(items.map(item => [String(item[KEYS[topic]]), item]))
+    loaded.add(topic)
+    notify(topic)
+  })
+
+  source.addEventListener('diff', (event) => {
+    const { topic, upserts, removed } = JSON.parse(event.data)
+    upserts.forEach(item => state[topic].set(String(item[KEYS[topic]]), item))
+    removed.forEach(key => state[topic].delete(key))
+    notify(topic)
+  })
+}
+
+/**
+ * Subscribe to one topic. The callback receives the full item list on every
+ * change (immediately if a snapshot is already loaded).
+ * @returns {Function} unsubscribe
+ */
+export function subscribeTopic(topic, callback) {
+  listeners[topic].add(callback)
+  if (!source) {
+    connect()
+  } else if (loaded.has(topic)) {
+    callback(Array.from(state[topic].values()))
+  }
+
+  return () => {
+    listeners[topic].delete(callback)
+    const active = TOPICS.some(t => listeners[t].size > 0)
+    if (!active && source) {
+      source.close()
+      source = null
+      loaded.clear()
+    }
+  }
+}